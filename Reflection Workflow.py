@@ -58,6 +58,9 @@ import httpx
 import asyncio
 import logging
 import math
+import inspect
+import weakref
+from token_counter import count_tokens
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -77,7 +80,7 @@ if not OPENAI_API_KEY:
 if OPENAI_API_KEY:
     openai.api_key = OPENAI_API_KEY
 
-# 创建OpenAI客户端
+# OpenAI客户端在第一次使用时才创建（导入模块不会建立任何连接）
 # 尝试设置代理解决连接问题
 
 # 从环境变量获取代理设置
@@ -89,36 +92,93 @@ if OPENAI_API_KEY:
 http_proxy = os.environ.get("HTTP_PROXY", "http://127.0.0.1:7897")  # 固定使用指定代理
 https_proxy = os.environ.get("HTTPS_PROXY", "http://127.0.0.1:7897")  # 固定使用指定代理
 
+# 使用固定代理
+fixed_proxy = "http://127.0.0.1:7897"
+
 # 配置超时和重试参数
 timeout_seconds = 60.0  # 设置为60秒的超时
 max_retries = 5
 
-# 创建HTTPX客户端，添加超时和代理设置
-try:
-    # 使用固定代理
-    fixed_proxy = "http://127.0.0.1:7897"
-    print(f"使用固定代理: {fixed_proxy}")
-    
-    # 创建带代理的httpx客户端
-    http_client = httpx.Client(
-        proxy=fixed_proxy,  # 使用固定代理
-        timeout=timeout_seconds,
-        transport=httpx.HTTPTransport(retries=max_retries)
-    )
+# 异步连接池上限，允许多个翻译同时进行
+http_limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+_client: Optional[openai.OpenAI] = None
+# 每个事件循环一个异步客户端（连接绑定在创建它的事件循环上）
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.AsyncOpenAI]" = weakref.WeakKeyDictionary()
+# 每个事件循环上正在进行的翻译工作流数，最后一个结束时关闭连接池
+_active_workflows: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = weakref.WeakKeyDictionary()
+
+
+def get_client() -> openai.OpenAI:
+    """获取同步OpenAI客户端（首次调用时创建，带代理和自定义超时）"""
+    global _client
+    if _client is not None:
+        return _client
     
-    # 创建OpenAI客户端，使用配置好的httpx客户端
-    client = openai.OpenAI(
-        api_key=OPENAI_API_KEY,
-        http_client=http_client,
-        max_retries=max_retries,
-        timeout=timeout_seconds
-    )
-    print("OpenAI客户端创建成功，使用代理和自定义超时")
+    api_key = openai.api_key or OPENAI_API_KEY
+    try:
+        print(f"使用固定代理: {fixed_proxy}")
+        
+        # 创建带代理的httpx客户端（代理transport自己带重试，client的proxy参数会创建默认配置的transport）
+        transport = httpx.HTTPTransport(proxy=fixed_proxy, retries=max_retries)
+        http_client = httpx.Client(
+            timeout=timeout_seconds,
+            mounts={"http://": transport, "https://": transport}  # 使用固定代理（覆盖环境变量中的代理）
+        )
+        
+        # 创建OpenAI客户端，使用配置好的httpx客户端
+        _client = openai.OpenAI(
+            api_key=api_key,
+            http_client=http_client,
+            max_retries=max_retries,
+            timeout=timeout_seconds
+        )
+        print("OpenAI客户端创建成功，使用代理和自定义超时")
+    
+    except Exception as e:
+        print(f"创建代理客户端时出错: {str(e)}")
+        print("尝试使用默认配置创建客户端...")
+        _client = openai.OpenAI(api_key=api_key)
+    return _client
+
+
+def get_async_client() -> openai.AsyncOpenAI:
+    """获取当前事件循环的异步OpenAI客户端（首次调用时创建）"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+    
+    api_key = openai.api_key or OPENAI_API_KEY
+    try:
+        # 连接池上限和重试配置在代理transport上，所有请求都经过它
+        transport = httpx.AsyncHTTPTransport(proxy=fixed_proxy, retries=max_retries, limits=http_limits)
+        http_client = httpx.AsyncClient(
+            timeout=timeout_seconds,
+            limits=http_limits,
+            mounts={"http://": transport, "https://": transport}  # 使用固定代理（覆盖环境变量中的代理）
+        )
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client,
+            max_retries=max_retries,
+            timeout=timeout_seconds
+        )
+        print("异步OpenAI客户端创建成功，使用代理和自定义超时")
+    except Exception as e:
+        print(f"创建异步代理客户端时出错: {str(e)}")
+        print("尝试使用默认配置创建异步客户端...")
+        client = openai.AsyncOpenAI(api_key=api_key)
+    
+    _async_clients[loop] = client
+    return client
 
-except Exception as e:
-    print(f"创建代理客户端时出错: {str(e)}")
-    print("尝试使用默认配置创建客户端...")
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
+
+async def close_async_client():
+    """关闭当前事件循环的异步客户端（在asyncio.run结束前调用）"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
 
 class TranslationAgent:
     """
@@ -323,11 +383,8 @@ class TranslationAgent:
         return input_cost + output_cost
     
     def _estimate_tokens(self, text: str) -> int:
-        """估算文本中的token数量（粗略估计）"""
-        # 英文大约每4个字符一个token
-        # 中文大约每1.5个字符一个token
-        chars = len(text)
-        return math.ceil(chars / 3)  # 使用3作为平均值
+        """文本的token数量（有tiktoken时精确计数，否则按字符类别估算）"""
+        return count_tokens(text)
     
     async def _make_openai_request(self, func, *args, **kwargs):
         """
@@ -350,8 +407,12 @@ class TranslationAgent:
                 logger.info(f"向OpenAI发送请求 (尝试 {attempt+1}/{max_retries})")
                 start_time = time.time()
                 
-                # 修复：不使用await直接调用函数，因为client.chat.completions.create不是一个协程
-                response = func(*args, **kwargs)
+                # 异步客户端直接await；同步函数放到线程池执行，避免阻塞事件循环
+                # （openai的create方法带有装饰器，需要unwrap后判断）
+                if inspect.iscoroutinefunction(inspect.unwrap(func)):
+                    response = await func(*args, **kwargs)
+                else:
+                    response = await asyncio.to_thread(func, *args, **kwargs)
                 
                 elapsed_time = time.time() - start_time
                 print(f"请求成功, 用时: {elapsed_time:.2f}秒")
@@ -426,7 +487,7 @@ Be accurate but also natural and fluent. Maintain the same level of formality, t
         logger.info(f"阶段1: 发送初步翻译请求, 提示长度: {len(prompt)} 字符")
         print(f"发送初步翻译请求: {len(prompt)} 字符的提示")
         response, token_usage = await self._make_openai_request(
-            client.chat.completions.create,
+            get_async_client().chat.completions.create,
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a professional translator."},
@@ -482,7 +543,7 @@ IMPROVEMENT SUGGESTIONS:"""
         logger.info(f"阶段2: 发送反思评估请求, 提示长度: {len(prompt)} 字符")
         print(f"发送反思评估请求: {len(prompt)} 字符的提示")
         response, token_usage = await self._make_openai_request(
-            client.chat.completions.create,
+            get_async_client().chat.completions.create,
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a translation quality evaluator with expertise in multiple languages."},
@@ -550,7 +611,7 @@ IMPROVED {target_lang} TRANSLATION:"""
         logger.info(f"阶段3: 发送优化翻译请求, 提示长度: {len(prompt)} 字符")
         print(f"发送优化翻译请求: {len(prompt)} 字符的提示")
         response, token_usage = await self._make_openai_request(
-            client.chat.completions.create,
+            get_async_client().chat.completions.create,
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a professional translator with expertise in multiple languages."},
@@ -584,8 +645,17 @@ async def translate_text(source_text: str, source_lang: str = "English",
         包含翻译结果和中间步骤的字典
     """
     logger.info(f"开始翻译文本: {source_lang} => {target_lang}, 使用模型: {model}")
-    agent = TranslationAgent(model=model, api_key=api_key)
-    result = await agent.translate(source_text, source_lang, target_lang, country, glossary)
+    loop = asyncio.get_running_loop()
+    _active_workflows[loop] = _active_workflows.get(loop, 0) + 1
+    try:
+        agent = TranslationAgent(model=model, api_key=api_key)
+        result = await agent.translate(source_text, source_lang, target_lang, country, glossary)
+    finally:
+        # 并发的翻译共享连接池；最后一个结束时关闭，避免事件循环结束时连接泄漏
+        _active_workflows[loop] -= 1
+        if not _active_workflows[loop]:
+            del _active_workflows[loop]
+            await close_async_client()
     logger.info(f"文本翻译完成: {len(source_text)} => {len(result['final_translation'])} 字符")
     return result
 
@@ -702,7 +772,7 @@ Be accurate but also natural and fluent. Maintain the same level of formality, t
             print(f"发送同步翻译请求到OpenAI API (尝试 {attempt+1}/{max_attempts})...")
             logger.info(f"发送同步翻译请求 (尝试 {attempt+1}/{max_attempts})")
             
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a professional translator."},
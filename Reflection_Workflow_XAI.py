@@ -11,7 +11,7 @@
 
 import os
 import json
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Callable, Optional, List, Tuple
 import httpx
 import time
 import random
@@ -19,6 +19,17 @@ import asyncio
 import logging
 import math
 import re  # Added for extracting translation markers
+import weakref
+
+from source_fingerprint import chain_version
+from token_counter import count_tokens
+from translation_memory import TranslationMemory, split_segments, join_segments, glossary_hash
+from glossary_matcher import GlossaryMatcher
+from markdown_chunker import CHUNK_TOKENS, chunk_markdown, chunk_context
+from translation_budget import TranslationBudget, Reservation
+from translation_pipeline import StagePipeline
+from translation_depth import DepthPolicy, SINGLE, FULL, skipped_tokens
+from markdown_masking import mask_markdown, unmask_markdown, has_placeholders, StreamingUnmasker
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -28,23 +39,142 @@ logger = logging.getLogger(__name__)
 XAI_API_KEY = "xai-Sz"
 XAI_BASE_URL = "https://api.x.ai/v1"
 
+# 长文档分块：每块的token预算和单个文档同时翻译的块数
+MAX_PARALLEL_CHUNKS = 4
+
+# 短字符串批量翻译：每个请求的字符串数和token预算
+BATCH_SIZE = 100
+BATCH_TOKENS = 3000
+
+# 流式响应（SSE）：边接收边处理，阶段3读到结束标记后立即停止
+STREAM_RESPONSES = True
+TRANSLATION_START = "<<<TRANSLATION>>>"
+TRANSLATION_END = "<<<END>>>"
+
+# HTTP连接池配置：所有阶段、文件和并发任务复用同一组到api.x.ai的连接
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=120.0)
+
+try:
+    import h2  # noqa: F401  httpx的HTTP/2支持依赖h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 每个事件循环一个共享客户端（AsyncClient的连接绑定在创建它的事件循环上）
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """获取当前事件循环的共享httpx客户端，不存在或已关闭时创建"""
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, http2=HTTP2_AVAILABLE)
+        _shared_clients[loop] = client
+        logger.info(f"创建共享HTTP客户端 (HTTP/2: {HTTP2_AVAILABLE})")
+    return client
+
+
+async def close_shared_client():
+    """关闭当前事件循环的共享客户端（在asyncio.run结束前调用）"""
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class MarkerStream:
+    """从流式输出中增量提取开始标记与结束标记之间的译文"""
+    
+    def __init__(self, start: str = TRANSLATION_START, end: str = TRANSLATION_END):
+        self.start = start
+        self.end = end
+        self.buffer = ""
+        self.started = False
+        self.done = False
+        self._leading = True
+    
+    def feed(self, delta: str) -> str:
+        """输入新的输出片段，返回可以确定属于译文的新文本"""
+        if self.done:
+            return ""
+        self.buffer += delta
+        if not self.started:
+            index = self.buffer.find(self.start)
+            if index == -1:
+                return ""
+            self.started = True
+            self.buffer = self.buffer[index + len(self.start):]
+        if self._leading:
+            self.buffer = self.buffer.lstrip()
+            if not self.buffer:
+                return ""
+            self._leading = False
+        
+        index = self.buffer.find(self.end)
+        if index != -1:
+            self.done = True
+            text, self.buffer = self.buffer[:index].rstrip(), ""
+            return text
+        
+        # 末尾可能是不完整的结束标记或结束前的空白，先留在缓冲区
+        ready = self.buffer[:max(len(self.buffer) - len(self.end) + 1, 0)].rstrip()
+        self.buffer = self.buffer[len(ready):]
+        return ready
+    
+    def flush(self) -> str:
+        """输出结束但没有出现结束标记（例如被stop序列截断）时，返回剩余译文"""
+        if not self.started or self.done:
+            return ""
+        self.done = True
+        text, self.buffer = self.buffer.rstrip(), ""
+        return text
+
 class TranslationAgent:
     """
     实现吴恩达的三阶段翻译工作流的翻译Agent
     修改版本：使用x.ai的grok模型
     """
     
-    def __init__(self, model: str = "grok-3-mini", api_key: Optional[str] = None):
+    def __init__(self, model: str = "grok-3-mini", api_key: Optional[str] = None,
+                 client: Optional[httpx.AsyncClient] = None, memory: Optional[TranslationMemory] = None,
+                 chunk_tokens: int = CHUNK_TOKENS, max_parallel_chunks: int = MAX_PARALLEL_CHUNKS,
+                 mask_regions: bool = True, stream: bool = STREAM_RESPONSES,
+                 adaptive_depth: bool = False, depth_policy: Optional[DepthPolicy] = None,
+                 budget: Optional[TranslationBudget] = None, priority: float = 0,
+                 pipeline: Optional[StagePipeline] = None):
         """
         初始化翻译Agent
         
         Args:
             model: 使用的模型名称（grok-3-mini或grok-3-latest）
             api_key: x.ai API密钥
+            client: 可选的httpx客户端；默认使用当前事件循环的共享连接池
+            memory: 可选的段落级翻译记忆；提供时只翻译新增或修改过的段落
+            chunk_tokens: 超过该token数的文档按段落/标题分块并发翻译
+            max_parallel_chunks: 单个文档同时翻译的块数
+            mask_regions: 是否用占位符屏蔽代码、链接、图片和HTML/JSX等不需要翻译的内容
+            stream: 是否使用流式响应（记录首token时间，阶段3读到结束标记即停止）
+            adaptive_depth: 是否按文本长度和复杂度自动选择单次翻译或完整三阶段工作流（默认总是完整三阶段）
+            depth_policy: 自适应深度的阈值配置，默认使用DepthPolicy()
+            budget: 整个运行共享的token/费用预算；接近上限时降级为单次翻译
+            priority: 预算排队时的优先级（数值越小越优先）
+            pipeline: 跨文件共享的阶段流水线；提供时各阶段请求交给对应阶段的worker执行
         """
         self.model = model
         self.api_key = api_key or XAI_API_KEY
         self.base_url = XAI_BASE_URL
+        self._client = client
+        self.memory = memory
+        self.chunk_tokens = chunk_tokens
+        self.max_parallel_chunks = max_parallel_chunks
+        self.mask_regions = mask_regions
+        self.stream = stream
+        self.depth_policy = (depth_policy or DepthPolicy()) if adaptive_depth else None
+        self.budget = budget
+        self.priority = priority
+        self.pipeline = pipeline
+        self._last_metrics: Dict[str, Any] = {}
         
         logger.info(f"初始化翻译Agent: 使用x.ai模型 {model}")
         
@@ -75,10 +205,29 @@ class TranslationAgent:
             "refined_translation": 0.0,
             "total": 0.0
         }
+        
+        # 各阶段首token时间和请求用时（秒）
+        self.latency = self._empty_latency()
+        
+        # 自适应深度统计：单次/完整工作流的次数，以及跳过的阶段节省的token和费用
+        self.depth_stats = self._empty_depth_stats()
+        
+        # 术语表筛选统计：注入的术语数和少发送的token
+        self.glossary_stats = self._empty_glossary_stats()
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """请求使用的httpx客户端"""
+        if self._client is not None and not self._client.is_closed:
+            return self._client
+        return get_shared_client()
     
     async def translate(self, source_text: str, source_lang: str = "English", 
                       target_lang: str = "Chinese", country: Optional[str] = None, 
-                      glossary: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                      glossary: Optional[Dict[str, str]] = None, use_memory: bool = True,
+                      context: Optional[str] = None, chunked: bool = True, mask: bool = True,
+                      on_text: Optional[Callable[[str], Any]] = None, depth: Optional[str] = None,
+                      reference: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         将文本从源语言翻译到目标语言
         
@@ -88,79 +237,120 @@ class TranslationAgent:
             target_lang: 目标语言
             country: 可选的国家/地区参数
             glossary: 可选的术语表
+            use_memory: 是否使用翻译记忆（仅在初始化时提供了memory时生效）
+            context: 相邻文本，仅作参考，不翻译
+            chunked: 是否对长文档分块并发翻译
+            mask: 是否屏蔽不需要翻译的内容（仅在mask_regions为True时生效）
+            on_text: 流式响应时逐段接收最终译文（整篇一次翻译时生效；分块和翻译记忆路径不调用），
+                     结果仍以返回值中的final_translation为准
+            depth: 强制使用的翻译深度（"single"或"full"）；默认由depth_policy决定
+            reference: 翻译记忆中相似段落的原文和译文（source/translation/score），作为初步翻译的参考
             
         Returns:
             包含翻译结果和中间步骤的字典
         """
+        if self.memory is not None and use_memory:
+            return await self._translate_with_memory(source_text, source_lang, target_lang, country, glossary)
+        if chunked and self._estimate_tokens(source_text) > self.chunk_tokens:
+            return await self._translate_chunked(source_text, source_lang, target_lang, country, glossary)
+        if mask and self.mask_regions:
+            masked_text, placeholders = mask_markdown(source_text)
+            if len(placeholders):
+                return await self._translate_masked(source_text, masked_text, placeholders, source_lang,
+                                                    target_lang, country, glossary, context, on_text,
+                                                    depth=depth, reference=reference)
+        
+        depth, depth_reason = self._choose_depth(source_text, depth, reference)
+        
         logger.info(f"开始翻译工作流: {source_lang} => {target_lang}")
         print(f"\n===== 开始吴恩达三阶段翻译工作流 (x.ai版本) =====")
         print(f"源语言: {source_lang} | 目标语言: {target_lang}" + (f" ({country})" if country else ""))
         print(f"文本长度: {len(source_text)} 字符")
+        print(f"翻译深度: {'单次翻译' if depth == SINGLE else '完整三阶段'} ({depth_reason})")
         text_preview = source_text[:100] + "..." if len(source_text) > 100 else source_text
         print(f"文本预览: {text_preview}")
         
         # 重置token统计和费用
         self._reset_stats()
         
+        # 只注入文本中出现的术语
+        glossary = self._relevant_glossary(source_text, glossary, requests=1 if depth == SINGLE else 3)
+        
         # 步骤1: 初步翻译
         print(f"\n[阶段 1/3] 初步翻译...")
         logger.info("阶段1: 开始初步翻译")
         start_time = time.time()
-        initial_translation, tokens_phase1 = await self._initial_translation(
-            source_text, source_lang, target_lang, country, glossary
+        initial_translation, tokens_phase1 = await self._run_stage(
+            "initial_translation", self._initial_translation,
+            source_text, source_lang, target_lang, country, glossary, context, reference
         )
         phase1_time = time.time() - start_time
         
         # 更新阶段1的token统计和费用
         self._update_stats("initial_translation", tokens_phase1)
+        self._record_latency("initial_translation")
         phase1_cost = self._calculate_cost(tokens_phase1)
         
         print(f"初步翻译完成: {len(initial_translation)} 字符")
-        print(f"阶段1用时: {phase1_time:.2f}秒")
+        print(f"阶段1用时: {phase1_time:.2f}秒 (首token: {self.latency['initial_translation']['ttft']:.2f}秒)")
         print(f"阶段1 Token使用: 输入 {tokens_phase1['input']} / 输出 {tokens_phase1['output']} = 总计 {tokens_phase1['input'] + tokens_phase1['output']} tokens")
         print(f"阶段1费用: ${phase1_cost:.4f} (约 ¥{phase1_cost * self.usd_to_cny:.2f})")
         logger.info(f"阶段1: 初步翻译完成 ({len(initial_translation)} 字符), Token: {tokens_phase1['input']}/{tokens_phase1['output']}, 费用: ${phase1_cost:.4f}")
         
-        # 步骤2: 反思评估
-        print(f"\n[阶段 2/3] 反思评估...")
-        logger.info("阶段2: 开始反思评估")
-        start_time = time.time()
-        reflection_result, tokens_phase2 = await self._reflection(
-            source_text, initial_translation, source_lang, target_lang, country, glossary
-        )
-        phase2_time = time.time() - start_time
-        
-        # 更新阶段2的token统计和费用
-        self._update_stats("reflection", tokens_phase2)
-        phase2_cost = self._calculate_cost(tokens_phase2)
-        
-        print(f"反思评估完成: {len(reflection_result)} 条建议")
-        for i, suggestion in enumerate(reflection_result, 1):
-            print(f"  建议 {i}: {suggestion[:100]}..." if len(suggestion) > 100 else f"  建议 {i}: {suggestion}")
-        print(f"阶段2用时: {phase2_time:.2f}秒")
-        print(f"阶段2 Token使用: 输入 {tokens_phase2['input']} / 输出 {tokens_phase2['output']} = 总计 {tokens_phase2['input'] + tokens_phase2['output']} tokens")
-        print(f"阶段2费用: ${phase2_cost:.4f} (约 ¥{phase2_cost * self.usd_to_cny:.2f})")
-        logger.info(f"阶段2: 反思评估完成 ({len(reflection_result)} 条建议), Token: {tokens_phase2['input']}/{tokens_phase2['output']}, 费用: ${phase2_cost:.4f}")
-        
-        # 步骤3: 优化翻译
-        print(f"\n[阶段 3/3] 优化翻译...")
-        logger.info("阶段3: 开始优化翻译")
-        start_time = time.time()
-        final_translation, tokens_phase3 = await self._refined_translation(
-            source_text, initial_translation, reflection_result, 
-            source_lang, target_lang, country, glossary
-        )
-        phase3_time = time.time() - start_time
+        self.depth_stats[depth] += 1
+        if depth == SINGLE:
+            # 初步译文即为最终译文，跳过反思和优化
+            reflection_result: List[str] = []
+            final_translation = initial_translation
+            phase2_time = phase3_time = 0.0
+            self._record_skipped(source_text, tokens_phase1)
+            if on_text:
+                on_text(final_translation)
+        else:
+            # 步骤2: 反思评估
+            print(f"\n[阶段 2/3] 反思评估...")
+            logger.info("阶段2: 开始反思评估")
+            start_time = time.time()
+            reflection_result, tokens_phase2 = await self._run_stage(
+                "reflection", self._reflection,
+                source_text, initial_translation, source_lang, target_lang, country, glossary, context
+            )
+            phase2_time = time.time() - start_time
+        
+            # 更新阶段2的token统计和费用
+            self._update_stats("reflection", tokens_phase2)
+            self._record_latency("reflection")
+            phase2_cost = self._calculate_cost(tokens_phase2)
+        
+            print(f"反思评估完成: {len(reflection_result)} 条建议")
+            for i, suggestion in enumerate(reflection_result, 1):
+                print(f"  建议 {i}: {suggestion[:100]}..." if len(suggestion) > 100 else f"  建议 {i}: {suggestion}")
+            print(f"阶段2用时: {phase2_time:.2f}秒 (首token: {self.latency['reflection']['ttft']:.2f}秒)")
+            print(f"阶段2 Token使用: 输入 {tokens_phase2['input']} / 输出 {tokens_phase2['output']} = 总计 {tokens_phase2['input'] + tokens_phase2['output']} tokens")
+            print(f"阶段2费用: ${phase2_cost:.4f} (约 ¥{phase2_cost * self.usd_to_cny:.2f})")
+            logger.info(f"阶段2: 反思评估完成 ({len(reflection_result)} 条建议), Token: {tokens_phase2['input']}/{tokens_phase2['output']}, 费用: ${phase2_cost:.4f}")
+        
+            # 步骤3: 优化翻译
+            print(f"\n[阶段 3/3] 优化翻译...")
+            logger.info("阶段3: 开始优化翻译")
+            start_time = time.time()
+            final_translation, tokens_phase3 = await self._run_stage(
+                "refined_translation", self._refined_translation,
+                source_text, initial_translation, reflection_result,
+                source_lang, target_lang, country, glossary, context, on_text
+            )
+            phase3_time = time.time() - start_time
         
-        # 更新阶段3的token统计和费用
-        self._update_stats("refined_translation", tokens_phase3)
-        phase3_cost = self._calculate_cost(tokens_phase3)
+            # 更新阶段3的token统计和费用
+            self._update_stats("refined_translation", tokens_phase3)
+            self._record_latency("refined_translation")
+            phase3_cost = self._calculate_cost(tokens_phase3)
         
-        print(f"优化翻译完成: {len(final_translation)} 字符")
-        print(f"阶段3用时: {phase3_time:.2f}秒")
-        print(f"阶段3 Token使用: 输入 {tokens_phase3['input']} / 输出 {tokens_phase3['output']} = 总计 {tokens_phase3['input'] + tokens_phase3['output']} tokens")
-        print(f"阶段3费用: ${phase3_cost:.4f} (约 ¥{phase3_cost * self.usd_to_cny:.2f})")
-        logger.info(f"阶段3: 优化翻译完成 ({len(final_translation)} 字符), Token: {tokens_phase3['input']}/{tokens_phase3['output']}, 费用: ${phase3_cost:.4f}")
+            print(f"优化翻译完成: {len(final_translation)} 字符")
+            print(f"阶段3用时: {phase3_time:.2f}秒 (首token: {self.latency['refined_translation']['ttft']:.2f}秒)")
+            print(f"阶段3 Token使用: 输入 {tokens_phase3['input']} / 输出 {tokens_phase3['output']} = 总计 {tokens_phase3['input'] + tokens_phase3['output']} tokens")
+            print(f"阶段3费用: ${phase3_cost:.4f} (约 ¥{phase3_cost * self.usd_to_cny:.2f})")
+            logger.info(f"阶段3: 优化翻译完成 ({len(final_translation)} 字符), Token: {tokens_phase3['input']}/{tokens_phase3['output']}, 费用: ${phase3_cost:.4f}")
         
         # 计算总体统计
         total_tokens = self.token_counts["total"]["input"] + self.token_counts["total"]["output"]
@@ -186,11 +376,517 @@ class TranslationAgent:
             "stats": {
                 "token_counts": self.token_counts,
                 "costs": self.costs,
+                "latency": self.latency,
+                "depth": self.depth_stats,
+                "glossary": self.glossary_stats,
                 "time": total_time,
                 "model": self.model
             }
         }
     
+    async def translate_batch(self, texts, source_lang: str = "English", target_lang: str = "Chinese",
+                              country: Optional[str] = None, glossary: Optional[Dict[str, str]] = None,
+                              batch_size: int = BATCH_SIZE, batch_tokens: int = BATCH_TOKENS) -> Dict[str, str]:
+        """
+        批量翻译标题、标签等短字符串（单次翻译，不做反思）
+        
+        多个字符串打包为一个请求，模型按ID返回JSON；缺失或无效的ID逐个重试。
+        
+        Args:
+            texts: 字符串列表，或 {ID: 字符串} 字典
+            batch_size: 每个请求最多包含的字符串数
+            batch_tokens: 每个请求中字符串的token预算
+            
+        Returns:
+            {原字符串（或ID）: 译文}；重试后仍失败的条目不包含在结果中
+        """
+        items = dict(texts) if isinstance(texts, dict) else {text: text for text in texts}
+        self._reset_stats()
+        start_time = time.time()
+        
+        # 相同的字符串只翻译一次
+        unique = list(dict.fromkeys(text for text in items.values() if text.strip()))
+        translations: Dict[str, str] = {}
+        
+        keys = {}
+        if self.memory is not None:
+            version = self.prompt_version()
+            for text in unique:
+                keys[text] = self.memory.make_key(text, source_lang, target_lang, country, glossary, self.model,
+                                                  self.depth_version(version, SINGLE))
+                row = self.memory.lookup(keys[text])
+                if row is not None:
+                    translations[text] = row["translation"]
+        pending = [text for text in unique if text not in translations]
+        
+        batches: List[List[str]] = []
+        batch_tokens_used = 0
+        for text in pending:
+            tokens = self._estimate_tokens(text)
+            if not batches or len(batches[-1]) >= batch_size or batch_tokens_used + tokens > batch_tokens:
+                batches.append([])
+                batch_tokens_used = 0
+            batches[-1].append(text)
+            batch_tokens_used += tokens
+        
+        print(f"📝 批量翻译 {len(unique)} 个字符串: 命中翻译记忆 {len(unique) - len(pending)} 个，"
+              f"其余分 {len(batches)} 个请求")
+        semaphore = asyncio.Semaphore(self.max_parallel_chunks)
+        
+        async def run(batch: List[str]) -> Dict[str, str]:
+            async with semaphore:
+                try:
+                    return await self._translate_batch_request(batch, source_lang, target_lang, country, glossary)
+                except Exception as e:
+                    logger.warning(f"批量翻译请求失败 ({len(batch)} 个字符串): {e}")
+                    return {}
+        
+        for result in await asyncio.gather(*(run(batch) for batch in batches)):
+            translations.update(result)
+        
+        # 缺失或无效的条目逐个重试
+        failed = [text for text in pending if text not in translations]
+        if failed:
+            print(f"🔁 {len(failed)} 个字符串未返回有效译文，逐个重试")
+            for result in await asyncio.gather(*(run([text]) for text in failed)):
+                translations.update(result)
+            still_failed = [text for text in failed if text not in translations]
+            if still_failed:
+                logger.error(f"{len(still_failed)} 个字符串翻译失败: {still_failed[:5]}")
+        
+        if self.memory is not None:
+            for text in pending:
+                if text in translations:
+                    self.memory.store(keys[text], text, translations[text], model=self.model)
+        
+        total_cost = self.costs["total"]
+        print(f"✅ 批量翻译完成: {len(translations)}/{len(unique)} 个字符串, 用时 {time.time() - start_time:.2f}秒, "
+              f"Token: 输入 {self.token_counts['total']['input']} / 输出 {self.token_counts['total']['output']}, "
+              f"费用: ${total_cost:.4f} (约 ¥{total_cost * self.usd_to_cny:.2f})")
+        return {key: translations[text] for key, text in items.items() if text in translations}
+    
+    async def _translate_batch_request(self, batch: List[str], source_lang: str, target_lang: str,
+                                       country: Optional[str], glossary: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """发送一个批量翻译请求，返回其中有效的译文"""
+        language_spec = f"{target_lang}"
+        if country:
+            language_spec += f" as colloquially spoken in {country}"
+        
+        # 只注入这一批字符串中出现的术语
+        glossary = self._relevant_glossary("\n".join(batch), glossary)
+        glossary_prompt = ""
+        if glossary:
+            glossary_prompt = "Please use the following glossary for consistency:\n"
+            for term, translation in glossary.items():
+                glossary_prompt += f"- {term}: {translation}\n"
+        
+        payload = json.dumps({str(i): text for i, text in enumerate(batch)}, ensure_ascii=False, indent=0)
+        prompt = f"""Translate each {source_lang} string in the JSON object below into {language_spec}.
+These are page titles, navigation labels and short descriptions from a documentation site; keep them concise.
+
+{glossary_prompt}
+Return ONLY a JSON object with exactly the same keys, where each value is the translation of the string with that key.
+
+{payload}"""
+        
+        messages = [
+            {"role": "system", "content": "You are a professional translator. You always answer with valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        response, token_usage = await self._make_xai_request(
+            messages, stream=False, response_format={"type": "json_object"}
+        )
+        self._add_stats("initial_translation", token_usage)
+        
+        content = response["choices"][0]["message"]["content"].strip()
+        # 去掉可能的 ```json 代码块包裹
+        content = re.sub(r'^```(?:json)?\s*|\s*```$', '', content)
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            logger.warning(f"批量翻译返回的不是有效JSON ({len(batch)} 个字符串)")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        
+        translations = {}
+        for i, text in enumerate(batch):
+            value = data.get(str(i))
+            if isinstance(value, str) and value.strip():
+                translations[text] = value.strip()
+        return translations
+    
+    _prompt_version: Optional[str] = None
+    
+    @classmethod
+    def prompt_version(cls) -> str:
+        """
+        三个阶段提示词的版本指纹；修改任一阶段的提示词，
+        或拼进提示词的上下文/参考译文/占位符说明，都会让旧的翻译记忆失效
+        """
+        if cls._prompt_version is None:
+            cls._prompt_version = chain_version(
+                cls._initial_translation, cls._reflection, cls._refined_translation,
+                cls._context_prompt, cls._reference_prompt, cls._placeholder_prompt
+            )
+        return cls._prompt_version
+    
+    @staticmethod
+    def depth_version(version: str, depth: str) -> str:
+        """翻译记忆键中的版本：单次翻译和完整三阶段的结果分开存储，低质量的单次译文不会顶替完整译文"""
+        return f"{version}:{depth}"
+    
+    async def _translate_masked(self, source_text: str, masked_text: str, placeholders, source_lang: str,
+                                target_lang: str, country: Optional[str], glossary: Optional[Dict[str, str]],
+                                context: Optional[str],
+                                on_text: Optional[Callable[[str], Any]] = None, depth: Optional[str] = None,
+                                reference: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """翻译屏蔽后的文本并恢复占位符；占位符丢失时不屏蔽重新翻译"""
+        saved_tokens = self._estimate_tokens(source_text) - self._estimate_tokens(masked_text)
+        print(f"🛡️ 屏蔽 {len(placeholders)} 处代码/链接/标签，每个阶段约少发送 {saved_tokens} tokens")
+        
+        unmasker = StreamingUnmasker(placeholders) if on_text else None
+        result = await self.translate(masked_text, source_lang, target_lang, country, glossary,
+                                      use_memory=False, context=context, chunked=False, mask=False,
+                                      on_text=(lambda text: on_text(unmasker.feed(text))) if on_text else None,
+                                      depth=depth, reference=reference)
+        if unmasker is not None:
+            rest = unmasker.flush()
+            if rest:
+                on_text(rest)
+        final_translation, problems = unmask_markdown(result["final_translation"], placeholders)
+        if problems:
+            logger.warning(f"占位符校验失败，改为不屏蔽重新翻译: {problems[:3]}")
+            print(f"⚠️ 占位符校验失败 ({len(problems)} 处)，改为不屏蔽重新翻译")
+            return await self.translate(source_text, source_lang, target_lang, country, glossary,
+                                        use_memory=False, context=context, chunked=False, mask=False,
+                                        depth=depth, reference=reference)
+        
+        result["source_text"] = source_text
+        result["final_translation"] = final_translation
+        result["initial_translation"] = unmask_markdown(result["initial_translation"], placeholders)[0]
+        result["stats"]["masked"] = {"placeholders": len(placeholders), "saved_tokens_per_stage": saved_tokens}
+        return result
+    
+    @staticmethod
+    def _context_prompt(context: Optional[str]) -> str:
+        """分块翻译时附加的相邻文本提示"""
+        if not context:
+            return ""
+        return ("The text below is one part of a longer document. The surrounding text is given "
+                "for reference only; do not translate it and do not include it in your answer.\n\n"
+                f"{context}\n")
+    
+    @staticmethod
+    def _reference_prompt(reference: Optional[Dict[str, Any]]) -> str:
+        """翻译记忆中相似段落的已审定译文"""
+        if not reference:
+            return ""
+        return ("A previously approved translation of a very similar text is given below. Reuse its wording "
+                "and terminology wherever the source text is unchanged.\n\n"
+                f"SIMILAR SOURCE:\n{reference['source']}\n\nAPPROVED TRANSLATION:\n{reference['translation']}\n")
+    
+    @staticmethod
+    def _placeholder_prompt(source_text: str) -> str:
+        """文本中有屏蔽占位符时，要求模型原样保留"""
+        if not has_placeholders(source_text):
+            return ""
+        return ("Markers like ⟦0⟧ stand for code, links, or markup that must not be translated. "
+                "Keep every marker exactly as written, in the matching position, and do not add new ones.\n")
+    
+    def _child(self) -> "TranslationAgent":
+        """共享模型、密钥和连接池的子Agent，用于并发翻译各个部分（各自统计token）"""
+        return TranslationAgent(self.model, self.api_key, self._client,
+                                chunk_tokens=self.chunk_tokens, max_parallel_chunks=self.max_parallel_chunks,
+                                mask_regions=self.mask_regions, stream=self.stream,
+                                adaptive_depth=self.depth_policy is not None, depth_policy=self.depth_policy,
+                                budget=self.budget, priority=self.priority, pipeline=self.pipeline)
+    
+    def _merge_stats(self, results: List[Dict[str, Any]]):
+        """把各部分的token和费用累加到当前Agent"""
+        self._reset_stats()
+        for result in results:
+            for phase, counts in result["stats"]["token_counts"].items():
+                self.token_counts[phase]["input"] += counts["input"]
+                self.token_counts[phase]["output"] += counts["output"]
+            for phase, cost in result["stats"]["costs"].items():
+                self.costs[phase] += cost
+            for key, value in result["stats"].get("glossary", {}).items():
+                self.glossary_stats[key] += value
+            depth = result["stats"].get("depth")
+            if depth:
+                self.depth_stats[SINGLE] += depth[SINGLE]
+                self.depth_stats[FULL] += depth[FULL]
+                self.depth_stats["saved_tokens"]["input"] += depth["saved_tokens"]["input"]
+                self.depth_stats["saved_tokens"]["output"] += depth["saved_tokens"]["output"]
+                self.depth_stats["saved_cost"] += depth["saved_cost"]
+            # 并发的各部分：首token取最早的，用时取最长的
+            for phase, timing in result["stats"].get("latency", {}).items():
+                merged = self.latency[phase]
+                if timing["ttft"] and (not merged["ttft"] or timing["ttft"] < merged["ttft"]):
+                    merged["ttft"] = timing["ttft"]
+                merged["elapsed"] = max(merged["elapsed"], timing["elapsed"])
+    
+    async def _translate_chunked(self, source_text: str, source_lang: str, target_lang: str,
+                                 country: Optional[str], glossary: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        长文档分块翻译：按标题/段落切成不超过chunk_tokens的块，
+        各块带着相邻上下文并发执行三阶段工作流，再无损拼接
+        """
+        start_time = time.time()
+        chunks = chunk_markdown(source_text, self.chunk_tokens, self._estimate_tokens)
+        if len(chunks) <= 1:
+            return await self.translate(source_text, source_lang, target_lang, country, glossary,
+                                        use_memory=False, chunked=False)
+        
+        print(f"📦 文档约 {self._estimate_tokens(source_text)} tokens，分为 {len(chunks)} 块并发翻译 "
+              f"(每块 ≤ {self.chunk_tokens} tokens，并发 {self.max_parallel_chunks})")
+        semaphore = asyncio.Semaphore(self.max_parallel_chunks)
+        
+        async def translate_chunk(index: int) -> Dict[str, Any]:
+            start, end = chunks[index]
+            async with semaphore:
+                return await self._child().translate(
+                    source_text[start:end], source_lang, target_lang, country, glossary,
+                    use_memory=False, context=chunk_context(source_text, chunks, index), chunked=False
+                )
+        
+        results = await asyncio.gather(*(translate_chunk(i) for i in range(len(chunks))))
+        self._merge_stats(results)
+        
+        return {
+            "source_text": source_text,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "country": country,
+            "initial_translation": join_segments(source_text, chunks, [r["initial_translation"] for r in results]),
+            "reflection": [suggestion for r in results for suggestion in r["reflection"]],
+            "final_translation": join_segments(source_text, chunks, [r["final_translation"] for r in results]),
+            "stats": {
+                "token_counts": self.token_counts,
+                "costs": self.costs,
+                "latency": self.latency,
+                "depth": self.depth_stats,
+                "glossary": self.glossary_stats,
+                "time": time.time() - start_time,
+                "model": self.model,
+                "chunks": len(chunks),
+            }
+        }
+    
+    @staticmethod
+    def _split_like(text: str, count: int) -> Optional[List[str]]:
+        """把译文按段落切分；段落数与原文不一致时返回None"""
+        spans = split_segments(text)
+        if len(spans) != count:
+            return None
+        return [text[start:end] for start, end in spans]
+    
+    async def _translate_with_memory(self, source_text: str, source_lang: str, target_lang: str,
+                                     country: Optional[str], glossary: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        段落级翻译：命中翻译记忆的段落直接复用，
+        连续的未命中段落合并为一次三阶段工作流调用
+        """
+        start_time = time.time()
+        spans = split_segments(source_text)
+        segments = [source_text[start:end] for start, end in spans]
+        version = self.prompt_version()
+        keys = self._memory_keys(segments, source_lang, target_lang, country, glossary)
+        rows = [self.memory.lookup(*self._lookup_keys(keys, i, segment)) for i, segment in enumerate(segments)]
+        scope = self.memory.make_scope(source_lang, target_lang, country, glossary, self.model, version)
+        
+        # 连续的未命中段落合并成一次请求，保留上下文
+        runs = self._miss_runs([row is None for row in rows])
+        
+        hit_count = len(segments) - sum(len(run) for run in runs)
+        print(f"🧠 翻译记忆命中 {hit_count}/{len(segments)} 个段落，需要翻译 {len(runs)} 段连续内容")
+        
+        # 替换位置和内容：(start, end) -> (最终译文, 初步译文)
+        replacements = {}
+        for span, row in zip(spans, rows):
+            if row is not None:
+                replacements[span] = (row["translation"], row["initial_translation"] or row["translation"])
+        
+        # 单个段落的未命中内容查找相似的已翻译段落，作为参考并允许单次翻译
+        references: List[Optional[Dict[str, Any]]] = []
+        for run in runs:
+            reference = None
+            if self.depth_policy is not None and len(run) == 1:
+                row, score = self.memory.fuzzy_lookup(segments[run[0]], scope, self.depth_policy.fuzzy_threshold)
+                if row is not None:
+                    reference = {"source": row["source"], "translation": row["translation"], "score": score}
+            references.append(reference)
+        fuzzy_count = sum(1 for reference in references if reference)
+        if fuzzy_count:
+            print(f"🔍 {fuzzy_count} 个段落在翻译记忆中找到相似译文")
+        
+        # 各段未命中内容并发翻译（长内容在子Agent中继续分块）
+        run_spans = [(spans[run[0]][0], spans[run[-1]][1]) for run in runs]
+        results = await asyncio.gather(*(
+            self._child().translate(source_text[start:end], source_lang, target_lang, country, glossary,
+                                    use_memory=False, reference=reference)
+            for (start, end), reference in zip(run_spans, references)
+        ))
+        reflection: List[str] = [suggestion for result in results for suggestion in result["reflection"]]
+        
+        for run, run_span, result in zip(runs, run_spans, results):
+            run_source = source_text[run_span[0]:run_span[1]]
+            run_tokens = result["stats"]["token_counts"]["total"]
+            # 只要有一部分是单次翻译，整段按单次翻译存储
+            run_depth = SINGLE if result["stats"]["depth"][SINGLE] else FULL
+            finals = self._split_like(result["final_translation"], len(run))
+            initials = self._split_like(result["initial_translation"], len(run)) or [None] * len(run)
+            if finals is None:
+                # 译文段落数与原文不一致：整段使用，不写入翻译记忆
+                logger.warning(f"译文段落数与原文不一致，{len(run)} 个段落不写入翻译记忆")
+                replacements[run_span] = (result["final_translation"], result["initial_translation"])
+                continue
+            
+            for i, final, initial in zip(run, finals, initials):
+                share = len(segments[i]) / max(len(run_source), 1)
+                self.memory.store(
+                    keys[run_depth][i], segments[i], final, initial, result["reflection"],
+                    {"input": round(run_tokens["input"] * share), "output": round(run_tokens["output"] * share)},
+                    self.model, scope,
+                )
+                replacements[spans[i]] = (final, initial or final)
+        
+        ordered = sorted(replacements)
+        final_translation = join_segments(source_text, ordered, [replacements[span][0] for span in ordered])
+        initial_translation = join_segments(source_text, ordered, [replacements[span][1] for span in ordered])
+        
+        self._merge_stats(results)
+        total_time = time.time() - start_time
+        if not runs:
+            print(f"✅ 全部段落命中翻译记忆，未调用x.ai API")
+        
+        return {
+            "source_text": source_text,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "country": country,
+            "initial_translation": initial_translation,
+            "reflection": reflection,
+            "final_translation": final_translation,
+            "stats": {
+                "token_counts": self.token_counts,
+                "costs": self.costs,
+                "latency": self.latency,
+                "depth": self.depth_stats,
+                "glossary": self.glossary_stats,
+                "time": total_time,
+                "model": self.model,
+                "memory": {"segments": len(segments), "hits": hit_count},
+            }
+        }
+    
+    def _memory_keys(self, segments: List[str], source_lang: str, target_lang: str, country: Optional[str],
+                     glossary: Optional[Dict[str, str]]) -> Dict[str, List[str]]:
+        """各段落在翻译记忆中的键: {深度: [键]}"""
+        version = self.prompt_version()
+        return {
+            depth: [
+                TranslationMemory.make_key(segment, source_lang, target_lang, country, glossary, self.model,
+                                           self.depth_version(version, depth))
+                for segment in segments
+            ]
+            for depth in (FULL, SINGLE)
+        }
+    
+    def _lookup_keys(self, keys: Dict[str, List[str]], index: int, segment: str) -> List[str]:
+        """
+        一个段落依次查找的键：优先使用完整三阶段的译文，单次译文只在当前策略本来就会选择单次翻译时复用
+        （预算降级时产生的单次译文不会在正常运行中被当作最终结果）
+        """
+        if self._reuses_single(segment):
+            return [keys[FULL][index], keys[SINGLE][index]]
+        return [keys[FULL][index]]
+    
+    @staticmethod
+    def _miss_runs(missing: List[bool]) -> List[List[int]]:
+        """连续的未命中段落序号"""
+        runs: List[List[int]] = []
+        for i, miss in enumerate(missing):
+            if miss:
+                if runs and runs[-1][-1] == i - 1:
+                    runs[-1].append(i)
+                else:
+                    runs.append([i])
+        return runs
+    
+    @staticmethod
+    def _empty_latency() -> Dict[str, Dict[str, float]]:
+        return {phase: {"ttft": 0.0, "elapsed": 0.0}
+                for phase in ("initial_translation", "reflection", "refined_translation")}
+    
+    @staticmethod
+    def _empty_glossary_stats() -> Dict[str, int]:
+        return {"terms": 0, "injected": 0, "saved_tokens": 0}
+    
+    @staticmethod
+    def _empty_depth_stats() -> Dict[str, Any]:
+        return {SINGLE: 0, FULL: 0, "saved_tokens": {"input": 0, "output": 0}, "saved_cost": 0.0}
+    
+    _matchers: Dict[str, GlossaryMatcher] = {}
+    
+    def _relevant_glossary(self, text: str, glossary: Optional[Dict[str, str]],
+                           requests: int = 1) -> Optional[Dict[str, str]]:
+        """
+        只保留text中出现的术语（Aho-Corasick匹配），并记录少发送的token
+        
+        requests为使用该术语表的请求数（完整工作流的三个阶段各注入一次）
+        """
+        if not glossary:
+            return glossary
+        key = glossary_hash(glossary)
+        matcher = TranslationAgent._matchers.get(key)
+        if matcher is None:
+            matcher = TranslationAgent._matchers[key] = GlossaryMatcher(glossary)
+        relevant = matcher.filter(text)
+        
+        saved = sum(self._estimate_tokens(f"- {term}: {translation}\n")
+                    for term, translation in glossary.items() if term not in relevant) * requests
+        self.glossary_stats["terms"] += len(glossary)
+        self.glossary_stats["injected"] += len(relevant)
+        self.glossary_stats["saved_tokens"] += saved
+        if len(relevant) < len(glossary):
+            print(f"📖 术语表: 注入 {len(relevant)}/{len(glossary)} 个出现的术语，约少发送 {saved} tokens")
+        return relevant
+    
+    def _choose_depth(self, source_text: str, depth: Optional[str],
+                      reference: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        """确定翻译深度，返回(深度, 原因)"""
+        if depth is not None:
+            return depth, "指定"
+        if self.budget is not None and self.budget.degraded:
+            return SINGLE, "预算接近上限"
+        if self.depth_policy is None:
+            return FULL, "未启用自适应深度"
+        score = reference["score"] if reference else None
+        return self.depth_policy.choose(source_text, self._estimate_tokens(source_text), score)
+    
+    def _reuses_single(self, segment: str) -> bool:
+        """翻译记忆中的单次译文是否可以直接复用（自适应深度对该段落会选择单次翻译）"""
+        if self.depth_policy is None:
+            return False
+        return self.depth_policy.choose(segment, self._estimate_tokens(segment))[0] == SINGLE
+    
+    def _record_skipped(self, source_text: str, tokens_phase1: Dict[str, int]):
+        """按估算值记录单次翻译跳过的两个阶段节省的token和费用"""
+        saved = skipped_tokens(self._estimate_tokens(source_text), tokens_phase1["output"])
+        saved_cost = self._calculate_cost(saved)
+        self.depth_stats["saved_tokens"]["input"] += saved["input"]
+        self.depth_stats["saved_tokens"]["output"] += saved["output"]
+        self.depth_stats["saved_cost"] += saved_cost
+        print(f"⏭️ 跳过反思和优化阶段，约节省 {saved['input'] + saved['output']} tokens (${saved_cost:.4f})")
+    
+    def _record_latency(self, phase: str):
+        """记录最近一次请求的首token时间和用时"""
+        self.latency[phase] = {"ttft": self._last_metrics.get("ttft", 0.0),
+                               "elapsed": self._last_metrics.get("elapsed", 0.0)}
+    
     def _reset_stats(self):
         """重置token统计和费用"""
         self.token_counts = {
@@ -206,6 +902,10 @@ class TranslationAgent:
             "refined_translation": 0.0,
             "total": 0.0
         }
+        
+        self.latency = self._empty_latency()
+        self.depth_stats = self._empty_depth_stats()
+        self.glossary_stats = self._empty_glossary_stats()
     
     def _update_stats(self, phase: str, tokens: Dict[str, int]):
         """更新统计数据"""
@@ -219,6 +919,16 @@ class TranslationAgent:
         self.costs[phase] = cost
         self.costs["total"] += cost
     
+    def _add_stats(self, phase: str, tokens: Dict[str, int]):
+        """累加同一阶段的多次请求（批量翻译）"""
+        self.token_counts[phase]["input"] += tokens["input"]
+        self.token_counts[phase]["output"] += tokens["output"]
+        self.token_counts["total"]["input"] += tokens["input"]
+        self.token_counts["total"]["output"] += tokens["output"]
+        cost = self._calculate_cost(tokens)
+        self.costs[phase] += cost
+        self.costs["total"] += cost
+    
     def _calculate_cost(self, tokens: Dict[str, int]) -> float:
         """计算给定token数量的费用（美元）"""
         model_price = self.model_prices.get(
@@ -232,65 +942,82 @@ class TranslationAgent:
         return input_cost + output_cost
     
     def _estimate_tokens(self, text: str) -> int:
-        """估算文本中的token数量（粗略估计）"""
-        chars = len(text)
-        return math.ceil(chars / 3)
+        """文本的token数量（有tiktoken时精确计数，否则按字符类别估算）"""
+        return count_tokens(text)
     
-    async def _make_xai_request(self, messages, **kwargs):
+    async def _make_xai_request(self, messages, stream: Optional[bool] = None,
+                                stop_marker: Optional[str] = None,
+                                on_text: Optional[Callable[[str], Any]] = None, **kwargs):
         """
         发送请求到x.ai API
         
         Args:
             messages: 消息列表
+            stream: 是否使用流式响应；默认取Agent的stream设置
+            stop_marker: 流式响应中读到该标记后停止接收（同时作为stop序列发送）
+            on_text: 流式响应时，每收到一段开始/结束标记之间的译文就调用一次
             **kwargs: 其他参数
             
         Returns:
-            API响应和token使用统计
+            API响应和token使用统计；响应中的metrics记录首token时间(ttft)和总用时
         """
         max_retries = 5
         initial_retry_delay = 3
         max_retry_delay = 60
+        stream = self.stream if stream is None else stream
         
         for attempt in range(max_retries):
+            delivered = False
+            reservation = await self._reserve_budget(messages)
             try:
                 print(f"发送请求到x.ai API (尝试 {attempt+1}/{max_retries})...")
                 logger.info(f"向x.ai发送请求 (尝试 {attempt+1}/{max_retries})")
                 start_time = time.time()
                 
-                # 创建httpx客户端
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    # 构建请求数据
-                    request_data = {
-                        "model": self.model,
-                        "messages": messages,
-                        "temperature": 0.3,  # 翻译任务使用较低的temperature
-                        **kwargs
-                    }
+                # 构建请求数据
+                request_data = {
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": 0.3,  # 翻译任务使用较低的temperature
+                    **kwargs
+                }
+                
+                if stream:
+                    def deliver(text: str):
+                        nonlocal delivered
+                        delivered = True
+                        on_text(text)
                     
-                    # 发送请求
-                    response = await client.post(
+                    result = await self._stream_chat(request_data, start_time, stop_marker,
+                                                     deliver if on_text else None)
+                else:
+                    # 发送请求（复用连接池中的keep-alive连接）
+                    response = await self.client.post(
                         f"{self.base_url}/chat/completions",
                         json=request_data,
-                        headers={
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json"
-                        }
+                        headers=self._headers()
                     )
                     
                     response.raise_for_status()
                     result = response.json()
+                    elapsed = time.time() - start_time
+                    result["metrics"] = {"ttft": elapsed, "elapsed": elapsed, "stopped_early": False}
                 
-                elapsed_time = time.time() - start_time
-                print(f"请求成功, 用时: {elapsed_time:.2f}秒")
+                elapsed_time = result["metrics"]["elapsed"]
+                self._last_metrics = result["metrics"]
+                print(f"请求成功, 用时: {elapsed_time:.2f}秒" +
+                      (f", 首token: {result['metrics']['ttft']:.2f}秒" if stream else ""))
                 
                 # 提取token使用情况
-                usage = result.get("usage", {})
+                usage = result.get("usage") or {}
                 token_usage = {
                     "input": usage.get("prompt_tokens", 0),
                     "output": usage.get("completion_tokens", 0)
                 }
                 
                 logger.info(f"x.ai请求成功, 用时: {elapsed_time:.2f}秒, Token使用: {token_usage}")
+                if reservation is not None:
+                    self.budget.record(reservation, token_usage, self._calculate_cost(token_usage))
                 return result, token_usage
                 
             except httpx.HTTPStatusError as e:
@@ -308,10 +1035,11 @@ class TranslationAgent:
                     logger.error(f"HTTP错误: {e.response.status_code} - {e.response.text}")
                     raise
                     
-            except (httpx.ConnectError, httpx.TimeoutException) as e:
-                if attempt + 1 == max_retries:
-                    print(f"达到最大重试次数，错误: {str(e)}")
-                    logger.error(f"达到最大重试次数: {str(e)}")
+            except (httpx.ConnectError, httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+                # 译文已经部分交给on_text时不能重来，否则调用方会收到重复内容
+                if attempt + 1 == max_retries or delivered:
+                    print(f"达到最大重试次数，错误: {str(e)}" if not delivered else f"流式响应中断: {str(e)}")
+                    logger.error(f"达到最大重试次数: {str(e)}" if not delivered else f"流式响应中断: {str(e)}")
                     raise
                 
                 delay = min(initial_retry_delay * (2 ** attempt) + random.uniform(0, 1), max_retry_delay)
@@ -324,9 +1052,110 @@ class TranslationAgent:
                 print(f"API请求出现意外错误: {str(e)}")
                 logger.error(f"API请求意外错误: {str(e)}")
                 raise
+            
+            finally:
+                if reservation is not None:
+                    self.budget.release(reservation)
+    
+    async def _run_stage(self, stage: str, func, *args):
+        """执行一个阶段；有流水线时交给该阶段的worker（可能排队等待）"""
+        if self.pipeline is None:
+            return await func(*args)
+        return await self.pipeline.submit(stage, lambda: func(*args))
+    
+    async def _reserve_budget(self, messages) -> Optional[Reservation]:
+        """按提示词长度估算本次请求的token和费用，在预算中占位（可能排队等待）"""
+        if self.budget is None:
+            return None
+        input_tokens = sum(self._estimate_tokens(message["content"]) for message in messages)
+        estimate = {"input": input_tokens, "output": input_tokens // 2}
+        return await self.budget.acquire(estimate["input"] + estimate["output"], self._calculate_cost(estimate),
+                                         self.priority)
+    
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    async def _stream_chat(self, request_data: Dict[str, Any], start_time: float,
+                           stop_marker: Optional[str] = None,
+                           on_text: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+        """
+        以SSE方式请求chat completions，返回与非流式响应相同结构的结果
+        
+        读到stop_marker后立即停止接收，不再为结束标记之后的输出等待；
+        stop_marker同时作为stop序列发送，服务端也会停止生成。
+        """
+        request_data = {**request_data, "stream": True, "stream_options": {"include_usage": True}}
+        if stop_marker:
+            request_data["stop"] = [stop_marker]
+        markers = MarkerStream(end=stop_marker) if stop_marker else None
+        
+        parts: List[str] = []
+        usage = None
+        finish_reason = None
+        ttft = None
+        stopped_early = False
+        
+        async with self.client.stream("POST", f"{self.base_url}/chat/completions",
+                                      json=request_data, headers=self._headers()) as response:
+            if response.status_code >= 400:
+                await response.aread()
+            response.raise_for_status()
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or []:
+                    finish_reason = choice.get("finish_reason") or finish_reason
+                    delta = (choice.get("delta") or {}).get("content")
+                    if not delta:
+                        continue
+                    if ttft is None:
+                        ttft = time.time() - start_time
+                    parts.append(delta)
+                    if markers is not None:
+                        text = markers.feed(delta)
+                        if text and on_text:
+                            on_text(text)
+                if markers is not None and markers.done:
+                    # 结束标记之后的内容都会被丢弃，不再等待
+                    stopped_early = True
+                    break
+        
+        content = "".join(parts)
+        if stop_marker and markers.started and stop_marker not in content and finish_reason == "stop":
+            # stop序列不会出现在输出中，补回以便统一按标记提取
+            content += stop_marker
+            text = markers.flush()
+            if text and on_text:
+                on_text(text)
+        elapsed = time.time() - start_time
+        
+        if usage is None:
+            # 提前停止时收不到最后的usage数据，按字符数估算
+            usage = {
+                "prompt_tokens": self._estimate_tokens("".join(m["content"] for m in request_data["messages"])),
+                "completion_tokens": self._estimate_tokens(content),
+            }
+        
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+            "usage": usage,
+            "metrics": {"ttft": ttft if ttft is not None else elapsed, "elapsed": elapsed,
+                        "stopped_early": stopped_early},
+        }
     
     async def _initial_translation(self, source_text: str, source_lang: str, target_lang: str,
-                                 country: Optional[str], glossary: Optional[Dict[str, str]]) -> Tuple[str, Dict[str, int]]:
+                                 country: Optional[str], glossary: Optional[Dict[str, str]],
+                                 context: Optional[str] = None,
+                                 reference: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, int]]:
         """第一阶段：完成初步翻译"""
         language_spec = f"{target_lang}"
         if country:
@@ -342,6 +1171,9 @@ class TranslationAgent:
         prompt = f"""Translate the following {source_lang} text into {language_spec}. 
 
 {glossary_prompt}
+{self._context_prompt(context)}
+{self._reference_prompt(reference)}
+{self._placeholder_prompt(source_text)}
 
 Be accurate but also natural and fluent. Maintain the same level of formality, tone, and style as the original.
 
@@ -365,7 +1197,8 @@ Be accurate but also natural and fluent. Maintain the same level of formality, t
         return translation, token_usage
     
     async def _reflection(self, source_text: str, initial_translation: str, source_lang: str,
-                        target_lang: str, country: Optional[str], glossary: Optional[Dict[str, str]]) -> Tuple[List[str], Dict[str, int]]:
+                        target_lang: str, country: Optional[str], glossary: Optional[Dict[str, str]],
+                        context: Optional[str] = None) -> Tuple[List[str], Dict[str, int]]:
         """第二阶段：反思评估"""
         language_spec = f"{target_lang}"
         if country:
@@ -380,6 +1213,8 @@ Be accurate but also natural and fluent. Maintain the same level of formality, t
         prompt = f"""You are given a source text in {source_lang} and its initial translation into {language_spec}.
 
 {glossary_prompt}
+{self._context_prompt(context)}
+{self._placeholder_prompt(source_text)}
 
 Please identify 3-5 concrete ways in which the translation could be improved. Focus on:
 1. Accuracy: Does the translation correctly convey all the information?
@@ -426,8 +1261,10 @@ IMPROVEMENT SUGGESTIONS:"""
     async def _refined_translation(self, source_text: str, initial_translation: str, 
                                  reflection: List[str], source_lang: str,
                                  target_lang: str, country: Optional[str], 
-                                 glossary: Optional[Dict[str, str]]) -> Tuple[str, Dict[str, int]]:
-        """第三阶段：优化翻译"""
+                                 glossary: Optional[Dict[str, str]],
+                                 context: Optional[str] = None,
+                                 on_text: Optional[Callable[[str], Any]] = None) -> Tuple[str, Dict[str, int]]:
+        """第三阶段：优化翻译（流式响应时读到结束标记即停止，并把译文逐段交给on_text）"""
         language_spec = f"{target_lang}"
         if country:
             language_spec += f" as colloquially spoken in {country}"
@@ -443,6 +1280,8 @@ IMPROVEMENT SUGGESTIONS:"""
         prompt = f"""Based on the following reflection suggestions, please improve the translation from {source_lang} to {language_spec}.
 
 {glossary_prompt}
+{self._context_prompt(context)}
+{self._placeholder_prompt(source_text)}
 
 {source_lang} SOURCE:
 {source_text}
@@ -455,7 +1294,7 @@ IMPROVEMENT SUGGESTIONS:
 
 Please provide an improved translation that addresses the suggestions above. Make sure the translation is accurate, natural, and maintains the appropriate tone and style.
 
-CRITICAL REQUIREMENT: Return ONLY the improved {target_lang} translation. Do not include any commentary, explanations, or improvement notes. Wrap the final translation between <<<TRANSLATION>>> and <<<END>>> tags.
+CRITICAL REQUIREMENT: Return ONLY the improved {target_lang} translation. Do not include any commentary, explanations, or improvement notes. Wrap the final translation between {TRANSLATION_START} and {TRANSLATION_END} tags.
 
 IMPROVED {target_lang} TRANSLATION:"""
         
@@ -467,11 +1306,12 @@ IMPROVED {target_lang} TRANSLATION:"""
             {"role": "user", "content": prompt}
         ]
         
-        response, token_usage = await self._make_xai_request(messages)
+        response, token_usage = await self._make_xai_request(messages, stop_marker=TRANSLATION_END, on_text=on_text)
         refined_translation_raw = response["choices"][0]["message"]["content"].strip()
         
         # Extract the translation between markers if present
-        marker_match = re.search(r"<<<TRANSLATION>>>\s*(.*?)\s*<<<END>>>", refined_translation_raw, flags=re.DOTALL)
+        marker_match = re.search(rf"{re.escape(TRANSLATION_START)}\s*(.*?)\s*{re.escape(TRANSLATION_END)}",
+                                 refined_translation_raw, flags=re.DOTALL)
         if marker_match:
             refined_translation = marker_match.group(1).strip()
             logger.info(f"阶段3: 成功提取标记内译文，长度: {len(refined_translation)} 字符")
@@ -488,20 +1328,79 @@ IMPROVED {target_lang} TRANSLATION:"""
         logger.info(f"阶段3: 优化翻译响应长度: {len(refined_translation)} 字符, Token使用: {token_usage}")
         return refined_translation, token_usage
 
+    async def repair_terms(self, source_text: str, translation: str, terms: Dict[str, str],
+                           source_lang: str = "English", target_lang: str = "Chinese",
+                           context: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+        """术语修复：单次请求，只把译文中的指定术语改为术语表的译法，其余内容保持不变"""
+        terms_prompt = "\n".join(f"- {term}: {required}" for term, required in terms.items())
+        prompt = f"""The {target_lang} translation below does not use the required translations for some glossary terms.
+
+REQUIRED TERMS:
+{terms_prompt}
+{self._context_prompt(context)}
+
+{source_lang} SOURCE:
+{source_text}
+
+CURRENT TRANSLATION:
+{translation}
+
+Rewrite the translation so every term above uses its required translation. Change only what is needed for these terms; keep all other wording, Markdown, links and code exactly as they are.
+
+CRITICAL REQUIREMENT: Return ONLY the corrected {target_lang} translation, wrapped between {TRANSLATION_START} and {TRANSLATION_END} tags.
+
+CORRECTED {target_lang} TRANSLATION:"""
+
+        logger.info(f"术语修复: {len(terms)} 个术语, 提示长度: {len(prompt)} 字符")
+        messages = [
+            {"role": "system", "content": "You are a professional translator enforcing a terminology glossary."},
+            {"role": "user", "content": prompt}
+        ]
+
+        response, token_usage = await self._make_xai_request(messages, stop_marker=TRANSLATION_END)
+        raw = response["choices"][0]["message"]["content"].strip()
+        marker_match = re.search(rf"{re.escape(TRANSLATION_START)}\s*(.*?)\s*(?:{re.escape(TRANSLATION_END)}|\Z)",
+                                 raw, flags=re.DOTALL)
+        return (marker_match.group(1).strip() if marker_match else raw), token_usage
+
 # 便捷函数
 async def translate_text(source_text: str, source_lang: str = "English", 
                        target_lang: str = "Chinese", country: Optional[str] = None,
                        glossary: Optional[Dict[str, str]] = None, 
                        model: str = "grok-3-mini",
-                       api_key: Optional[str] = None) -> Dict[str, Any]:
+                       api_key: Optional[str] = None,
+                       client: Optional[httpx.AsyncClient] = None,
+                       memory: Optional[TranslationMemory] = None,
+                       stream: bool = STREAM_RESPONSES,
+                       on_text: Optional[Callable[[str], Any]] = None,
+                       budget: Optional[TranslationBudget] = None, priority: float = 0,
+                       pipeline: Optional[StagePipeline] = None,
+                       adaptive_depth: bool = False) -> Dict[str, Any]:
     """
-    便捷的文本翻译函数
+    便捷的文本翻译函数（默认复用共享连接池，提供memory时启用段落级翻译记忆，
+    stream为True时使用流式响应，on_text逐段接收最终译文，budget为整个运行共享的预算，
+    pipeline为跨文件共享的阶段流水线，adaptive_depth启用自适应翻译深度）
     """
-    agent = TranslationAgent(model=model, api_key=api_key)
+    agent = TranslationAgent(model=model, api_key=api_key, client=client, memory=memory, stream=stream,
+                             adaptive_depth=adaptive_depth, budget=budget, priority=priority, pipeline=pipeline)
     return await agent.translate(
         source_text=source_text,
         source_lang=source_lang,
         target_lang=target_lang,
         country=country,
-        glossary=glossary
+        glossary=glossary,
+        on_text=on_text
     ) 
+
+
+async def translate_strings(texts, source_lang: str = "English", target_lang: str = "Chinese",
+                            country: Optional[str] = None, glossary: Optional[Dict[str, str]] = None,
+                            model: str = "grok-3-mini", api_key: Optional[str] = None,
+                            client: Optional[httpx.AsyncClient] = None,
+                            memory: Optional[TranslationMemory] = None,
+                            budget: Optional[TranslationBudget] = None) -> Dict[str, str]:
+    """
+    便捷的短字符串批量翻译函数（标题、标签等），返回 {原字符串（或ID）: 译文}
+    """
+    agent = TranslationAgent(model=model, api_key=api_key, client=client, memory=memory, budget=budget)
+    return await agent.translate_batch(texts, source_lang, target_lang, country, glossary)
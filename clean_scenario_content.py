@@ -3,6 +3,11 @@
 import os
 import re
 
+from doc_writer import DocWriter
+from parallel_runner import run_fixer
+
+writer = DocWriter()
+
 def clean_content(content):
     """Clean up extracted content by removing navigation and extra elements"""
     lines = content.split('\n')
@@ -81,11 +86,11 @@ def process_file(file_path):
         
         cleaned_content = clean_content(content)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(cleaned_content)
-        
         filename = os.path.basename(file_path)
-        print(f"✅ Cleaned: {filename}")
+        if writer.write(file_path, cleaned_content):
+            print(f"✅ Cleaned: {filename}")
+        else:
+            print(f"⏭️ Unchanged: {filename}")
         
     except Exception as e:
         print(f"❌ Error cleaning {file_path}: {e}")
@@ -100,18 +105,20 @@ def main():
         'docs/get-started/expand-your-scenario'
     ]
     
+    file_paths = []
     for directory in directories:
-        print(f"\n📁 Cleaning directory: {directory}")
-        print("-" * 30)
-        
         if os.path.exists(directory):
-            for filename in os.listdir(directory):
+            for filename in sorted(os.listdir(directory)):
                 if filename.endswith('.md') and filename != 'index.md':  # Skip index files
-                    file_path = os.path.join(directory, filename)
-                    process_file(file_path)
+                    file_paths.append(os.path.join(directory, filename))
         else:
             print(f"❌ Directory not found: {directory}")
     
+    print(f"\n📁 Cleaning {len(file_paths)} files")
+    print("-" * 30)
+    run_fixer(clean_content, file_paths, writer)
+    
+    writer.report()
     print(f"\n🎉 Cleaning completed!")
     print("✨ All files have been cleaned of:")
     print("   • Navigation breadcrumbs")
@@ -4,6 +4,14 @@ import os
 import re
 import glob
 
+from doc_writer import DocWriter
+from postprocess_index import PostprocessIndex
+from source_fingerprint import chain_version
+from frontmatter import Document
+from parallel_runner import run_fixer
+
+writer = DocWriter()
+
 def extract_clean_title(content):
     """Extract a clean title from the content"""
     lines = content.split('\n')
@@ -121,21 +129,24 @@ def create_clean_markdown(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
+    return clean_markdown(content)
+
+def clean_markdown(content):
+    """Return the completely cleaned version of a markdown document"""
     # Extract frontmatter
     frontmatter = {}
     body = content
     
-    if content.startswith('---'):
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            fm_content = parts[1].strip()
-            body = parts[2].strip()
-            
-            # Parse frontmatter
-            for line in fm_content.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    frontmatter[key.strip()] = value.strip().strip('"\'')
+    doc = Document(content)
+    if doc.has_frontmatter:
+        fm_content = doc.frontmatter_text.strip()
+        body = doc.body.strip()
+        
+        # Parse frontmatter
+        for line in fm_content.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                frontmatter[key.strip()] = value.strip().strip('"\'')
     
     # Get clean title and content
     clean_title = extract_clean_title(body)
@@ -185,8 +196,7 @@ def fix_file_comprehensive(file_path):
         
         # Write back if different
         if clean_content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(clean_content)
+            writer.write(file_path, clean_content)
             print(f"✅ Fixed: {file_path}")
             return True
         else:
@@ -204,13 +214,19 @@ def main():
     # Find all markdown files in get-started directory
     md_files = glob.glob('docs/get-started/**/*.md', recursive=True)
     
-    fixed_count = 0
-    for file_path in md_files:
-        if fix_file_comprehensive(file_path):
-            fixed_count += 1
+    # Skip files already cleaned by this version of the cleaner
+    index = PostprocessIndex('comprehensive_content_cleaner')
+    version = chain_version(extract_clean_title, get_clean_content, clean_markdown)
+    pending_files = index.filter(md_files, version)
+    print(f"⏭️ {len(md_files) - len(pending_files)} files unchanged since last run")
+    
+    fixed_files, _ = run_fixer(clean_markdown, sorted(pending_files), writer, index, version)
+    fixed_count = len(fixed_files)
+    index.close()
     
     print(f"\n🎉 Cleaning completed!")
     print(f"📊 Fixed {fixed_count} out of {len(md_files)} files")
+    writer.report()
     print("\n✨ Improvements made:")
     print("   • Completely removed website navigation elements")
     print("   • Cleaned up all titles and removed 'Help Center' suffixes")
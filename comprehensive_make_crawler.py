@@ -5,7 +5,6 @@ Starts from main page and discovers ALL help content systematically
 """
 
 import requests
-import yaml
 import os
 import re
 import time
@@ -15,6 +14,9 @@ from bs4 import BeautifulSoup
 from collections import defaultdict, deque
 import json
 
+from frontmatter import dump_frontmatter
+from mdx_escape import escape_mdx
+
 class ComprehensiveMakeCrawler:
     def __init__(self, base_url="https://help.make.com"):
         self.base_url = base_url
@@ -373,10 +375,10 @@ class ComprehensiveMakeCrawler:
         
         # Build file content
         file_content = "---\n"
-        file_content += yaml.dump(frontmatter, default_flow_style=False)
+        file_content += dump_frontmatter(frontmatter)
         file_content += "---\n\n"
         file_content += f"# {page_title}\n\n"
-        file_content += content
+        file_content += escape_mdx(content)
         
         # Write file
         file_path = docs_dir / f"{filename}.md"
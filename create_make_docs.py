@@ -4,11 +4,13 @@ Complete script to extract Make.com content using Jina.ai and create Docusaurus
 """
 
 import requests
-import yaml
 import os
 import re
 from pathlib import Path
 
+from frontmatter import dump_frontmatter
+from mdx_escape import escape_mdx
+
 def extract_with_jina(url):
     """Extract content using Jina.ai Reader API"""
     
@@ -161,9 +163,9 @@ def create_docusaurus_file(content, filename="learn-the-basics.md"):
     
     # Build the complete file content
     file_content = "---\n"
-    file_content += yaml.dump(frontmatter, default_flow_style=False)
+    file_content += dump_frontmatter(frontmatter)
     file_content += "---\n\n"
-    file_content += content
+    file_content += escape_mdx(content)
     
     # Ensure docs directory exists
     docs_path = Path("docs")
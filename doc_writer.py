@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shared writer for generated documentation files
+Skips files whose content is unchanged so Docusaurus caches stay warm
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+from frontmatter import dump_frontmatter
+from mdx_escape import escape_mdx
+
+
+def content_hash(data):
+    """Return the sha256 hex digest of text or bytes"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class DocWriter:
+    """Hash-aware atomic file writer with written/skipped counters"""
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self._known_dirs = set()
+        self._hashes = {}
+
+    def ensure_dir(self, directory):
+        """Create a directory once per run"""
+        directory = Path(directory)
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+
+    @staticmethod
+    def _signature(stat):
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_unchanged(self, file_path, data):
+        """Check whether file_path already holds exactly these bytes
+
+        A cached hash is trusted only while the file's mtime and size still
+        match what was seen when it was recorded; otherwise the file is re-read,
+        so external edits are noticed by long-running writers (docs_watch).
+        """
+        file_path = Path(file_path)
+        new_hash = content_hash(data)
+
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+
+        cached = self._hashes.get(file_path)
+        if cached is not None and cached[1] == self._signature(stat):
+            return cached[0] == new_hash
+
+        if stat.st_size != len(data):
+            return False
+        try:
+            with open(file_path, 'rb') as f:
+                old_hash = content_hash(f.read())
+        except OSError:
+            return False
+
+        self._hashes[file_path] = (old_hash, self._signature(stat))
+        return old_hash == new_hash
+
+    @staticmethod
+    def _file_mode(file_path):
+        """Permissions for a rewritten file: existing mode or 0666 minus umask"""
+        try:
+            return file_path.stat().st_mode & 0o777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    def write(self, file_path, content):
+        """Write content atomically unless it is already on disk
+
+        Returns True if the file was (re)written, False if it was skipped.
+        """
+        file_path = Path(file_path)
+        data = content.encode('utf-8') if isinstance(content, str) else content
+
+        if self.is_unchanged(file_path, data):
+            self.skipped += 1
+            return False
+
+        self.ensure_dir(file_path.parent)
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # mkstemp creates 0600 files; keep normal permissions for docs
+            os.chmod(tmp_path, self._file_mode(file_path))
+            os.replace(tmp_path, file_path)
+        except Exception:
+            self.failed += 1
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        try:
+            self._hashes[file_path] = (content_hash(data), self._signature(file_path.stat()))
+        except OSError:
+            self._hashes.pop(file_path, None)
+        self.written += 1
+        return True
+
+    def write_json(self, file_path, data, indent=2, ensure_ascii=True):
+        """Serialize data as JSON and write it through write()"""
+        return self.write(file_path, json.dumps(data, indent=indent, ensure_ascii=ensure_ascii))
+
+    def write_markdown(self, file_path, frontmatter, body):
+        """Serialize a doc page with MDX-safe escaping and write it through write()"""
+        return self.write(file_path, f"---\n{dump_frontmatter(frontmatter)}---\n\n{escape_mdx(body)}")
+
+    def report(self):
+        """Print written/skipped counts for this run"""
+        print(f"📊 Files written: {self.written}, unchanged (skipped): {self.skipped}, failed: {self.failed}")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+SQLite manifest linking Make.com URLs, local doc paths and content hashes
+One row per page so crawl/clean/translate stages can decide what needs work
+without scanning docs/
+"""
+
+import json
+import time
+import sqlite3
+from pathlib import Path
+from urllib.parse import urlparse, urlunparse
+
+from doc_writer import content_hash
+
+DEFAULT_DB_PATH = "docs_manifest.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    doc_path TEXT,
+    raw_hash TEXT,
+    cleaned_hash TEXT,
+    last_crawled REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_pages_doc_path ON pages(doc_path);
+
+CREATE TABLE IF NOT EXISTS translations (
+    doc_path TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    source_hash TEXT,
+    translation_hash TEXT,
+    last_translated REAL,
+    PRIMARY KEY (doc_path, lang)
+);
+
+CREATE TABLE IF NOT EXISTS postprocess (
+    doc_path TEXT NOT NULL,
+    chain TEXT NOT NULL,
+    chain_version TEXT,
+    content_hash TEXT,
+    mtime_ns INTEGER,
+    size INTEGER,
+    PRIMARY KEY (doc_path, chain)
+);
+
+CREATE TABLE IF NOT EXISTS images (
+    doc_path TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    local_path TEXT,
+    PRIMARY KEY (doc_path, source_url)
+);
+"""
+
+
+def canonical_url(url):
+    """Normalize a help.make.com URL
+
+    Strips quotes, the ' "Title"' suffix left in crawl structure files,
+    query strings, fragments and trailing slashes.
+    """
+    url = url.strip().strip('"\'')
+    if ' ' in url:
+        url = url.split(' ', 1)[0]
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme or 'https', parsed.netloc.lower(), path, '', '', ''))
+
+
+def normalize_doc_path(doc_path):
+    """Store doc paths as posix strings relative to the project root"""
+    return Path(doc_path).as_posix()
+
+
+class DocsManifest:
+    """Indexed page manifest backed by SQLite"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Pages
+
+    def record_crawl(self, url, doc_path, raw_content=None, cleaned_content=None):
+        """Insert or update a page after it has been crawled and cleaned"""
+        url = canonical_url(url)
+        doc_path = normalize_doc_path(doc_path)
+        with self.conn:
+            # A doc path belongs to exactly one URL; drop stale owners first
+            self.conn.execute("DELETE FROM pages WHERE doc_path = ? AND url != ?", (doc_path, url))
+            self.conn.execute(
+                """
+                INSERT INTO pages (url, doc_path, raw_hash, cleaned_hash, last_crawled)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    doc_path = excluded.doc_path,
+                    raw_hash = COALESCE(excluded.raw_hash, pages.raw_hash),
+                    cleaned_hash = COALESCE(excluded.cleaned_hash, pages.cleaned_hash),
+                    last_crawled = excluded.last_crawled
+                """,
+                (
+                    url,
+                    doc_path,
+                    content_hash(raw_content) if raw_content is not None else None,
+                    content_hash(cleaned_content) if cleaned_content is not None else None,
+                    time.time(),
+                ),
+            )
+
+    def get_by_url(self, url):
+        return self.conn.execute(
+            "SELECT * FROM pages WHERE url = ?", (canonical_url(url),)
+        ).fetchone()
+
+    def get_by_path(self, doc_path):
+        return self.conn.execute(
+            "SELECT * FROM pages WHERE doc_path = ?", (normalize_doc_path(doc_path),)
+        ).fetchone()
+
+    def url_for_path(self, doc_path):
+        row = self.get_by_path(doc_path)
+        return row["url"] if row else None
+
+    def raw_changed(self, url, raw_content):
+        """True if the freshly fetched page differs from the last crawl"""
+        row = self.get_by_url(url)
+        return row is None or row["raw_hash"] != content_hash(raw_content)
+
+    # Translations
+
+    def record_translation(self, doc_path, lang, source_content, translated_content):
+        """Remember which source text a translation was produced from"""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO translations
+                    (doc_path, lang, source_hash, translation_hash, last_translated)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    normalize_doc_path(doc_path),
+                    lang,
+                    content_hash(source_content),
+                    content_hash(translated_content),
+                    time.time(),
+                ),
+            )
+
+    def get_translation(self, doc_path, lang):
+        return self.conn.execute(
+            "SELECT * FROM translations WHERE doc_path = ? AND lang = ?",
+            (normalize_doc_path(doc_path), lang),
+        ).fetchone()
+
+    def needs_translation(self, doc_path, lang, current_content, in_place=False):
+        """Decide whether a doc must be (re)translated
+
+        With in_place, current_content is the file that the translation
+        overwrote, so only the recorded translation counts as up to date: a
+        page that was re-crawled or restored to the English source must be
+        translated again. Otherwise current_content is the English source
+        (separate output tree) and must match the source it was translated from.
+        """
+        row = self.get_translation(doc_path, lang)
+        if row is None:
+            return True
+        current = content_hash(current_content)
+        return current != row["translation_hash" if in_place else "source_hash"]
+
+    # Post-processing index
+
+    def postprocess_entries(self, chain):
+        """Load the post-processing index of one fixer chain as a dict keyed by doc path"""
+        rows = self.conn.execute(
+            "SELECT doc_path, chain_version, content_hash, mtime_ns, size FROM postprocess WHERE chain = ?",
+            (chain,),
+        )
+        return {row["doc_path"]: row for row in rows}
+
+    def record_postprocess_many(self, chain, entries):
+        """Store (doc_path, chain_version, content_hash, mtime_ns, size) rows in one transaction"""
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO postprocess
+                    (doc_path, chain, chain_version, content_hash, mtime_ns, size)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(normalize_doc_path(doc_path), chain, *rest) for doc_path, *rest in entries],
+            )
+
+    # Images
+
+    def record_images(self, doc_path, image_urls, url_to_local=None):
+        url_to_local = url_to_local or {}
+        doc_path = normalize_doc_path(doc_path)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO images (doc_path, source_url, local_path) VALUES (?, ?, ?)",
+                [(doc_path, image_url, url_to_local.get(image_url)) for image_url in image_urls],
+            )
+
+    def images_for_path(self, doc_path):
+        return self.conn.execute(
+            "SELECT source_url, local_path FROM images WHERE doc_path = ?",
+            (normalize_doc_path(doc_path),),
+        ).fetchall()
+
+    # Legacy JSON state
+
+    def import_legacy(self, structure_file="docs/_comprehensive_structure.json",
+                      images_file="extracted_images.json",
+                      mapping_file="url_to_local_mapping.json",
+                      base_url="https://help.make.com"):
+        """Load the older JSON mapping files into the manifest"""
+        pages = images = 0
+
+        if Path(structure_file).exists():
+            with open(structure_file, 'r', encoding='utf-8') as f:
+                structure = json.load(f)
+            for category, filenames in structure.get("docs_structure", {}).items():
+                for filename in filenames:
+                    doc_path = Path("docs") / category / f"{filename}.md"
+                    if doc_path.exists() and self.get_by_path(doc_path) is None:
+                        self.record_crawl(f"{base_url}/{filename}", doc_path)
+                        pages += 1
+
+        url_to_local = {}
+        if Path(mapping_file).exists():
+            with open(mapping_file, 'r', encoding='utf-8') as f:
+                url_to_local = json.load(f)
+
+        if Path(images_file).exists():
+            with open(images_file, 'r', encoding='utf-8') as f:
+                extracted = json.load(f)
+            for doc_path, image_urls in extracted.items():
+                self.record_images(doc_path, image_urls, url_to_local)
+                images += len(image_urls)
+
+        return pages, images
+
+
+def main():
+    """Import the legacy JSON mappings into the manifest and print a summary"""
+    print("🗂️ Building docs manifest...")
+    with DocsManifest() as manifest:
+        pages, images = manifest.import_legacy()
+        total_pages = manifest.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        total_translations = manifest.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    print(f"📊 Imported {pages} pages and {images} image references")
+    print(f"📊 Manifest now tracks {total_pages} pages, {total_translations} translations")
+
+
+if __name__ == "__main__":
+    main()
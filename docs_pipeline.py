@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Single-pass post-processing pipeline for the docs tree
+Each document is read once, run through the registered transforms in
+memory and written once (only if it changed)
+"""
+
+import re
+import glob
+import json
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+
+from doc_writer import DocWriter
+from frontmatter import Document
+from postprocess_index import PostprocessIndex
+from source_fingerprint import chain_version
+
+import mdx_escape
+import fix_mdx_errors
+import fix_remaining_mdx_errors
+import fix_content_display
+import clean_scenario_content
+import comprehensive_content_cleaner
+import format_like_tutorial_basics
+
+
+class Transform:
+    """A named text transform limited to paths matching include patterns
+
+    Patterns use fnmatch syntax on posix paths, where '*' also matches '/'.
+    body_only transforms receive just the body and never touch frontmatter.
+    helpers are the functions (or modules) func relies on; they are part of
+    the version, so editing a helper's regexes reprocesses the files too.
+    select(paths), if given, narrows the matching paths further and is
+    evaluated against the files as they are at the start of each run.
+    """
+
+    def __init__(self, name, func, include=("docs/*.md",), exclude=(), body_only=False, pass_path=False,
+                 helpers=(), select=None):
+        self.name = name
+        self.func = func
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.body_only = body_only
+        self.pass_path = pass_path
+        self.select = select
+        self.version = f"{name}:{chain_version(*helpers, func)}"
+
+    def applies_to(self, path):
+        path = Path(path).as_posix()
+        return (any(fnmatch(path, pattern) for pattern in self.include)
+                and not any(fnmatch(path, pattern) for pattern in self.exclude))
+
+    def apply(self, path, content):
+        if self.body_only:
+            doc = Document(content)
+            doc.body = self.func(doc.body)
+            return doc.render()
+        if self.pass_path:
+            return self.func(Path(path).as_posix(), content)
+        return self.func(content)
+
+
+# Ordered registry of transforms, in the order the standalone scripts are run
+TRANSFORMS = []
+
+
+def register(name, include=("docs/*.md",), exclude=(), body_only=False, pass_path=False, helpers=(),
+             select=None):
+    """Decorator registering a transform at the end of the chain"""
+    def decorator(func):
+        TRANSFORMS.append(Transform(name, func, include, exclude, body_only, pass_path, helpers, select))
+        return func
+    return decorator
+
+
+# Only files the MDX validator reports errors for
+register("fix_mdx_errors", pass_path=True, select=fix_mdx_errors.find_problematic_files,
+         helpers=(fix_mdx_errors.fix_mdx_content, mdx_escape))(
+    fix_mdx_errors.fix_problematic_content)
+register("fix_remaining_mdx_errors", helpers=(mdx_escape,))(
+    fix_remaining_mdx_errors.apply_mdx_fixes)
+
+
+IMAGE_MAPPING_FILE = "url_to_local_mapping.json"
+_image_pattern = None
+
+
+def _image_url_pattern():
+    """Compile the remote image URLs from the mapping file into one regex (once)"""
+    global _image_pattern
+    if _image_pattern is None:
+        try:
+            with open(IMAGE_MAPPING_FILE, 'r', encoding='utf-8') as f:
+                mapping = json.load(f)
+        except (OSError, ValueError):
+            mapping = {}
+        urls = sorted(mapping, key=len, reverse=True)
+        regex = re.compile('|'.join(map(re.escape, urls))) if urls else None
+        _image_pattern = (regex, mapping)
+    return _image_pattern
+
+
+@register("rewrite_image_urls", body_only=True)
+def rewrite_image_urls(body):
+    """Point remote images at their downloaded copies under static/img"""
+    regex, mapping = _image_url_pattern()
+    if regex is None or 'http' not in body:
+        return body
+    return regex.sub(lambda m: mapping[m.group()], body)
+
+
+register("fix_content_display", include=("docs/get-started/*.md",),
+         helpers=(fix_content_display.clean_title, fix_content_display.clean_content))(
+    fix_content_display.fix_frontmatter)
+register("clean_scenario_content",
+         include=("docs/get-started/create-your-first-scenario/*.md",
+                  "docs/get-started/expand-your-scenario/*.md"),
+         exclude=("*/index.md",))(
+    clean_scenario_content.clean_content)
+register("comprehensive_content_cleaner", include=("docs/get-started/*.md",),
+         helpers=(comprehensive_content_cleaner.extract_clean_title,
+                  comprehensive_content_cleaner.get_clean_content))(
+    comprehensive_content_cleaner.clean_markdown)
+register("format_like_tutorial_basics", include=("docs/get-started/*.md",),
+         helpers=(format_like_tutorial_basics.extract_meaningful_content,))(
+    format_like_tutorial_basics.tutorial_style_content)
+
+
+class DocsPipeline:
+    """Run a chain of transforms over files with one read and one write each"""
+
+    def __init__(self, transforms=None, writer=None, incremental=True):
+        self.transforms = list(TRANSFORMS if transforms is None else transforms)
+        self.writer = writer or DocWriter()
+        self.index = PostprocessIndex("docs_pipeline") if incremental else None
+        self.timings = {t.name: 0.0 for t in self.transforms}
+        self.applied = {t.name: 0 for t in self.transforms}
+        self.errors = []
+        # transform name -> (paths considered, paths selected) for the current run
+        self._selected = {}
+
+    def _selects(self, t, path):
+        if t.select is None:
+            return True
+        path = Path(path).as_posix()
+        considered, selected = self._selected.get(t.name, ((), ()))
+        if path in considered:
+            return path in selected
+        # Outside run() (e.g. docs_watch), evaluate against the file as it is now
+        return bool(t.select([path]))
+
+    def applicable(self, path):
+        return [t for t in self.transforms if t.applies_to(path) and self._selects(t, path)]
+
+    def _prepare(self, paths):
+        """Evaluate select() once for all paths of a run"""
+        for t in self.transforms:
+            if t.select is not None:
+                considered = [Path(path).as_posix() for path in paths if t.applies_to(path)]
+                self._selected[t.name] = (set(considered), {Path(path).as_posix() for path in t.select(considered)})
+
+    @staticmethod
+    def chain_version_for(transforms):
+        """Version of the transform chain that applies to one file"""
+        return "|".join(t.version for t in transforms)
+
+    def transform_content(self, path, content, transforms=None):
+        """Apply the applicable transforms to content in memory"""
+        for t in (self.applicable(path) if transforms is None else transforms):
+            start = time.perf_counter()
+            content = t.apply(path, content)
+            self.timings[t.name] += time.perf_counter() - start
+            self.applied[t.name] += 1
+        return content
+
+    def process_file(self, path):
+        """Read, transform and (if changed) write a single file"""
+        transforms = self.applicable(path)
+        if not transforms:
+            return False
+        version = self.chain_version_for(transforms)
+        if self.index and not self.index.needs_processing(path, version):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            content = self.transform_content(path, content, transforms)
+            written = self.writer.write(path, content)
+            if self.index:
+                # Only record the file as processed if the disk now holds the output
+                data = content.encode('utf-8')
+                with open(path, 'rb') as f:
+                    on_disk = f.read()
+                if on_disk == data:
+                    self.index.mark(path, version, on_disk)
+                else:
+                    print(f"⚠️ {path} does not match the pipeline output; not indexed")
+            return written
+        except Exception as e:
+            self.errors.append((path, str(e)))
+            print(f"❌ Error processing {path}: {e}")
+            return False
+
+    def run(self, paths=None):
+        """Process paths (default: every markdown file under docs/)"""
+        if paths is None:
+            paths = sorted(glob.glob('docs/**/*.md', recursive=True))
+        self._prepare(paths)
+        try:
+            for path in paths:
+                self.process_file(path)
+        finally:
+            self._selected = {}
+        if self.index:
+            self.index.save()
+        return self.writer.written
+
+    def close(self):
+        if self.index:
+            self.index.close()
+
+    def report(self):
+        print(f"\n⏱️ Per-transform timing:")
+        for t in self.transforms:
+            print(f"  {t.name:32} {self.applied[t.name]:5} files  {self.timings[t.name] * 1000:9.1f} ms")
+        self.writer.report()
+        if self.index:
+            print(f"⏭️ Skipped via post-processing index: {self.index.skipped}")
+        if self.errors:
+            print(f"❌ Errors: {len(self.errors)}")
+
+
+def main():
+    """Run the full docs post-processing chain in a single pass"""
+    print("🔧 Running docs post-processing pipeline...")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    pipeline = DocsPipeline()
+    pipeline.run()
+    pipeline.report()
+    pipeline.close()
+
+    print(f"\n✅ Pipeline completed in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Watch docs/ while `yarn start` is running and re-run only the relevant
+post-processing on changed files
+Uses inotify (inotify_simple) when available and falls back to polling
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from docs_pipeline import DocsPipeline
+from fix_mdx_errors import fix_category_json_file
+from mdx_lint import lint_file
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+DEFAULT_ROOTS = ("docs",)
+DEBOUNCE_SECONDS = 0.3
+POLL_INTERVAL = 0.5
+
+# Generated or editor files that never need processing
+IGNORED_SUFFIXES = ('.tmp', '.swp', '~')
+
+
+def _is_relevant(path):
+    name = os.path.basename(path)
+    return not (name.startswith('.') or name.endswith(IGNORED_SUFFIXES))
+
+
+class PollingWatcher:
+    """Detects changes by comparing (mtime, size) snapshots of the roots"""
+
+    def __init__(self, roots):
+        self.roots = roots
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                stat = os.stat(root)
+                snapshot[root] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(timeout)
+        current = self._scan()
+        changed = {path for path, stat in current.items() if self.snapshot.get(path) != stat}
+        changed.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Recursive inotify watcher; new subdirectories are watched as they appear"""
+
+    def __init__(self, roots):
+        self.inotify = INotify()
+        self.mask = (flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+                     | flags.DELETE | flags.MOVED_FROM)
+        self.watches = {}
+        for root in roots:
+            if os.path.isdir(root):
+                for dirpath, _, _ in os.walk(root):
+                    self._add(dirpath)
+            elif os.path.exists(root):
+                self._add(os.path.dirname(root) or '.')
+
+    def _add(self, directory):
+        wd = self.inotify.add_watch(directory, self.mask)
+        self.watches[wd] = directory
+
+    def poll(self, timeout):
+        changed = set()
+        for event in self.inotify.read(timeout=int(timeout * 1000)):
+            directory = self.watches.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = os.path.join(directory, event.name)
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    for dirpath, _, filenames in os.walk(path):
+                        self._add(dirpath)
+                        changed.update(os.path.join(dirpath, name) for name in filenames)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        self.inotify.close()
+
+
+class DocsWatcher:
+    """Debounces file events and dispatches them to the matching transforms"""
+
+    def __init__(self, roots=DEFAULT_ROOTS, debounce=DEBOUNCE_SECONDS, use_inotify=True):
+        self.roots = [str(root) for root in roots]
+        self.debounce = debounce
+        self.pipeline = DocsPipeline()
+        if use_inotify and INotify is not None:
+            self.watcher = InotifyWatcher(self.roots)
+            self.backend = "inotify"
+        else:
+            self.watcher = PollingWatcher(self.roots)
+            self.backend = "polling"
+
+    def handle(self, paths):
+        """Process one debounced batch of changed paths"""
+        start = time.perf_counter()
+        processed = 0
+
+        for path in sorted(paths):
+            posix = Path(path).as_posix()
+            if not os.path.exists(path):
+                continue
+
+            if posix.endswith(('.md', '.mdx')) and posix.startswith('docs/'):
+                # Our own writes land here too; the post-processing index skips them
+                if self.pipeline.process_file(posix):
+                    print(f"  ✅ Updated: {posix}")
+                    processed += 1
+                for issue in lint_file(posix):
+                    print(f"  ⚠️ {issue}")
+                # A doc in a new directory needs a category file for the sidebar
+                category_file = Path(posix).parent / "_category_.json"
+                if Path(posix).parent != Path("docs") and fix_category_json_file(category_file):
+                    processed += 1
+            elif posix.endswith('/_category_.json'):
+                if fix_category_json_file(posix):
+                    processed += 1
+
+        self.pipeline.index.save()
+        if processed:
+            print(f"⚡ {processed} updates in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def run(self):
+        print(f"👀 Watching {', '.join(self.roots)} ({self.backend}); Ctrl+C to stop")
+        pending = set()
+        last_event = 0.0
+        try:
+            while True:
+                timeout = self.debounce if pending else POLL_INTERVAL
+                changed = {path for path in self.watcher.poll(timeout) if _is_relevant(path)}
+                now = time.monotonic()
+                if changed:
+                    pending |= changed
+                    last_event = now
+                elif pending and now - last_event >= self.debounce:
+                    batch, pending = pending, set()
+                    self.handle(batch)
+        except KeyboardInterrupt:
+            print("\n👋 Stopping watcher")
+        finally:
+            self.watcher.close()
+            self.pipeline.close()
+
+
+def main():
+    """Watch the docs tree until interrupted"""
+    parser = argparse.ArgumentParser(description="Re-run docs post-processing on changed files")
+    parser.add_argument('roots', nargs='*', default=list(DEFAULT_ROOTS),
+                        help="directories or files to watch (default: docs)")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help="seconds of quiet before a batch is processed")
+    parser.add_argument('--poll', action='store_true', help="force the polling backend")
+    args = parser.parse_args()
+
+    DocsWatcher(args.roots, args.debounce, use_inotify=not args.poll).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
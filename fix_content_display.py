@@ -4,6 +4,12 @@ import os
 import re
 import glob
 
+from doc_writer import DocWriter
+from frontmatter import Document
+from parallel_runner import run_fixer
+
+writer = DocWriter()
+
 def clean_title(title):
     """Clean up the title format"""
     # Remove "Title: " prefix and " - Help Center" suffix
@@ -91,15 +97,12 @@ def clean_content(content):
 
 def fix_frontmatter(content):
     """Fix the frontmatter of a markdown file"""
-    if not content.startswith('---'):
-        return content
-    
-    parts = content.split('---', 2)
-    if len(parts) < 3:
+    doc = Document(content)
+    if not doc.has_frontmatter:
         return content
     
-    frontmatter = parts[1].strip()
-    body = parts[2].strip()
+    frontmatter = doc.frontmatter_text.strip()
+    body = doc.body.strip()
     
     # Extract and clean title
     title_match = re.search(r'title:\s*["\']?([^"\'\n]+)["\']?', frontmatter)
@@ -145,8 +148,7 @@ def fix_file(file_path):
         fixed_content = fix_frontmatter(content)
         
         if fixed_content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(fixed_content)
+            writer.write(file_path, fixed_content)
             print(f"Fixed: {file_path}")
             return True
         else:
@@ -164,12 +166,10 @@ def main():
     # Find all markdown files in get-started directory
     md_files = glob.glob('docs/get-started/**/*.md', recursive=True)
     
-    fixed_count = 0
-    for file_path in md_files:
-        if fix_file(file_path):
-            fixed_count += 1
+    fixed_files, _ = run_fixer(fix_frontmatter, sorted(md_files), writer)
     
-    print(f"\nFixed {fixed_count} files")
+    print(f"\nFixed {len(fixed_files)} files")
+    writer.report()
     print("Content display fixes completed!")
     print("\nChanges made:")
     print("- Cleaned up titles (removed 'Title:' and '- Help Center')")
@@ -3,6 +3,8 @@
 import os
 import json
 
+from frontmatter import Document
+
 def fix_learn_basics_index():
     """Fix the learn-the-basics directory to properly display index.md as the category page"""
     print("🔧 Fixing learn-the-basics directory index display...")
@@ -27,28 +29,28 @@ def fix_learn_basics_index():
             content = f.read()
         
         # Method 1: Remove title from frontmatter, let it use the category label
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter_lines = parts[1].strip().split('\n')
-                body = parts[2]
-                
-                # Keep only sidebar_position, remove title
-                new_frontmatter_lines = []
-                for line in frontmatter_lines:
-                    if line.strip() and not line.strip().startswith('title:'):
-                        new_frontmatter_lines.append(line)
-                
-                # Add custom slug if needed
-                new_frontmatter_lines.append('slug: /get-started/learn-the-basics')
-                
-                new_content = f"""---
+        doc = Document(content)
+        if doc.has_frontmatter:
+            frontmatter_lines = doc.frontmatter_text.strip().split('\n')
+            body = doc.body
+            
+            # Keep only sidebar_position, remove title
+            new_frontmatter_lines = []
+            for line in frontmatter_lines:
+                if line.strip() and not line.strip().startswith('title:'):
+                    new_frontmatter_lines.append(line)
+            
+            # Add custom slug if needed
+            new_frontmatter_lines.append('slug: /get-started/learn-the-basics')
+            
+            new_content = f"""---
 {chr(10).join(new_frontmatter_lines)}
----{body}"""
-                
-                with open(index_file, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                print(f"✅ Updated: {index_file} (removed title from frontmatter)")
+---
+{body}"""
+            
+            with open(index_file, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            print(f"✅ Updated: {index_file} (removed title from frontmatter)")
     
     print("\n🎉 Learn the basics index display fixed!")
     print("Now the index.md content will display when clicking 'Learn the Basics'")
@@ -89,25 +91,25 @@ def fix_all_category_indexes():
             with open(index_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    frontmatter_lines = parts[1].strip().split('\n')
-                    body = parts[2]
-                    
-                    # Keep only sidebar_position, remove title
-                    new_frontmatter_lines = []
-                    for line in frontmatter_lines:
-                        if line.strip() and not line.strip().startswith('title:'):
-                            new_frontmatter_lines.append(line)
-                    
-                    new_content = f"""---
+            doc = Document(content)
+            if doc.has_frontmatter:
+                frontmatter_lines = doc.frontmatter_text.strip().split('\n')
+                body = doc.body
+                
+                # Keep only sidebar_position, remove title
+                new_frontmatter_lines = []
+                for line in frontmatter_lines:
+                    if line.strip() and not line.strip().startswith('title:'):
+                        new_frontmatter_lines.append(line)
+                
+                new_content = f"""---
 {chr(10).join(new_frontmatter_lines)}
----{body}"""
-                    
-                    with open(index_file, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-                    print(f"✅ Updated: {index_file}")
+---
+{body}"""
+                
+                with open(index_file, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
+                print(f"✅ Updated: {index_file}")
 
 def main():
     """Fix directory index display issues"""
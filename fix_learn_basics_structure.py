@@ -4,6 +4,8 @@ import os
 import shutil
 import json
 
+from frontmatter import Document
+
 def fix_learn_basics_structure():
     """Fix the learn-the-basics structure to match Make.com's actual layout"""
     print("🔧 Fixing learn-the-basics structure...")
@@ -55,13 +57,11 @@ def fix_learn_basics_structure():
                 content = re.sub(r'sidebar_position:\s*\d+', f'sidebar_position: {position}', content)
             else:
                 # Add sidebar_position if not present
-                if content.startswith('---'):
-                    parts = content.split('---', 2)
-                    if len(parts) >= 3:
-                        frontmatter = parts[1].strip()
-                        body = parts[2]
-                        frontmatter += f'\nsidebar_position: {position}'
-                        content = f"---\n{frontmatter}\n---{body}"
+                doc = Document(content)
+                if doc.has_frontmatter:
+                    frontmatter = doc.frontmatter_text.strip()
+                    frontmatter += f'\nsidebar_position: {position}'
+                    content = f"---\n{frontmatter}\n---\n{doc.body}"
             
             # Write to new location
             with open(dst, 'w', encoding='utf-8') as f:
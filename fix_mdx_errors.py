@@ -5,19 +5,22 @@ Fix MDX compilation errors in crawled Make.com documentation
 
 import os
 import re
+import glob
 import json
 from pathlib import Path
 
+from doc_writer import DocWriter
+from frontmatter import split_frontmatter
+from mdx_escape import escape_mdx
+from mdx_lint import lint_paths, files_with_errors
+
+writer = DocWriter()
+
 def fix_mdx_content(content):
     """Fix common MDX issues that cause compilation errors"""
     
-    # Fix JavaScript-like expressions that aren't valid
-    # Remove {{...}} expressions that are not valid JavaScript
-    content = re.sub(r'\{\{[^}]*\}\}', '', content)
-    
-    # Fix HTML-like tags that aren't properly closed
-    # Replace unclosed angle brackets with escaped versions
-    content = re.sub(r'<([^/>]+)>', r'`<\1>`', content)
+    # Escape {{...}} templates, braces and stray tags outside code
+    content = escape_mdx(content)
     
     # Remove time estimates and other noise
     content = re.sub(r'\b\d+\s*min\b', '', content)
@@ -56,88 +59,65 @@ def fix_mdx_content(content):
     
     return content
 
+def default_category_config(dir_name):
+    """Category config generated from a directory name"""
+    category_name = dir_name.replace('-', ' ').title()
+    return {
+        "label": category_name,
+        "position": 1,
+        "link": {
+            "type": "generated-index",
+            "description": f"Documentation for {category_name.lower()}"
+        }
+    }
+
+def fix_category_json_file(json_file):
+    """Fill in an empty (or missing) _category_.json; returns True if written"""
+    json_file = Path(json_file)
+    try:
+        content = json_file.read_text(encoding='utf-8').strip() if json_file.exists() else ""
+        
+        if not content:
+            writer.write_json(json_file, default_category_config(json_file.parent.name))
+            print(f"  ✅ Fixed empty JSON: {json_file}")
+            return True
+            
+    except Exception as e:
+        print(f"  ❌ Error fixing {json_file}: {e}")
+    return False
+
 def fix_category_json_files():
     """Fix empty or malformed JSON category files"""
     docs_dir = Path("docs")
     
     # Find all _category_.json files
     for json_file in docs_dir.glob("**/_category_.json"):
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-            
-            if not content:
-                # Create default category content based on directory name
-                dir_name = json_file.parent.name
-                category_name = dir_name.replace('-', ' ').title()
-                
-                default_config = {
-                    "label": category_name,
-                    "position": 1,
-                    "link": {
-                        "type": "generated-index",
-                        "description": f"Documentation for {category_name.lower()}"
-                    }
-                }
-                
-                with open(json_file, 'w', encoding='utf-8') as f:
-                    json.dump(default_config, f, indent=2)
-                
-                print(f"  ✅ Fixed empty JSON: {json_file}")
-                
-        except Exception as e:
-            print(f"  ❌ Error fixing {json_file}: {e}")
-
-def fix_problematic_files():
-    """Fix the specific files mentioned in the error log"""
-    
-    problematic_files = [
-        "docs/get-started/step-3-create-a-scenario-to-send-tasks-to-the-ai-agent.md",
-        "docs/misc/certificates-and-keys.md", 
-        "docs/misc/data-structures.md",
-        "docs/misc/incomplete-executions-retry.md",
-        "docs/misc/keys.md",
-        "docs/misc/math-variables.md",
-        "docs/release-notes/january-16-2024.md",
-        "docs/tools/tools.md",
-        "docs/your-organization/access-management/google-saml.md"
-    ]
+        fix_category_json_file(json_file)
+
+def fix_problematic_content(file_path, content):
+    """Return the fixed document, or a placeholder if too little content survives"""
     
-    for file_path in problematic_files:
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Extract frontmatter
-                parts = content.split('---')
-                if len(parts) >= 3:
-                    frontmatter = parts[1]
-                    body = '---'.join(parts[2:])
-                else:
-                    frontmatter = ""
-                    body = content
-                
-                # Fix the body content
-                fixed_body = fix_mdx_content(body)
-                
-                # Reconstruct the file
-                if frontmatter:
-                    fixed_content = f"---{frontmatter}---{fixed_body}"
-                else:
-                    fixed_content = fixed_body
-                
-                # Only write if content changed significantly
-                if len(fixed_content) > 200:  # Ensure we have substantial content
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(fixed_content)
-                    print(f"  ✅ Fixed: {file_path}")
-                else:
-                    # Content too short, create a simple placeholder
-                    filename = os.path.basename(file_path)
-                    title = filename.replace('.md', '').replace('-', ' ').title()
-                    
-                    simple_content = f"""---
+    # Extract frontmatter (body horizontal rules stay in the body)
+    frontmatter, body = split_frontmatter(content)
+    
+    # Fix the body content
+    fixed_body = fix_mdx_content(body)
+    
+    # Reconstruct the file
+    if frontmatter:
+        fixed_content = f"{frontmatter}\n{fixed_body}"
+    else:
+        fixed_content = fixed_body
+    
+    # Only keep the fix if we still have substantial content
+    if len(fixed_content) > 200:
+        return fixed_content
+    
+    # Content too short, create a simple placeholder
+    filename = os.path.basename(file_path)
+    title = filename.replace('.md', '').replace('-', ' ').title()
+    
+    return f"""---
 sidebar_position: 1
 title: {title}
 description: {title} documentation
@@ -149,10 +129,33 @@ This page is currently being updated. Please check back later for more informati
 
 For the latest documentation, visit [Make.com Help Center](https://help.make.com/).
 """
-                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(simple_content)
-                    print(f"  ✅ Created placeholder: {file_path}")
+
+def find_problematic_files(paths=None):
+    """Files (default: all docs) the MDX pre-flight validator reports errors for"""
+    if paths is None:
+        paths = sorted(glob.glob('docs/**/*.md', recursive=True))
+    issues = lint_paths(paths)
+    for issue in issues:
+        if issue.severity == 'error':
+            print(f"  ⚠️ {issue}")
+    return files_with_errors(issues)
+
+def fix_problematic_files(file_paths=None):
+    """Fix the given files (default: those the MDX validator flags)"""
+    
+    if file_paths is None:
+        file_paths = find_problematic_files()
+    
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                
+                fixed_content = fix_problematic_content(file_path, content)
+                
+                if writer.write(file_path, fixed_content):
+                    print(f"  ✅ Fixed: {file_path}")
                     
             except Exception as e:
                 print(f"  ❌ Error fixing {file_path}: {e}")
@@ -189,6 +192,7 @@ def main():
     print("\n🗑️ Cleaning up duplicate files...")
     remove_duplicate_files()
     
+    writer.report()
     print("\n✅ MDX error fixing completed!")
     print("🌐 Try restarting Docusaurus now")
 
@@ -4,40 +4,27 @@ import os
 import re
 import glob
 
-def fix_mdx_errors(file_path):
-    """Fix common MDX compilation errors in a file"""
-    print(f"Checking: {file_path}")
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    original_content = content
-    
-    # Fix 1: Remove invalid {{...}} expressions
-    content = re.sub(r'\{\{[^}]*\}\}', '', content)
-    
-    # Fix 2: Fix malformed JSON strings
+from doc_writer import DocWriter
+import mdx_escape
+from mdx_escape import escape_mdx
+from postprocess_index import PostprocessIndex
+from source_fingerprint import chain_version
+from parallel_runner import run_fixer
+
+writer = DocWriter()
+
+def apply_mdx_fixes(content):
+    """Apply the MDX compilation fixes to markdown text"""
+    # Fix 1: Remove malformed JSON strings
     content = re.sub(r'\d+\{\d+"[^"]*":[^}]*\d+\}', '', content)
     
-    # Fix 3: Clean up extra backslashes in docid references  
+    # Fix 2: Clean up extra backslashes in docid references  
     content = re.sub(r'docid\\[^\\]*\\[^\\]*', '', content)
     
-    # Fix 4: Remove problematic special characters in table cells
-    content = re.sub(r'\|([^|]*)\{[^}]*\}([^|]*)\|', r'|\1\2|', content)
-    
-    # Fix 5: Fix unclosed code blocks or expressions
-    content = re.sub(r'\{[^}]*$', '', content, flags=re.MULTILINE)
-    
-    # Fix 6: Clean up broken links with special characters
-    content = re.sub(r'\]\([^)]*\{[^}]*\}[^)]*\)', ']', content)
+    # Fix 3: Escape braces, {{...}} templates and stray tags outside code
+    content = escape_mdx(content)
     
-    # Fix 7: Remove standalone problematic characters
-    content = re.sub(r'[{}](?![^`]*`)', '', content)
-    
-    # Fix 8: Clean up malformed HTML-like tags
-    content = re.sub(r'<[^>]*\{[^}]*\}[^>]*>', '', content)
-    
-    # Fix 9: Fix broken table formatting with long content
+    # Fix 4: Fix broken table formatting with long content
     lines = content.split('\n')
     fixed_lines = []
     
@@ -58,14 +45,25 @@ def fix_mdx_errors(file_path):
     
     content = '\n'.join(fixed_lines)
     
-    # Fix 10: Remove any remaining problematic patterns
+    # Fix 5: Remove any remaining problematic patterns
     content = re.sub(r'\\{2,}', r'\\', content)  # Fix multiple backslashes
     content = re.sub(r'\n{3,}', '\n\n', content)  # Fix excessive line breaks
     
+    return content
+
+def fix_mdx_errors(file_path):
+    """Fix common MDX compilation errors in a file"""
+    print(f"Checking: {file_path}")
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    original_content = content
+    content = apply_mdx_fixes(content)
+    
     # Write back if changed
     if content != original_content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        writer.write(file_path, content)
         print(f"Fixed: {file_path}")
         return True
     else:
@@ -79,12 +77,18 @@ def main():
     # Find all .md files in docs directory
     md_files = glob.glob('docs/**/*.md', recursive=True)
     
-    fixed_count = 0
-    for file_path in md_files:
-        if fix_mdx_errors(file_path):
-            fixed_count += 1
+    # Only files changed since the last run (or after a fixer change) need work
+    index = PostprocessIndex('fix_remaining_mdx_errors')
+    version = chain_version(mdx_escape, apply_mdx_fixes)
+    pending_files = index.filter(md_files, version)
+    print(f"{len(md_files) - len(pending_files)} files unchanged since last run")
+    
+    fixed_files, _ = run_fixer(apply_mdx_fixes, sorted(pending_files), writer, index, version)
+    fixed_count = len(fixed_files)
+    index.close()
     
     print(f"\nFixed {fixed_count} files")
+    writer.report()
     print("MDX error fixing completed!")
 
 if __name__ == "__main__":
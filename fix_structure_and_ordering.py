@@ -5,6 +5,11 @@ import shutil
 import json
 import re
 
+from doc_writer import DocWriter
+from frontmatter import Document
+
+writer = DocWriter()
+
 def create_category_json(path, label, position=1):
     """Create a _category_.json file"""
     category_config = {
@@ -12,10 +17,8 @@ def create_category_json(path, label, position=1):
         "position": position
     }
     
-    os.makedirs(path, exist_ok=True)
     category_file = os.path.join(path, "_category_.json")
-    with open(category_file, 'w', encoding='utf-8') as f:
-        json.dump(category_config, f, indent=2)
+    writer.write_json(category_file, category_config)
     print(f"Created: {category_file}")
 
 def add_frontmatter_position(file_path, position):
@@ -30,10 +33,10 @@ def add_frontmatter_position(file_path, position):
     # Check if frontmatter exists
     if content.startswith('---'):
         # Split frontmatter and content
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            frontmatter = parts[1].strip()
-            body = parts[2]
+        doc = Document(content)
+        if doc.has_frontmatter:
+            frontmatter = doc.frontmatter_text.strip()
+            body = doc.body
             
             # Add position if not already present
             if 'sidebar_position:' not in frontmatter:
@@ -42,7 +45,7 @@ def add_frontmatter_position(file_path, position):
                 # Update existing position
                 frontmatter = re.sub(r'sidebar_position:\s*\d+', f'sidebar_position: {position}', frontmatter)
             
-            new_content = f"---\n{frontmatter}\n---{body}"
+            new_content = f"---\n{frontmatter}\n---\n{body}"
         else:
             new_content = content
     else:
@@ -53,9 +56,8 @@ sidebar_position: {position}
 
 {content}"""
     
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    print(f"Updated position {position}: {file_path}")
+    if writer.write(file_path, new_content):
+        print(f"Updated position {position}: {file_path}")
 
 def fix_learn_the_basics():
     """Convert learn-the-basics.md to a directory structure"""
@@ -96,8 +98,7 @@ This page covers {title.lower()} concepts in Make.com automation.
 
 (Content to be added from Make.com help center)
 """
-            with open(page_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            writer.write(page_path, content)
             print(f"Created: {page_path}")
 
 def order_create_scenario_steps():
@@ -156,8 +157,7 @@ def update_subdirectory_positions():
         with open(learn_basics_cat, 'r', encoding='utf-8') as f:
             config = json.load(f)
         config['position'] = 1
-        with open(learn_basics_cat, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        writer.write_json(learn_basics_cat, config)
         print(f"Updated position for learn-the-basics: 1")
     
     # Update create-your-first-scenario position
@@ -166,8 +166,7 @@ def update_subdirectory_positions():
         with open(create_cat, 'r', encoding='utf-8') as f:
             config = json.load(f)
         config['position'] = 2
-        with open(create_cat, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        writer.write_json(create_cat, config)
         print(f"Updated position for create-your-first-scenario: 2")
     
     # Update expand-your-scenario position
@@ -176,8 +175,7 @@ def update_subdirectory_positions():
         with open(expand_cat, 'r', encoding='utf-8') as f:
             config = json.load(f)
         config['position'] = 3
-        with open(expand_cat, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        writer.write_json(expand_cat, config)
         print(f"Updated position for expand-your-scenario: 3")
 
 def main():
@@ -197,6 +195,7 @@ def main():
     
     # 3. Update subdirectory positions
     update_subdirectory_positions()
+    writer.report()
     
     print("\n" + "=" * 60)
     print("Structure and ordering fixes completed!")
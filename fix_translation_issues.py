@@ -4,6 +4,8 @@
 1. 翻译失败的文件
 2. 翻译 front-matter 中的标题
 3. 翻译 _category_.json 文件
+
+标题和分类标签优先使用下面已审定的译文，其余的批量翻译（几个请求完成全部短字符串）
 """
 
 import os
@@ -12,9 +14,11 @@ import json
 import re
 import yaml
 from pathlib import Path
-from Reflection_Workflow_XAI import translate_text
+from Reflection_Workflow_XAI import translate_text, translate_strings, close_shared_client
+from frontmatter import Document, split_frontmatter
+from glossary_miner import load_glossary
 
-# 标题翻译词典
+# 已审定的标题翻译（优先于批量翻译结果）
 TITLE_TRANSLATIONS = {
     "Get Started": "开始使用",
     "Learn the basics": "学习基础知识", 
@@ -40,6 +44,29 @@ TITLE_TRANSLATIONS = {
     "Step 7. Test the final scenario": "步骤 7. 测试最终场景",
 }
 
+# 已审定的分类标签和描述翻译
+CATEGORY_TRANSLATIONS = {
+    "Get Started": "开始使用",
+    "Start your automation journey with Make.com": "开始您的 Make.com 自动化之旅",
+    "Learn the basics": "学习基础知识",
+    "Create your first scenario": "创建你的第一个场景",
+    "Expand your scenario": "扩展你的场景"
+}
+
+_CJK = re.compile(r'[\u4e00-\u9fff]')
+
+
+async def translate_short_strings(texts, approved):
+    """已审定的直接使用，其余未翻译（不含中文）的字符串批量翻译"""
+    translations = {text: approved[text] for text in texts if text in approved}
+    pending = [text for text in dict.fromkeys(texts)
+               if text not in translations and text.strip() and not _CJK.search(text)]
+    if pending:
+        translations.update(await translate_strings(pending, source_lang="English", target_lang="Chinese",
+                                                    glossary={**load_glossary(locked_only=True), **approved},
+                                                    model="grok-3-mini"))
+    return translations
+
 async def translate_failed_file():
     """翻译失败的文件"""
     file_path = Path("docs/get-started/expand-your-scenario/step-1-get-your-app-ready.md")
@@ -56,23 +83,16 @@ async def translate_failed_file():
             content = f.read()
         
         # 分离 front-matter
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter = f"---{parts[1]}---"
-                body = parts[2].strip()
-            else:
-                frontmatter = ""
-                body = content
-        else:
-            frontmatter = ""
-            body = content
+        frontmatter, body = split_frontmatter(content)
+        if frontmatter:
+            body = body.strip()
         
         # 翻译正文
         result = await translate_text(
             source_text=body,
             source_lang="English",
             target_lang="Chinese",
+            glossary=load_glossary(locked_only=True),
             model="grok-3-mini"
         )
         
@@ -113,13 +133,15 @@ def clean_translation_artifacts(text: str) -> str:
     cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
     return cleaned.strip()
 
-def translate_frontmatter_titles():
+async def translate_frontmatter_titles():
     """翻译所有 markdown 文件的 front-matter 标题"""
     print("🔄 翻译 front-matter 标题...")
     
     docs_dir = Path("docs/get-started")
     count = 0
     
+    # 先收集所有标题，再一次性批量翻译
+    documents = []
     for md_file in docs_dir.rglob("*.md"):
         if md_file.name.startswith('_'):
             continue
@@ -128,42 +150,14 @@ def translate_frontmatter_titles():
             with open(md_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            if not content.startswith('---'):
-                continue
-            
-            parts = content.split('---', 2)
-            if len(parts) < 3:
+            doc = Document(content)
+            if not doc.has_frontmatter:
                 continue
             
-            # 解析 front-matter
-            fm_content = parts[1].strip()
-            body = parts[2]
-            
-            # 使用 yaml 解析
+            # 读取标题时才解析 yaml
             try:
-                fm_data = yaml.safe_load(fm_content)
-                if not isinstance(fm_data, dict):
-                    continue
-                
-                # 翻译标题
-                if 'title' in fm_data:
-                    original_title = fm_data['title'].strip('"\'')
-                    if original_title in TITLE_TRANSLATIONS:
-                        fm_data['title'] = TITLE_TRANSLATIONS[original_title]
-                        
-                        # 重新生成 front-matter
-                        new_fm = yaml.dump(fm_data, default_flow_style=False, allow_unicode=True)
-                        new_content = f"---\n{new_fm}---{body}"
-                        
-                        # 写回文件
-                        with open(md_file, 'w', encoding='utf-8') as f:
-                            f.write(new_content)
-                        
-                        print(f"✅ 翻译标题: {md_file.name} - {original_title} -> {TITLE_TRANSLATIONS[original_title]}")
-                        count += 1
-                    else:
-                        print(f"⚠️  未找到翻译: {md_file.name} - {original_title}")
-                        
+                if 'title' in doc.data:
+                    documents.append((md_file, doc, str(doc.data['title']).strip('"\'')))
             except yaml.YAMLError as e:
                 print(f"❌ YAML 解析错误: {md_file} - {e}")
                 continue
@@ -172,28 +166,56 @@ def translate_frontmatter_titles():
             print(f"❌ 处理文件错误: {md_file} - {e}")
             continue
     
+    translations = await translate_short_strings([title for _, _, title in documents], TITLE_TRANSLATIONS)
+    
+    for md_file, doc, original_title in documents:
+        # 翻译标题
+        if original_title in translations:
+            try:
+                doc.set('title', translations[original_title])
+                
+                # 重新生成 front-matter
+                new_content = doc.render(allow_unicode=True)
+                
+                # 写回文件
+                with open(md_file, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
+                
+                print(f"✅ 翻译标题: {md_file.name} - {original_title} -> {translations[original_title]}")
+                count += 1
+            except Exception as e:
+                print(f"❌ 处理文件错误: {md_file} - {e}")
+        elif not _CJK.search(original_title):
+            print(f"⚠️  未找到翻译: {md_file.name} - {original_title}")
+    
     print(f"📊 共翻译了 {count} 个标题")
 
-def translate_category_files():
+async def translate_category_files():
     """翻译 _category_.json 文件"""
     print("🔄 翻译分类文件...")
     
-    category_translations = {
-        "Get Started": "开始使用",
-        "Start your automation journey with Make.com": "开始您的 Make.com 自动化之旅",
-        "Learn the basics": "学习基础知识",
-        "Create your first scenario": "创建你的第一个场景",
-        "Expand your scenario": "扩展你的场景"
-    }
-    
     docs_dir = Path("docs/get-started")
     count = 0
     
+    # 先收集所有标签和描述，再一次性批量翻译
+    categories = []
     for category_file in docs_dir.rglob("_category_.json"):
         try:
             with open(category_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+                categories.append((category_file, json.load(f)))
+        except Exception as e:
+            print(f"❌ 处理分类文件错误: {category_file} - {e}")
+    
+    texts = []
+    for _, data in categories:
+        if 'label' in data:
+            texts.append(data['label'])
+        if 'description' in data.get('link', {}):
+            texts.append(data['link']['description'])
+    category_translations = await translate_short_strings(texts, CATEGORY_TRANSLATIONS)
+    
+    for category_file, data in categories:
+        try:
             modified = False
             
             # 翻译 label
@@ -230,19 +252,22 @@ async def main():
     print("\n" + "="*50)
     print("1. 翻译失败的文件")
     print("="*50)
-    await translate_failed_file()
-    
-    # 2. 翻译 front-matter 标题
-    print("\n" + "="*50)
-    print("2. 翻译页面标题")
-    print("="*50)
-    translate_frontmatter_titles()
-    
-    # 3. 翻译分类文件
-    print("\n" + "="*50)
-    print("3. 翻译分类文件")
-    print("="*50)
-    translate_category_files()
+    try:
+        await translate_failed_file()
+        
+        # 2. 翻译 front-matter 标题
+        print("\n" + "="*50)
+        print("2. 翻译页面标题")
+        print("="*50)
+        await translate_frontmatter_titles()
+        
+        # 3. 翻译分类文件
+        print("\n" + "="*50)
+        print("3. 翻译分类文件")
+        print("="*50)
+        await translate_category_files()
+    finally:
+        await close_shared_client()
     
     print("\n🎉 修复完成！")
 
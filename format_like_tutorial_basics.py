@@ -5,6 +5,13 @@ import re
 import glob
 import json
 
+from doc_writer import DocWriter
+from postprocess_index import PostprocessIndex
+from source_fingerprint import chain_version
+from frontmatter import Document
+
+writer = DocWriter()
+
 def extract_meaningful_content(content):
     """Extract only the meaningful content, following tutorial-basics style"""
     lines = content.split('\n')
@@ -82,20 +89,23 @@ def create_tutorial_style_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         original_content = f.read()
     
+    return tutorial_style_content(original_content)
+
+def tutorial_style_content(original_content):
+    """Return a markdown document reformatted in tutorial-basics style"""
     # Extract current frontmatter
     frontmatter = {}
     body = original_content
     
-    if original_content.startswith('---'):
-        parts = original_content.split('---', 2)
-        if len(parts) >= 3:
-            fm_lines = parts[1].strip().split('\n')
-            body = parts[2].strip()
-            
-            for line in fm_lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    frontmatter[key.strip()] = value.strip().strip('"\'')
+    doc = Document(original_content)
+    if doc.has_frontmatter:
+        fm_lines = doc.frontmatter_text.strip().split('\n')
+        body = doc.body.strip()
+        
+        for line in fm_lines:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                frontmatter[key.strip()] = value.strip().strip('"\'')
     
     # Get clean content
     clean_content = extract_meaningful_content(body)
@@ -192,9 +202,8 @@ def update_category_files():
     
     for file_path, config in categories.items():
         if os.path.exists(file_path):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
-            print(f"✅ Updated: {file_path}")
+            if writer.write_json(file_path, config):
+                print(f"✅ Updated: {file_path}")
 
 def main():
     """Format all get-started files like tutorial-basics"""
@@ -210,8 +219,14 @@ def main():
     print("📝 Processing markdown files...")
     md_files = glob.glob('docs/get-started/**/*.md', recursive=True)
     
+    # Skip files already formatted by this version of the formatter
+    index = PostprocessIndex('format_like_tutorial_basics')
+    version = chain_version(extract_meaningful_content, tutorial_style_content)
+    pending_files = index.filter(md_files, version)
+    print(f"⏭️ {len(md_files) - len(pending_files)} files unchanged since last run")
+    
     fixed_count = 0
-    for file_path in md_files:
+    for file_path in pending_files:
         try:
             print(f"Processing: {file_path}")
             
@@ -222,17 +237,19 @@ def main():
             new_content = create_tutorial_style_file(file_path)
             
             if new_content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
+                writer.write(file_path, new_content)
                 print(f"✅ Reformatted: {file_path}")
                 fixed_count += 1
             else:
                 print(f"✅ Already clean: {file_path}")
+            index.mark(file_path, version)
         except Exception as e:
             print(f"❌ Error: {file_path} - {e}")
+    index.close()
     
     print(f"\n🎉 Formatting completed!")
     print(f"📊 Reformatted {fixed_count} out of {len(md_files)} files")
+    writer.report()
     print("\n✨ Now following tutorial-basics style:")
     print("   • Simple frontmatter (only sidebar_position)")
     print("   • Clean, meaningful content only")
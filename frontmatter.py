@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Shared frontmatter parser/serializer for the docs scripts
+Splits on the '---' delimiter lines (never on '---' inside the body) and
+only parses YAML when a field is actually read
+"""
+
+import re
+from functools import lru_cache
+
+import yaml
+
+DELIMITER = '---'
+
+# Scalars that yaml.dump writes unquoted and unchanged
+_PLAIN_SCALAR = re.compile(r"^[A-Za-z0-9][A-Za-z0-9 _.,()/'?!&+-]*$")
+_RESOLVER = yaml.resolver.Resolver()
+_YAML_LINE_WIDTH = 80
+
+
+def _delimiter_line_end(content, start):
+    """Return the end index (past the newline) if a '---' line starts at start"""
+    if not content.startswith(DELIMITER, start):
+        return None
+    pos = start + len(DELIMITER)
+    newline = content.find('\n', pos)
+    line_end = len(content) if newline == -1 else newline
+    if content[pos:line_end].strip():
+        return None
+    return line_end if newline == -1 else newline + 1
+
+
+def split_offsets(content):
+    """Locate frontmatter in content
+
+    Returns (yaml_start, yaml_end, block_end, body_start) or None, where
+    content[yaml_start:yaml_end] is the YAML text, content[:block_end] is
+    the whole block including the closing '---' (without its newline) and
+    content[body_start:] is the body.
+    """
+    yaml_start = _delimiter_line_end(content, 0)
+    if yaml_start is None:
+        return None
+
+    line_start = yaml_start
+    while True:
+        body_start = _delimiter_line_end(content, line_start)
+        if body_start is not None:
+            return yaml_start, line_start, line_start + len(DELIMITER), body_start
+        found = content.find('\n' + DELIMITER, line_start)
+        if found == -1:
+            return None
+        line_start = found + 1
+
+
+def split_frontmatter(content):
+    """Split content into (frontmatter_block, body)
+
+    frontmatter_block is '---\\n...\\n---' exactly as in the source (empty
+    string if there is none); body starts after the closing delimiter line.
+    No YAML is parsed.
+    """
+    offsets = split_offsets(content)
+    if offsets is None:
+        return "", content
+    _, _, block_end, body_start = offsets
+    return content[:block_end], content[body_start:]
+
+
+class Document:
+    """A Markdown document with lazily parsed frontmatter"""
+
+    __slots__ = ('source', '_offsets', '_data', '_dirty', 'body')
+
+    def __init__(self, source):
+        self.source = source
+        self._offsets = split_offsets(source)
+        self._data = None
+        self._dirty = False
+        self.body = source if self._offsets is None else source[self._offsets[3]:]
+
+    @property
+    def has_frontmatter(self):
+        return self._offsets is not None
+
+    @property
+    def frontmatter_text(self):
+        """Raw YAML text between the delimiters"""
+        if self._offsets is None:
+            return ""
+        return self.source[self._offsets[0]:self._offsets[1]]
+
+    @property
+    def frontmatter_block(self):
+        """'---\\n...\\n---' as written in the source"""
+        if self._offsets is None:
+            return ""
+        return self.source[:self._offsets[2]]
+
+    @property
+    def data(self):
+        """Parsed frontmatter dict; YAML is only parsed on first access"""
+        if self._data is None:
+            parsed = yaml.safe_load(self.frontmatter_text) if self.frontmatter_text.strip() else None
+            self._data = parsed if isinstance(parsed, dict) else {}
+        return self._data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self._dirty = True
+
+    def render(self, allow_unicode=False):
+        """Serialize back to text
+
+        Untouched frontmatter is copied verbatim, so body-only fixers keep
+        the original bytes and never run YAML.
+        """
+        if self._dirty:
+            return f"---\n{dump_frontmatter(self.data, allow_unicode)}---\n{self.body}"
+        if self._offsets is None:
+            return self.body
+        return self.source[:self._offsets[3]] + self.body
+
+
+@lru_cache(maxsize=4096)
+def _plain_scalar(value):
+    """Return value if yaml.dump would emit it unquoted, else None"""
+    if (_PLAIN_SCALAR.match(value) and not value.endswith(' ')
+            and ': ' not in value and ' #' not in value
+            and _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) == 'tag:yaml.org,2002:str'):
+        return value
+    return None
+
+
+def _fast_line(key, value):
+    # Keys go through the same check: 'yes', 'null' or '1' must stay quoted
+    key = _plain_scalar(key) if isinstance(key, str) else None
+    if key is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return f"{key}: {value}"
+    if isinstance(value, str):
+        scalar = _plain_scalar(value)
+        if scalar is not None:
+            line = f"{key}: {scalar}"
+            if len(line) <= _YAML_LINE_WIDTH:
+                return line
+    return None
+
+
+def dump_frontmatter(data, allow_unicode=False):
+    """Serialize a flat frontmatter dict like yaml.dump(default_flow_style=False)
+
+    The common title/sidebar_position/description shape with plain strings
+    and ints is emitted directly; anything else falls back to yaml.dump.
+    Output is identical either way (keys sorted, trailing newline).
+    """
+    lines = []
+    for key in sorted(data):
+        line = _fast_line(key, data[key])
+        if line is None:
+            return yaml.dump(data, default_flow_style=False, allow_unicode=allow_unicode)
+        lines.append(line)
+    if not lines:
+        return yaml.dump(data, default_flow_style=False, allow_unicode=allow_unicode)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,171 @@
+"""
+译文的术语一致性检查和定点修复
+- 原文和译文按段落对齐（与翻译记忆相同的切分），逐段找出原文中出现的术语（代码、链接等屏蔽内容除外），
+  检查译文的对应段落是否使用了术语表要求的译法
+- 只把不合规的段落交给一次聚焦的修复请求（相邻段落作为上下文），不重跑整篇的三阶段工作流
+- 译文段落数与原文不一致、无法对齐时只报告，不修复
+- 提供翻译记忆时，采用的修复写回该段落的记忆记录，下次命中记忆时不再出现同样的违规
+"""
+
+import re
+import json
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from Reflection_Workflow_XAI import TranslationAgent
+from translation_depth import SINGLE, FULL
+from glossary_matcher import GlossaryMatcher
+from markdown_masking import mask_markdown
+from translation_budget import TranslationBudget
+from translation_memory import TranslationMemory, split_segments, join_segments
+
+# 修复请求中作为上下文的前后段落数
+CONTEXT_SEGMENTS = 1
+# 同时进行的修复请求数
+MAX_PARALLEL_REPAIRS = 4
+
+_SPACE = re.compile(r'\s+')
+
+
+def _normalize(text: str) -> str:
+    # 中文译文中术语前后的空格可有可无（"API 密钥" 与 "API密钥"）
+    return _SPACE.sub('', text).lower()
+
+
+def segment_violations(source: str, translation: str, matcher: GlossaryMatcher) -> Dict[str, str]:
+    """一个段落中未按术语表翻译的术语: {术语: 要求的译法}"""
+    masked, _ = mask_markdown(source)
+    target = _normalize(translation)
+    return {
+        term: matcher.glossary[term]
+        for term in sorted(matcher.find(masked))
+        if _normalize(matcher.glossary[term]) not in target
+    }
+
+
+class ComplianceReport:
+    """
+    一篇译文的检查结果
+
+    violations: {段落序号: {术语: 要求的译法}}；无法对齐时整篇作为序号-1
+    """
+
+    def __init__(self, source: str, translation: str, glossary: Dict[str, str],
+                 matcher: Optional[GlossaryMatcher] = None):
+        self.matcher = matcher or GlossaryMatcher(glossary)
+        self.source_spans = split_segments(source)
+        self.target_spans = split_segments(translation)
+        self.aligned = len(self.source_spans) == len(self.target_spans)
+        self.violations: Dict[int, Dict[str, str]] = {}
+
+        if self.aligned:
+            for index, ((s_start, s_end), (t_start, t_end)) in enumerate(zip(self.source_spans, self.target_spans)):
+                found = segment_violations(source[s_start:s_end], translation[t_start:t_end], self.matcher)
+                if found:
+                    self.violations[index] = found
+        else:
+            found = segment_violations(source, translation, self.matcher)
+            if found:
+                self.violations[-1] = found
+
+    @property
+    def count(self) -> int:
+        return sum(len(terms) for terms in self.violations.values())
+
+
+def check_compliance(source: str, translation: str, glossary: Dict[str, str]) -> ComplianceReport:
+    return ComplianceReport(source, translation, glossary)
+
+
+def store_repair(memory: TranslationMemory, source: str, fixed: str, source_lang: str, target_lang: str,
+                 country: Optional[str], glossary: Dict[str, str], model: str, tokens: Dict[str, int]):
+    """
+    把修复后的段落写回翻译记忆（键与TranslationAgent的段落级翻译记忆一致）
+
+    覆盖该段落已有的单次/完整译文记录，保留其初步译文和反思；没有记录时按单次翻译存储
+    """
+    version = TranslationAgent.prompt_version()
+    scope = memory.make_scope(source_lang, target_lang, country, glossary, model, version)
+    keys = [
+        memory.make_key(source, source_lang, target_lang, country, glossary, model,
+                        TranslationAgent.depth_version(version, depth))
+        for depth in (FULL, SINGLE)
+    ]
+    stored = False
+    for key in keys:
+        row = memory.get(key)
+        if row is not None:
+            memory.store(key, source, fixed, row["initial_translation"], json.loads(row["reflection"] or "[]"),
+                         {"input": row["input_tokens"], "output": row["output_tokens"]}, row["model"], scope)
+            stored = True
+    if not stored:
+        memory.store(keys[-1], source, fixed, tokens=tokens, model=model, scope=scope)
+
+
+async def enforce_glossary(source: str, translation: str, glossary: Dict[str, str],
+                           source_lang: str = "English", target_lang: str = "Chinese",
+                           agent: Optional[TranslationAgent] = None, model: str = "grok-3-mini",
+                           budget: Optional[TranslationBudget] = None,
+                           priority: float = 0, memory: Optional[TranslationMemory] = None,
+                           country: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    检查译文并定点修复不合规的段落（提供memory时采用的修复写回翻译记忆）
+
+    Returns:
+        (修复后的译文, 统计)；修复结果只有在违规术语变少时才采用
+    """
+    report = check_compliance(source, translation, glossary)
+    stats = {
+        "segments": len(report.source_spans), "violations": report.count, "repaired_segments": 0,
+        "fixed": 0, "remaining": report.count, "tokens": {"input": 0, "output": 0}, "cost": 0.0,
+    }
+    if not report.violations:
+        return translation, stats
+    if not report.aligned:
+        terms = ", ".join(report.violations[-1])
+        print(f"⚠️  术语检查: {report.count} 个术语未按术语表翻译 ({terms})，译文段落与原文无法对齐，未修复")
+        return translation, stats
+
+    agent = agent or TranslationAgent(model=model, budget=budget, priority=priority)
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_REPAIRS)
+    sources = [source[start:end] for start, end in report.source_spans]
+    targets = [translation[start:end] for start, end in report.target_spans]
+
+    async def repair(index: int) -> Tuple[int, Optional[str], Dict[str, int]]:
+        terms = report.violations[index]
+        context = "\n\n".join(sources[max(0, index - CONTEXT_SEGMENTS):index] +
+                              sources[index + 1:index + 1 + CONTEXT_SEGMENTS])
+        try:
+            async with semaphore:
+                fixed, tokens = await agent.repair_terms(sources[index], targets[index], terms,
+                                                         source_lang, target_lang, context or None)
+        except Exception as e:
+            print(f"❌ 术语修复失败 (段落 {index + 1}): {e}")
+            return index, None, {"input": 0, "output": 0}
+        return index, fixed, tokens
+
+    results = await asyncio.gather(*(repair(index) for index in report.violations))
+    repaired_chars = 0
+    for index, fixed, tokens in results:
+        stats["tokens"]["input"] += tokens["input"]
+        stats["tokens"]["output"] += tokens["output"]
+        stats["cost"] += agent._calculate_cost(tokens)
+        if not fixed:
+            continue
+        remaining = segment_violations(sources[index], fixed, report.matcher)
+        before = len(report.violations[index])
+        if len(remaining) < before:
+            targets[index] = fixed
+            stats["repaired_segments"] += 1
+            stats["fixed"] += before - len(remaining)
+            stats["remaining"] -= before - len(remaining)
+            repaired_chars += len(sources[index])
+            if memory is not None:
+                store_repair(memory, sources[index], fixed, source_lang, target_lang, country, glossary,
+                             agent.model, tokens)
+
+    share = repaired_chars / max(len(source), 1)
+    print(f"🧾 术语检查: {report.count} 个术语违规，分布在 {len(report.violations)}/{len(sources)} 个段落；"
+          f"修复 {stats['fixed']} 个 (重译约 {share * 100:.0f}% 的原文，${stats['cost']:.4f})"
+          + (f"，仍有 {stats['remaining']} 个未修复" if stats["remaining"] else ""))
+    return join_segments(translation, report.target_spans, targets), stats
@@ -0,0 +1,92 @@
+"""
+按文本筛选术语表（Aho-Corasick多模式匹配）
+- 一次扫描找出文本中出现的所有术语，耗时与术语表大小无关
+- 不区分大小写，要求完整单词匹配，允许英文复数后缀（module → modules）
+- 只把出现的术语注入提示词，减少每个请求的输入token
+"""
+
+from collections import deque
+from typing import Dict, List, Set
+
+# 术语后允许的复数后缀
+_SUFFIXES = ("s", "es")
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class GlossaryMatcher:
+    """术语表的Aho-Corasick自动机"""
+
+    def __init__(self, glossary: Dict[str, str]):
+        self.glossary = dict(glossary)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for term in self.glossary:
+            self._add(term)
+        self._build()
+
+    def _add(self, term: str):
+        key = term.lower()
+        if not key:
+            return
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(term)
+
+    def _build(self):
+        """按层次计算失败指针，并合并输出"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _at_boundary(self, text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if end >= len(text) or not _is_word_char(text[end]):
+            return True
+        for suffix in _SUFFIXES:
+            tail = end + len(suffix)
+            if text[end:tail].lower() == suffix and (tail >= len(text) or not _is_word_char(text[tail])):
+                return True
+        return False
+
+    def find(self, text: str) -> Set[str]:
+        """文本中出现的术语"""
+        found: Set[str] = set()
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # 个别字符小写后长度变化时，按原文逐字比较
+            lowered = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+        state = 0
+        for index, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for term in self._output[state]:
+                if term not in found and self._at_boundary(text, index + 1 - len(term), index + 1):
+                    found.add(term)
+        return found
+
+    def filter(self, text: str) -> Dict[str, str]:
+        """只保留文本中出现的术语（保持术语表原有顺序）"""
+        found = self.find(text)
+        return {term: translation for term, translation in self.glossary.items() if term in found}
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+从docs/语料中挖掘术语表
+- 统计1~3元词组的词频和文档频率（代码、链接、标签先屏蔽，跨页面重复的导航行剔除）
+- 按大写比例、标题/加粗出现次数等产品术语特征打分，提出候选术语
+- 术语表保存在 glossary.json；已锁定的译文不会被重新挖掘或翻译覆盖
+- 翻译脚本只使用已锁定的译文（load_glossary(locked_only=True)）
+
+用法:
+    python glossary_miner.py mine [--docs docs] [--top 150]   # 挖掘并合并候选术语
+    python glossary_miner.py translate                        # 批量翻译还没有译文的术语
+    python glossary_miner.py lock scenario=场景 module=模块    # 锁定指定译文
+    python glossary_miner.py lock --all                       # 锁定所有已有译文
+    python glossary_miner.py show
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import asyncio
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from frontmatter import split_frontmatter
+from markdown_masking import mask_markdown
+
+GLOSSARY_PATH = "glossary.json"
+DOC_SUFFIXES = ('.md', '.mdx')
+
+MAX_NGRAM = 3
+# 至少出现在这么多个文档中
+MIN_DOC_FREQ = 2
+# 出现在超过该比例文档中的整行或长词串视为导航、cookie提示等模板内容
+BOILERPLATE_DF = 0.05
+# 检测行内模板内容的词串长度
+SHINGLE_WORDS = 6
+DEFAULT_TOP = 150
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being below between both but by
+can could did do does doing down during each either etc few for from further get gets got had has have having he
+her here hers him his how i if in into is it its itself just let lets may me might more most must my no nor not
+now of off on once one only or other our out over own same see she should so some such than that the their them
+then there these they this those through to too under until up upon us use used uses using very via want was we
+were what when where which while who whom why will with within without would you your yours new next first last
+example click select enter open make sure need needs also like well way back many much even every
+""".split())
+
+# 界面操作等常见词：单独出现时不作为术语（仍可作为词组的一部分）
+GENERIC_WORDS = frozenset("""
+add create update delete remove edit save manage run search access type name title necessary page option
+options set setting settings view list item items start stop check find follow learn go show hide change
+copy paste close data field information send error app user file message output description
+january february march april may june july august september october november december
+""".split())
+
+_PLACEHOLDER = re.compile(r'⟦\s*\d+\s*⟧')
+_SENTENCE_BREAK = re.compile(r'[.!?;:,()\[\]{}|"“”]+|\s[-–—]\s|\n')
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9'&+-]*")
+_HEADING = re.compile(r'^#{1,6}\s+(.*)$', re.MULTILINE)
+_BOLD = re.compile(r'\*\*([^*\n]+)\*\*|__([^_\n]+)__')
+_CJK = re.compile(r'[一-鿿]')
+# 标识符写法：首字母之后还有大写（API、OAuth）、数字或下划线
+_IDENTIFIER = re.compile(r'.[A-Z]|[0-9_]')
+
+
+def _document_files(docs_dir: str) -> List[str]:
+    paths = []
+    for root, _, files in os.walk(docs_dir):
+        for name in files:
+            if name.endswith(DOC_SUFFIXES):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _document_body(path: str) -> str:
+    """正文（去掉frontmatter，代码/链接/标签替换为断句符）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        _, body = split_frontmatter(f.read())
+    masked, _ = mask_markdown(body)
+    return _PLACEHOLDER.sub('\n', masked)
+
+
+def _strip_boilerplate(bodies: List[str]) -> List[str]:
+    """
+    去掉在很多文档中重复出现的模板内容（爬取时带进来的导航、页脚、cookie提示）
+
+    整行重复的直接删除；导航菜单有时每项一行、有时和正文拼在同一行，
+    所以还按整篇文档的词序列删除跨文档重复的长词串。
+    """
+    limit = max(MIN_DOC_FREQ, len(bodies) * BOILERPLATE_DF)
+    line_df, shingle_df = Counter(), Counter()
+    documents = []
+    for body in bodies:
+        lines = [line.strip() for line in body.splitlines() if line.strip()]
+        # (行号, 词) 的序列，跨行连续
+        words = [(index, match) for index, line in enumerate(lines) for match in _WORD.finditer(line)]
+        documents.append((lines, words))
+        line_df.update(set(lines))
+        shingle_df.update(set(_shingles(words)))
+
+    cleaned = []
+    for lines, words in documents:
+        covered = set()
+        for start, shingle in enumerate(_shingles(words)):
+            if shingle_df[shingle] >= limit:
+                covered.update(range(start, start + SHINGLE_WORDS))
+
+        dropped = defaultdict(list)
+        for position in sorted(covered):
+            index, match = words[position]
+            dropped[index].append(match)
+        kept = []
+        for index, line in enumerate(lines):
+            if line_df[line] >= limit:
+                continue
+            # 被覆盖的词替换为断句符，避免两侧的词拼成词组
+            pieces, position = [], 0
+            for match in dropped.get(index, ()):
+                pieces.append(line[position:match.start()])
+                pieces.append('\n')
+                position = match.end()
+            pieces.append(line[position:])
+            kept.append(''.join(pieces))
+        cleaned.append('\n'.join(kept))
+    return cleaned
+
+
+def _shingles(words) -> List[tuple]:
+    lowered = [match.group().lower() for _, match in words]
+    return [tuple(lowered[i:i + SHINGLE_WORDS]) for i in range(len(lowered) - SHINGLE_WORDS + 1)]
+
+
+def _ngrams(words: List[str]) -> Iterable[List[str]]:
+    for size in range(1, MAX_NGRAM + 1):
+        for start in range(len(words) - size + 1):
+            gram = words[start:start + size]
+            if gram[0].lower() in STOPWORDS or gram[-1].lower() in STOPWORDS:
+                continue
+            yield start, gram
+
+
+class TermStats:
+    """每个候选术语（小写）的统计"""
+
+    __slots__ = ("tf", "df", "capitalized", "inner", "heading", "bold", "forms")
+
+    def __init__(self):
+        self.tf = 0
+        self.df = 0
+        self.capitalized = 0   # 出现在句中（非句首）且首字母大写的次数
+        self.inner = 0         # 出现在句中的总次数
+        self.heading = 0
+        self.bold = 0
+        self.forms = Counter()
+
+
+def count_terms(bodies: List[str]) -> Dict[str, TermStats]:
+    """统计所有文档中的n元词组"""
+    stats: Dict[str, TermStats] = defaultdict(TermStats)
+    texts = [
+        text for text in _strip_boilerplate(bodies)
+        # 已翻译的文档不参与挖掘
+        if len(_CJK.findall(text)) <= len(text) * 0.1
+    ]
+    sentences = [[part.strip() for part in _SENTENCE_BREAK.split(text) if part.strip()] for text in texts]
+    # 拼接在正文句末的短模板片段（例如cookie提示按钮文字）
+    sentence_df = Counter(part for parts in sentences for part in set(parts))
+    limit = max(MIN_DOC_FREQ, len(bodies) * BOILERPLATE_DF)
+
+    for text, parts in zip(texts, sentences):
+        seen = set()
+        for sentence in parts:
+            if sentence_df[sentence] >= limit and len(sentence.split()) < SHINGLE_WORDS:
+                continue
+            words = _WORD.findall(sentence)
+            for start, gram in _ngrams(words):
+                key = ' '.join(word.lower() for word in gram)
+                term = stats[key]
+                term.tf += 1
+                term.forms[' '.join(gram)] += 1
+                if start > 0:
+                    term.inner += 1
+                    if gram[0][0].isupper():
+                        term.capitalized += 1
+                seen.add(key)
+        for key in seen:
+            stats[key].df += 1
+
+        for pattern, field in ((_HEADING, "heading"), (_BOLD, "bold")):
+            for match in pattern.finditer(text):
+                phrase = next(group for group in match.groups() if group is not None)
+                words = [word.lower() for word in _WORD.findall(phrase)]
+                for _, gram in _ngrams(words):
+                    key = ' '.join(gram)
+                    if key in stats:
+                        setattr(stats[key], field, getattr(stats[key], field) + 1)
+    return stats
+
+
+def _merge_plurals(stats: Dict[str, TermStats]):
+    """把复数形式（modules）合并到单数（module）"""
+    for key in list(stats):
+        for suffix in ("es", "s"):
+            if key.endswith(suffix) and not key.endswith("ss"):
+                singular = key[:-len(suffix)]
+                if singular in stats and stats[singular].df >= MIN_DOC_FREQ:
+                    target, source = stats[singular], stats.pop(key)
+                    target.tf += source.tf
+                    target.df = max(target.df, source.df)
+                    target.capitalized += source.capitalized
+                    target.inner += source.inner
+                    target.heading += source.heading
+                    target.bold += source.bold
+                    break
+
+
+def _single_word_signal(term: TermStats, capitalized: float) -> bool:
+    if capitalized >= 0.5:
+        return True
+    form = term.forms.most_common(1)[0][0] if term.forms else ""
+    return bool(_IDENTIFIER.search(form))
+
+
+def score_terms(stats: Dict[str, TermStats], documents: int) -> Dict[str, float]:
+    """
+    给候选术语打分
+
+    词频和文档频率取对数；大写比例、标题和加粗出现次数作为产品术语的加分项。
+    单词术语必须在句中大多首字母大写或是标识符写法（API、OAuth）才保留，
+    标题和加粗只加分，避免data、field这类普通词。
+    """
+    scores = {}
+    for key, term in stats.items():
+        if term.df < MIN_DOC_FREQ or len(key) < 3 or key.replace(' ', '').isdigit():
+            continue
+        capitalized = term.capitalized / term.inner if term.inner else 0.0
+        product = capitalized + min(term.heading, 5) * 0.3 + min(term.bold, 5) * 0.3
+        words = key.count(' ') + 1
+        if words == 1 and (key in GENERIC_WORDS or not _single_word_signal(term, capitalized)):
+            continue
+        if words > 1 and term.df < MIN_DOC_FREQ + 1 and product < 0.5:
+            continue
+        scores[key] = (math.log1p(term.tf) * (1 + math.log(term.df)) * (1 + product)
+                       * (1 + 0.2 * (words - 1)) / (1 + math.log1p(term.df / max(documents, 1))))
+
+    # 几乎总是作为更长术语一部分出现的短词组不单独保留
+    for key in sorted(scores, key=lambda k: -k.count(' ')):
+        if key not in scores:
+            continue
+        for part_size in range(1, key.count(' ') + 1):
+            words = key.split(' ')
+            for start in range(len(words) - part_size + 1):
+                part = ' '.join(words[start:start + part_size])
+                if part in scores and stats[key].tf >= stats[part].tf * 0.8:
+                    del scores[part]
+    return scores
+
+
+def mine_terms(docs_dir: str = "docs", top: int = DEFAULT_TOP) -> List[Dict]:
+    """挖掘候选术语，按得分从高到低返回"""
+    paths = _document_files(docs_dir)
+    bodies = [_document_body(path) for path in paths]
+    stats = count_terms(bodies)
+    _merge_plurals(stats)
+    scores = score_terms(stats, len(bodies))
+
+    terms = []
+    for key in sorted(scores, key=scores.get, reverse=True)[:top]:
+        term = stats[key]
+        # 使用最常见的写法（保留产品名称的大小写）
+        display = term.forms.most_common(1)[0][0] if term.forms else key
+        if term.capitalized * 2 < term.inner:
+            display = display.lower()
+        terms.append({"term": display, "tf": term.tf, "df": term.df, "score": round(scores[key], 2)})
+    return terms
+
+
+def load_entries(path: str = GLOSSARY_PATH) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_entries(entries: Dict[str, Dict], path: str = GLOSSARY_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def load_glossary(path: str = GLOSSARY_PATH, locked_only: bool = False) -> Dict[str, str]:
+    """供翻译使用的 {术语: 译文}；没有译文的候选术语不包含在内"""
+    return {
+        term: entry["translation"]
+        for term, entry in load_entries(path).items()
+        if entry.get("translation") and (entry.get("locked") or not locked_only)
+    }
+
+
+def merge_terms(entries: Dict[str, Dict], terms: List[Dict]) -> Dict[str, Dict]:
+    """
+    把新挖掘的候选合并进术语表
+
+    已锁定或已有译文的条目保留（只更新统计）；不再出现且没有译文的候选删除。
+    """
+    lowered = {term.lower(): term for term in entries}
+    merged = {term: entry for term, entry in entries.items() if entry.get("locked") or entry.get("translation")}
+    for item in terms:
+        existing = lowered.get(item["term"].lower())
+        key = existing if existing in merged else item["term"]
+        entry = merged.setdefault(key, {"translation": None, "locked": False})
+        entry.update(tf=item["tf"], df=item["df"], score=item["score"])
+    return merged
+
+
+async def translate_entries(entries: Dict[str, Dict]) -> int:
+    """批量翻译没有译文的术语（以已锁定的译文作为参考术语表）"""
+    from Reflection_Workflow_XAI import translate_strings, close_shared_client
+
+    pending = [term for term, entry in entries.items() if not entry.get("translation")]
+    if not pending:
+        return 0
+    locked = {term: entry["translation"] for term, entry in entries.items() if entry.get("locked")}
+    try:
+        translations = await translate_strings(pending, source_lang="English", target_lang="Chinese",
+                                               glossary=locked or None)
+    finally:
+        await close_shared_client()
+    for term, translation in translations.items():
+        entries[term]["translation"] = translation
+    return len(translations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从docs/挖掘术语表并锁定译文")
+    parser.add_argument('--glossary', default=GLOSSARY_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    mine = commands.add_parser('mine', help="挖掘候选术语并合并到术语表")
+    mine.add_argument('--docs', default="docs")
+    mine.add_argument('--top', type=int, default=DEFAULT_TOP)
+
+    commands.add_parser('translate', help="批量翻译还没有译文的术语")
+
+    lock = commands.add_parser('lock', help="锁定译文")
+    lock.add_argument('pairs', nargs='*', help="术语=译文")
+    lock.add_argument('--all', action='store_true', help="锁定所有已有译文的术语")
+
+    commands.add_parser('show', help="显示术语表")
+    args = parser.parse_args()
+
+    entries = load_entries(args.glossary)
+
+    if args.command == 'mine':
+        terms = mine_terms(args.docs, args.top)
+        entries = merge_terms(entries, terms)
+        save_entries(entries, args.glossary)
+        print(f"🔎 挖掘出 {len(terms)} 个候选术语，术语表共 {len(entries)} 条: {args.glossary}")
+    elif args.command == 'translate':
+        count = asyncio.run(translate_entries(entries))
+        save_entries(entries, args.glossary)
+        print(f"🌐 翻译了 {count} 个术语")
+    elif args.command == 'lock':
+        locked = 0
+        for pair in args.pairs:
+            if '=' not in pair:
+                print(f"❌ 格式应为 术语=译文: {pair}")
+                return 1
+            term, translation = (part.strip() for part in pair.split('=', 1))
+            entries.setdefault(term, {}).update(translation=translation, locked=True)
+            locked += 1
+        if args.all:
+            for entry in entries.values():
+                if entry.get("translation") and not entry.get("locked"):
+                    entry["locked"] = True
+                    locked += 1
+        save_entries(entries, args.glossary)
+        print(f"🔒 锁定了 {locked} 个译文")
+    else:
+        for term, entry in sorted(entries.items(), key=lambda item: -item[1].get("score", 0)):
+            status = "🔒" if entry.get("locked") else ("  " if entry.get("translation") else "？")
+            print(f"{status} {term}: {entry.get('translation') or ''} "
+                  f"(df {entry.get('df', '-')}, tf {entry.get('tf', '-')}, score {entry.get('score', '-')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,6 @@ Based on actual website structure with proper multi-level directories
 """
 
 import requests
-import yaml
 import os
 import re
 import time
@@ -15,6 +14,10 @@ from bs4 import BeautifulSoup
 from collections import defaultdict, deque
 import json
 
+from doc_writer import DocWriter
+from sidebar_order import SidebarOrder
+from docs_manifest import DocsManifest
+
 class ImprovedMakeCrawler:
     def __init__(self, base_url="https://help.make.com"):
         self.base_url = base_url
@@ -22,6 +25,8 @@ class ImprovedMakeCrawler:
         self.page_content = {}
         self.docs_structure = defaultdict(list)
         self.failed_urls = set()
+        self.writer = DocWriter()
+        self.manifest = DocsManifest()
         
         # Jina.ai settings
         self.jina_base = "https://r.jina.ai/"
@@ -87,6 +92,13 @@ class ImprovedMakeCrawler:
             "https://help.make.com/2024",
         ]
         
+        # Seed URLs follow the site navigation, so they define sidebar order
+        nav_order = defaultdict(list)
+        for seed_url in self.seed_urls:
+            category_path, filename = self.determine_proper_category(seed_url)
+            nav_order["/".join(category_path)].append(filename)
+        self.sidebar_order = SidebarOrder(nav_order=nav_order)
+        
         print(f"🚀 Improved Make.com Documentation Crawler")
         print(f"📍 Base URL: {self.base_url}")
         print(f"🌐 Starting with {len(self.seed_urls)} seed URLs")
@@ -373,7 +385,7 @@ class ImprovedMakeCrawler:
         else:
             return ['misc'], filename
     
-    def create_improved_file(self, url, content, category_path, filename):
+    def create_improved_file(self, url, content, category_path, filename, raw_content=None):
         """Create properly structured documentation file"""
         
         if not content or len(content) < 100:
@@ -389,11 +401,9 @@ class ImprovedMakeCrawler:
         else:
             docs_dir = Path("docs")
         
-        docs_dir.mkdir(parents=True, exist_ok=True)
-        
         # Determine sidebar position
         category_key = "/".join(category_path)
-        position = len(self.docs_structure[category_key]) + 1
+        position = self.sidebar_order.position(category_key, filename)
         
         # Create frontmatter
         frontmatter = {
@@ -402,24 +412,18 @@ class ImprovedMakeCrawler:
             'description': f'Learn about {page_title.lower()} in Make.com automation platform'
         }
         
-        # Build file content
-        file_content = "---\n"
-        file_content += yaml.dump(frontmatter, default_flow_style=False)
-        file_content += "---\n\n"
-        file_content += f"# {page_title}\n\n"
-        file_content += content
-        
-        # Write file
+        # Write file (escaped for MDX as it is serialized)
         file_path = docs_dir / f"{filename}.md"
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(file_content)
-            
-            print(f"  ✅ Created: {file_path} ({len(content)} chars)")
+            if self.writer.write_markdown(file_path, frontmatter, f"# {page_title}\n\n{content}"):
+                print(f"  ✅ Created: {file_path} ({len(content)} chars)")
+            else:
+                print(f"  ⏭️ Unchanged: {file_path}")
             
             # Track in structure
             self.docs_structure[category_key].append(filename)
+            self.manifest.record_crawl(url, file_path, raw_content, content)
             
             return True
             
@@ -436,6 +440,7 @@ class ImprovedMakeCrawler:
         to_visit = deque(self.seed_urls)
         pages_processed = 0
         successful_files = 0
+        unchanged_files = 0
         
         while to_visit and pages_processed < max_pages:
             current_url = to_visit.popleft()
@@ -454,19 +459,26 @@ class ImprovedMakeCrawler:
             if not raw_content:
                 continue
             
-            # Clean content
-            clean_content = self.clean_content_properly(raw_content, current_url)
+            # Determine hierarchy (proper multi-level)
+            category_path, filename = self.determine_proper_category(current_url)
             
-            if clean_content:
-                # Determine hierarchy (proper multi-level)
-                category_path, filename = self.determine_proper_category(current_url)
+            if not self.manifest.raw_changed(current_url, raw_content) and \
+                    (Path("docs") / "/".join(category_path) / f"{filename}.md").exists():
+                # Same page as last crawl: keep the existing doc, only follow its links
+                print(f"  ⏭️ Unchanged since last crawl: {filename}")
+                self.docs_structure["/".join(category_path)].append(filename)
+                unchanged_files += 1
+            else:
+                # Clean content
+                clean_content = self.clean_content_properly(raw_content, current_url)
                 
                 # Create documentation file
-                if self.create_improved_file(current_url, clean_content, category_path, filename):
-                    successful_files += 1
-                
-                # Store content
-                self.page_content[current_url] = clean_content
+                if clean_content:
+                    if self.create_improved_file(current_url, clean_content, category_path, filename, raw_content):
+                        successful_files += 1
+                    
+                    # Store content
+                    self.page_content[current_url] = clean_content
             
             # Extract links
             links = self.extract_links_aggressively(raw_content, current_url)
@@ -484,9 +496,13 @@ class ImprovedMakeCrawler:
             # Be respectful to the server
             time.sleep(1.5)
         
+        self.sidebar_order.save(self.writer)
+        self.manifest.close()
+        
         print(f"\n✅ Improved crawling completed!")
         print(f"📊 Processed {pages_processed} pages")
         print(f"📊 Created {successful_files} documentation files")
+        print(f"📊 Unchanged since last crawl: {unchanged_files}")
         print(f"📊 Failed URLs: {len(self.failed_urls)}")
         
         return pages_processed, successful_files
@@ -619,8 +635,7 @@ class ImprovedMakeCrawler:
                 category_file = category_dir / "_category_.json"
                 
                 try:
-                    with open(category_file, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, indent=2)
+                    self.writer.write_json(category_file, config)
                     print(f"  ✅ Created: {category_file}")
                     created_count += 1
                 except Exception as e:
@@ -647,6 +662,7 @@ class ImprovedMakeCrawler:
         print(f"  📁 Categories created: {len([k for k, v in self.docs_structure.items() if v])}")
         print(f"  📝 Documentation files: {total_files}")
         print(f"  ❌ Failed URLs: {len(self.failed_urls)}")
+        self.writer.report()
         
         if self.failed_urls:
             print(f"\n⚠️ Failed URLs:")
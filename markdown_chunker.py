@@ -0,0 +1,66 @@
+"""
+按token预算切分Markdown文档
+- 以段落为最小单位（代码块不会被拆开），尽量在标题处断开
+- 返回原文中的(start, end)位置，可用 join_segments 无损拼接译文
+"""
+
+import re
+from typing import Callable, List, Tuple
+
+from translation_memory import split_segments
+
+_HEADING = re.compile(r'#{1,6}\s')
+
+# 每块的默认token预算和邻近上下文长度（字符）
+CHUNK_TOKENS = 1500
+CONTEXT_CHARS = 600
+
+
+def chunk_markdown(text: str, max_tokens: int = CHUNK_TOKENS,
+                   estimate: Callable[[str], int] = lambda s: len(s) // 3) -> List[Tuple[int, int]]:
+    """
+    把文档切分为不超过max_tokens的块
+
+    块内累计超过一半预算后遇到标题就开始新块；
+    单个超出预算的段落（如长代码块）单独成块。
+    """
+    chunks = []
+    chunk_start = None
+    chunk_end = 0
+    chunk_tokens = 0
+
+    for start, end in split_segments(text):
+        tokens = estimate(text[start:end])
+        is_heading = _HEADING.match(text, start) is not None
+        if chunk_start is not None and (
+            chunk_tokens + tokens > max_tokens or (is_heading and chunk_tokens >= max_tokens // 2)
+        ):
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = None
+            chunk_tokens = 0
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+        chunk_tokens += tokens
+
+    if chunk_start is not None:
+        chunks.append((chunk_start, chunk_end))
+    return chunks
+
+
+def chunk_context(text: str, chunks: List[Tuple[int, int]], index: int,
+                  context_chars: int = CONTEXT_CHARS) -> str:
+    """第index块前后相邻块的片段，作为翻译时的参考上下文"""
+    parts = []
+    if index > 0:
+        start, end = chunks[index - 1]
+        cut = max(start, end - context_chars)
+        if cut > start:
+            # 从完整的词开始
+            space = text.find(' ', cut, end)
+            cut = space + 1 if space != -1 else cut
+        parts.append("PRECEDING TEXT:\n" + text[cut:end])
+    if index + 1 < len(chunks):
+        start, end = chunks[index + 1]
+        parts.append("FOLLOWING TEXT:\n" + text[start:min(end, start + context_chars)])
+    return "\n\n".join(parts)
@@ -0,0 +1,155 @@
+"""
+翻译前屏蔽Markdown中不需要翻译的内容
+- 代码块、行内代码、图片、链接地址、URL、HTML/JSX标签、Make映射模板
+  替换为紧凑的占位符 ⟦n⟧，翻译后按原样（逐字节）恢复
+- 恢复时校验占位符是否丢失或被改写
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+
+# 行内需要屏蔽的内容（按优先级排列）
+_INLINE = re.compile(
+    r'(?P<code>(?P<ticks>`+)(?!`).+?(?<!`)(?P=ticks)(?!`))'
+    r'|(?P<image>!\[[^\]\n]*\]\([^)\n]*\))'
+    r'|(?<=\])(?P<target>\([^)\s]+(?:\s+"[^"\n]*")?\))'
+    r'|(?P<template>\\?\{\\?\{.*?\\?\}\\?\})'
+    r'|(?P<comment><!--.*?-->)'
+    r'|(?P<tag></?[A-Za-z][\w.:-]*(?:\s[^<>]*)?/?>)'
+    r'|(?P<url>https?://[^\s<>)\]]+)'
+)
+
+PLACEHOLDER = "⟦{}⟧"
+_PLACEHOLDER = re.compile(r'⟦\s*(\d+)\s*⟧')
+
+
+class Mask:
+    """占位符与原文的对应关系"""
+
+    def __init__(self):
+        self.originals: List[str] = []
+        self.blocks = set()           # 需要独占一行的占位符（代码块）
+        self.counts: Dict[int, int] = {}
+        self._index: Dict[str, int] = {}
+
+    def add(self, original: str, block: bool = False) -> str:
+        index = self._index.get(original)
+        if index is None:
+            index = len(self.originals)
+            self.originals.append(original)
+            self._index[original] = index
+        if block:
+            self.blocks.add(index)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        return PLACEHOLDER.format(index)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    @property
+    def masked_chars(self) -> int:
+        return sum(len(self.originals[i]) * n for i, n in self.counts.items())
+
+
+def _mask_inline(line: str, mask: Mask) -> str:
+    def replace(match):
+        kind = match.lastgroup if match.lastgroup != 'ticks' else 'code'
+        text = match.group()
+        if kind == 'target':
+            return '(' + mask.add(text[1:-1]) + ')'
+        return mask.add(text)
+    return _INLINE.sub(replace, line)
+
+
+def mask_markdown(text: str) -> Tuple[str, Mask]:
+    """把不需要翻译的内容替换为占位符，返回(屏蔽后的文本, Mask)"""
+    mask = Mask()
+    out = []
+    fence = None
+    block = []
+
+    for line in text.splitlines(keepends=True):
+        content = line.rstrip('\r\n')
+        fence_match = _FENCE.match(content)
+        if fence is not None:
+            block.append(line)
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence) \
+                    and not content.strip()[len(fence_match.group(1)):].strip():
+                # 代码块（不含最后的换行）整体作为一个占位符
+                code = ''.join(block)
+                newline = code[len(code.rstrip('\r\n')):]
+                out.append(mask.add(code[:len(code) - len(newline)], block=True) + newline)
+                fence = None
+                block = []
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            block = [line]
+            continue
+        out.append(_mask_inline(line, mask))
+
+    # 未闭合的代码块原样保留
+    out.extend(block)
+    return ''.join(out), mask
+
+
+def has_placeholders(text: str) -> bool:
+    return _PLACEHOLDER.search(text) is not None
+
+
+def unmask_markdown(text: str, mask: Mask) -> Tuple[str, List[str]]:
+    """
+    恢复占位符，返回(恢复后的文本, 问题列表)
+
+    问题包括：占位符丢失或重复（出现次数与原文不一致）、出现未知占位符；问题列表为空表示校验通过。
+    代码块占位符被模型挤到行内时会自动补回换行。
+    """
+    problems = []
+    found: Dict[int, int] = {}
+
+    def replace(match):
+        index = int(match.group(1))
+        if index >= len(mask.originals):
+            problems.append(f"未知占位符 {match.group()}")
+            return match.group()
+        found[index] = found.get(index, 0) + 1
+        original = mask.originals[index]
+        if index in mask.blocks:
+            start, end = match.span()
+            if start > 0 and text[start - 1] != '\n':
+                original = '\n' + original
+            if end < len(text) and text[end] not in '\r\n':
+                original = original + '\n'
+        return original
+
+    restored = _PLACEHOLDER.sub(replace, text)
+    for index, count in mask.counts.items():
+        seen = found.get(index, 0)
+        if seen < count:
+            problems.append(f"占位符 {PLACEHOLDER.format(index)} 丢失 ({seen}/{count}): {mask.originals[index][:40]!r}")
+        elif seen > count:
+            problems.append(f"占位符 {PLACEHOLDER.format(index)} 重复 ({seen}/{count}): {mask.originals[index][:40]!r}")
+    return restored, problems
+
+
+class StreamingUnmasker:
+    """流式译文的增量恢复：末尾可能不完整的占位符留到下一段再处理"""
+
+    _TAIL = re.compile(r'⟦[^⟧]*⟧?\s*$')
+
+    def __init__(self, mask: Mask):
+        self.mask = mask
+        self.buffer = ""
+
+    def feed(self, text: str) -> str:
+        self.buffer += text
+        tail = self._TAIL.search(self.buffer)
+        cut = tail.start() if tail else len(self.buffer)
+        ready, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return unmask_markdown(ready, self.mask)[0]
+
+    def flush(self) -> str:
+        rest, self.buffer = self.buffer, ""
+        return unmask_markdown(rest, self.mask)[0]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Context-aware MDX escaping for crawled Markdown
+Escapes JSX braces and stray '<' in text while leaving fenced blocks,
+inline code, frontmatter and well-formed HTML/JSX tags untouched, so
+documents are MDX-safe when written instead of being repaired afterwards
+"""
+
+import re
+
+from frontmatter import split_offsets
+from mdx_lint import parse_tag
+
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_BACKTICKS = re.compile(r'`+')
+
+# HTML elements that MDX only accepts in self-closing form
+VOID_ELEMENTS = ('br', 'hr', 'wbr', 'img')
+
+_TEXT_TOKEN = re.compile(
+    r'(?P<comment><!--.*?-->)'
+    r'|<(?P<url>[A-Za-z][A-Za-z0-9+.\-]*://[^\s<>]*)>'
+    r'|<(?P<email>[^\s@<>/]+@[^\s@<>]+\.[^\s@<>]+)>'
+    r'|<(?P<void>' + '|'.join(VOID_ELEMENTS) + r')\b(?P<attrs>[^<>{}]*?)\s*/?>'
+    r'|(?<!\\)(?P<brace>[{}])'
+    r'|(?<!\\)<(?=\S)'
+)
+
+
+def _escape_token(match):
+    if match.group('comment'):
+        # Invisible in the source page and not valid MDX
+        return ''
+    if match.group('url'):
+        url = match.group('url')
+        return f"[{url}]({url})"
+    if match.group('email'):
+        email = match.group('email')
+        return f"[{email}](mailto:{email})"
+    if match.group('void'):
+        attrs = match.group('attrs').rstrip()
+        return f"<{match.group('void')}{attrs} />"
+    if match.group('brace'):
+        return '\\' + match.group('brace')
+    return '\\<'
+
+
+def escape_text(text):
+    """Escape a run of Markdown text that contains no code"""
+    return _TEXT_TOKEN.sub(_escape_token, text)
+
+
+def _code_spans(line):
+    """(start, end) of the inline code spans of a line"""
+    spans = []
+    pos = 0
+    length = len(line)
+    while pos < length:
+        match = _BACKTICKS.search(line, pos)
+        if match is None:
+            break
+        ticks = match.group()
+        # The span closes at the next backtick run of exactly the same length
+        close = line.find(ticks, match.end())
+        while close != -1 and close + len(ticks) < length and line[close + len(ticks)] == '`':
+            close = line.find(ticks, close + len(ticks) + 1)
+        if close == -1:
+            pos = match.end()
+            continue
+        spans.append((match.start(), close + len(ticks)))
+        pos = close + len(ticks)
+    return spans
+
+
+def _line_tags(line, code_spans):
+    """Tags on a line outside code: (start, end, name, closing, self_closing)
+
+    Void elements are left to escape_text, which self-closes them.
+    """
+    tags = []
+    pos = 0
+    spans = iter(code_spans + [(len(line) + 1, len(line) + 1)])
+    span = next(spans)
+    while True:
+        start = line.find('<', pos)
+        if start == -1:
+            return tags
+        while start >= span[1]:
+            span = next(spans)
+        if start >= span[0]:
+            pos = span[1]
+            continue
+        pos = start + 1
+        if start > 0 and line[start - 1] == '\\':
+            continue
+        parsed = parse_tag(line, start)
+        if parsed is None or parsed[0].lower() in VOID_ELEMENTS:
+            continue
+        name, closing, self_closing, end = parsed
+        tags.append((start, end, name, closing, self_closing))
+        pos = end
+
+
+def _balanced_tags(tags):
+    """Keep self-closing tags and matched open/close pairs; the rest get escaped"""
+    keep = set()
+    stack = []
+    for tag in tags:
+        _, (_, _, name, closing, self_closing) = tag
+        if self_closing:
+            keep.add(tag)
+        elif not closing:
+            stack.append(tag)
+        else:
+            for depth in range(len(stack) - 1, -1, -1):
+                if stack[depth][1][2] == name:
+                    keep.add(stack[depth])
+                    keep.add(tag)
+                    del stack[depth:]
+                    break
+    return keep
+
+
+def escape_line(line, keep=()):
+    """Escape one line, leaving inline code spans and the (start, end) spans in keep as they are"""
+    out = []
+    pos = 0
+    for start, end in sorted(_code_spans(line) + list(keep)):
+        out.append(escape_text(line[pos:start]))
+        out.append(line[start:end])
+        pos = end
+    out.append(escape_text(line[pos:]))
+    return ''.join(out)
+
+
+def escape_mdx(content):
+    """Make Markdown safe for the MDX compiler
+
+    Text braces become \\{ \\}, '<' that does not start a self-closing tag
+    or one of a matched open/close pair becomes \\<, autolinks become
+    regular links, void HTML tags are self-closed and HTML comments are
+    dropped. Fenced code, inline code, frontmatter and well-formed tags are
+    not touched. Already escaped content is left unchanged, so this is
+    idempotent.
+    """
+    offsets = split_offsets(content)
+    head = ''
+    if offsets is not None:
+        head, content = content[:offsets[3]], content[offsets[3]:]
+
+    lines = content.split('\n')
+    fence = None
+    pending = []    # indices of text lines that need escaping
+    tags = []       # (line index, tag) in document order, for pairing across lines
+    for index, line in enumerate(lines):
+        fence_match = _FENCE.match(line)
+        if fence is not None:
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence) \
+                    and not line.strip()[len(fence_match.group(1)):].strip():
+                fence = None
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            continue
+        if '{' in line or '}' in line or '<' in line:
+            pending.append(index)
+            if '<' in line:
+                tags.extend((index, tag) for tag in _line_tags(line, _code_spans(line)))
+
+    keep = {}
+    for index, (start, end, *_) in _balanced_tags(tags):
+        keep.setdefault(index, []).append((start, end))
+    for index in pending:
+        lines[index] = escape_line(lines[index], keep.get(index, ()))
+
+    return head + '\n'.join(lines)
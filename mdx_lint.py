@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Fast MDX pre-flight validator for the docs tree
+Finds the constructs that break the Docusaurus MDX compiler (unbalanced
+braces, {{...}} templates, unclosed or invalid tags, autolinks, ragged
+tables) with exact line/column, without running yarn build
+"""
+
+import re
+import sys
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from frontmatter import split_offsets
+
+# Characters that matter outside code: braces, tag openers and backtick runs
+_TOKEN = re.compile(r'`+|\{|\}|<')
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_TAG_NAME = re.compile(r'[A-Za-z][\w.\-]*(?::[\w\-]+)?')
+_AUTOLINK = re.compile(r'[A-Za-z][A-Za-z0-9+.\-]*://[^\s<>]*>|[^\s@<>]+@[^\s@<>]+>')
+_TABLE_DELIMITER = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+
+
+class Issue:
+    """A single lint finding"""
+
+    __slots__ = ('path', 'line', 'column', 'severity', 'message')
+
+    def __init__(self, path, line, column, severity, message):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.message = message
+
+    def __str__(self):
+        return f"{self.path}:{self.line}:{self.column}: {self.severity}: {self.message}"
+
+
+def tag_end(line, pos):
+    """Position of the '>' ending a tag whose attributes start at pos, or -1
+
+    Quoted attribute values and {} expressions may contain '>'.
+    """
+    quote = None
+    depth = 0
+    for index in range(pos, len(line)):
+        char = line[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        elif char == '>' and depth <= 0:
+            return index
+    return -1
+
+
+def parse_tag(line, start):
+    """Parse a complete one-line tag at line[start] == '<'
+
+    Returns (name, closing, self_closing, end) with end just past the '>',
+    or None if MDX would not read a tag there (whitespace after '<',
+    comments, autolinks, invalid names, tags continuing on the next line).
+    Fragments <> and </> have the name ''.
+    """
+    after = line[start + 1:start + 2]
+    if not after or after.isspace() or after == '!':
+        return None
+    closing = after == '/'
+    name_start = start + 2 if closing else start + 1
+    if not closing and _AUTOLINK.match(line, name_start):
+        return None
+    if line.startswith('>', name_start):
+        return '', closing, False, name_start + 1
+
+    name_match = _TAG_NAME.match(line, name_start)
+    if name_match is None:
+        return None
+    follow = line[name_match.end():name_match.end() + 1]
+    if follow not in ('/', '>') and not follow.isspace():
+        return None
+    end = tag_end(line, name_match.end())
+    if end == -1:
+        return None
+    return name_match.group(), closing, line[end - 1] == '/', end + 1
+
+
+def _table_cells(line):
+    """Count the cells of a pipe table row (escaped pipes do not split)"""
+    stripped = line.strip()
+    if stripped.startswith('|'):
+        stripped = stripped[1:]
+    if stripped.endswith('|') and not stripped.endswith('\\|'):
+        stripped = stripped[:-1]
+    return len(re.split(r'(?<!\\)\|', stripped))
+
+
+class MDXLinter:
+    """Single linear scan over a document, tracking code, braces and tags"""
+
+    def __init__(self, path, text):
+        self.path = path
+        self.text = text
+        self.issues = []
+        self.brace_stack = []   # (line, column) of open '{'
+        self.tag_stack = []     # (name, line, column) of open tags
+        self.in_tag = None      # (name, line, column, closing) while a tag spans lines
+
+    def error(self, line, column, message):
+        self.issues.append(Issue(self.path, line, column, 'error', message))
+
+    def warning(self, line, column, message):
+        self.issues.append(Issue(self.path, line, column, 'warning', message))
+
+    def lint(self):
+        lines = self.text.split('\n')
+        start_line = 0
+
+        # Skip frontmatter: it is YAML, not MDX
+        offsets = split_offsets(self.text)
+        if offsets is not None:
+            start_line = self.text.count('\n', 0, offsets[3])
+
+        fence = None
+        table_cells = None
+        table_header_line = None
+
+        for index in range(start_line, len(lines)):
+            line = lines[index]
+            lineno = index + 1
+
+            fence_match = _FENCE.match(line)
+            if fence is not None:
+                if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence) \
+                        and not line.strip()[len(fence_match.group(1)):].strip():
+                    fence = None
+                continue
+            if fence_match and self.in_tag is None:
+                fence = fence_match.group(1)
+                continue
+
+            table_cells, table_header_line = self._check_table(
+                lines, index, line, table_cells, table_header_line)
+
+            self._scan_line(line, lineno)
+
+        if fence is not None:
+            self.warning(len(lines), 1, f"Unclosed code fence {fence}")
+        if self.in_tag is not None:
+            name, line, column, _ = self.in_tag
+            self.error(line, column, f"Unterminated tag <{name}")
+        for line, column in self.brace_stack:
+            self.error(line, column, "Unclosed '{' expression")
+        for name, line, column in self.tag_stack:
+            self.error(line, column, f"Unclosed tag <{name}> (use <{name} /> or add </{name}>)")
+
+        self.issues.sort(key=lambda issue: (issue.line, issue.column))
+        return self.issues
+
+    def _check_table(self, lines, index, line, table_cells, table_header_line):
+        stripped = line.strip()
+        if not stripped.startswith('|'):
+            return None, None
+
+        if table_cells is None:
+            # A table starts with a header row followed by a delimiter row
+            if index + 1 < len(lines) and _TABLE_DELIMITER.match(lines[index + 1].strip()) \
+                    and '-' in lines[index + 1]:
+                header = _table_cells(line)
+                delimiter = _table_cells(lines[index + 1])
+                if header != delimiter:
+                    self.warning(index + 2, 1,
+                                 f"Table delimiter row has {delimiter} cells, header has {header}")
+                return header, index + 1
+            return None, None
+
+        if index == table_header_line:
+            return table_cells, table_header_line
+
+        cells = _table_cells(line)
+        if cells != table_cells:
+            self.warning(index + 1, 1, f"Table row has {cells} cells, header has {table_cells}")
+        return table_cells, table_header_line
+
+    def _scan_line(self, line, lineno):
+        pos = 0
+        if self.in_tag is not None:
+            pos = self._finish_tag(line, lineno, 0)
+            if pos is None:
+                return
+
+        length = len(line)
+        while pos < length:
+            match = _TOKEN.search(line, pos)
+            if match is None:
+                return
+            token = match.group()
+            column = match.start() + 1
+
+            if token[0] == '`':
+                # Inline code span: skip to the matching backtick run on this line
+                close = line.find(token, match.end())
+                while close != -1 and (close + len(token) < length and line[close + len(token)] == '`'):
+                    close = line.find(token, close + len(token) + 1)
+                pos = close + len(token) if close != -1 else match.end()
+                continue
+
+            if match.start() > 0 and line[match.start() - 1] == '\\':
+                pos = match.end()
+                continue
+
+            if token == '{':
+                if line.startswith('{{', match.start()):
+                    end = line.find('}}', match.start() + 2)
+                    snippet = line[match.start():end + 2] if end != -1 else line[match.start():match.start() + 20]
+                    self.error(lineno, column, f"Template expression {snippet} is not valid MDX")
+                    pos = end + 2 if end != -1 else match.end() + 1
+                    continue
+                self.brace_stack.append((lineno, column))
+                pos = match.end()
+            elif token == '}':
+                if self.brace_stack:
+                    self.brace_stack.pop()
+                else:
+                    self.error(lineno, column, "Unexpected '}' without matching '{'")
+                pos = match.end()
+            else:
+                pos = self._start_tag(line, lineno, match.start())
+                if pos is None:
+                    return
+
+    def _start_tag(self, line, lineno, start):
+        column = start + 1
+        after = line[start + 1:start + 2]
+
+        # '<' followed by whitespace (or end of line) is plain text in MDX
+        if not after or after.isspace():
+            return start + 1
+        if line.startswith('<!--', start):
+            end = line.find('-->', start + 4)
+            if end == -1:
+                self.error(lineno, column, "HTML comments are not supported in MDX; use {/* */}")
+                return None
+            self.error(lineno, column, "HTML comments are not supported in MDX; use {/* */}")
+            return end + 3
+
+        closing = after == '/'
+        name_start = start + 2 if closing else start + 1
+
+        autolink = None if closing else _AUTOLINK.match(line, name_start)
+        if autolink:
+            self.error(lineno, column, "Autolinks <...> are not supported in MDX; use [text](url)")
+            return autolink.end()
+
+        if after == '>':
+            # Fragment <>
+            self.tag_stack.append(('', lineno, column))
+            return start + 2
+
+        name_match = _TAG_NAME.match(line, name_start)
+        if name_match is None:
+            if closing and line.startswith('>', name_start):
+                self._close_tag('', lineno, column)
+                return name_start + 1
+            self.error(lineno, column, f"Invalid tag: '<' followed by {line[name_start:name_start + 1]!r}; escape it as \\<")
+            return start + 1
+
+        name = name_match.group()
+        self.in_tag = (name, lineno, column, closing)
+        return self._finish_tag(line, lineno, name_match.end())
+
+    def _finish_tag(self, line, lineno, pos):
+        """Scan tag attributes until '>' (quotes and {} respected)
+
+        Returns the position after the tag, or None if the tag continues on
+        the next line.
+        """
+        name, tag_line, tag_column, closing = self.in_tag
+        end = tag_end(line, pos)
+        if end == -1:
+            return None
+        self.in_tag = None
+        self_closing = end > 0 and line[end - 1] == '/'
+        if closing:
+            self._close_tag(name, tag_line, tag_column)
+        elif not self_closing:
+            self.tag_stack.append((name, tag_line, tag_column))
+        return end + 1
+
+    def _close_tag(self, name, line, column):
+        if not self.tag_stack:
+            self.error(line, column, f"Closing tag </{name}> without an opening tag")
+            return
+        for depth in range(len(self.tag_stack) - 1, -1, -1):
+            if self.tag_stack[depth][0] == name:
+                for open_name, open_line, open_column in self.tag_stack[depth + 1:]:
+                    self.error(open_line, open_column, f"Unclosed tag <{open_name}> before </{name}>")
+                del self.tag_stack[depth:]
+                return
+        open_name, open_line, open_column = self.tag_stack[-1]
+        self.error(line, column,
+                   f"Closing tag </{name}> does not match <{open_name}> opened at {open_line}:{open_column}")
+
+
+def lint_text(text, path="<text>"):
+    """Lint a document and return its list of Issues"""
+    return MDXLinter(path, text).lint()
+
+
+def lint_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return lint_text(f.read(), path)
+
+
+def lint_paths(paths, workers=None):
+    """Lint many files in parallel; results keep the input order"""
+    paths = list(paths)
+    if len(paths) < 32:
+        return [issue for path in paths for issue in lint_file(path)]
+    chunksize = max(1, len(paths) // ((workers or 4) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lint_file, paths, chunksize=chunksize)
+        return [issue for issues in results for issue in issues]
+
+
+def files_with_errors(issues):
+    """Unique paths that have at least one error, in order"""
+    return list(dict.fromkeys(issue.path for issue in issues if issue.severity == 'error'))
+
+
+def main():
+    """Lint docs/ (or the paths given on the command line)"""
+    paths = sys.argv[1:] or sorted(glob.glob('docs/**/*.md', recursive=True) +
+                                   glob.glob('docs/**/*.mdx', recursive=True))
+
+    start = time.perf_counter()
+    issues = lint_paths(paths)
+    elapsed = time.perf_counter() - start
+
+    for issue in issues:
+        print(issue)
+
+    errors = sum(1 for issue in issues if issue.severity == 'error')
+    warnings = len(issues) - errors
+    print(f"\n📊 {len(paths)} files checked in {elapsed:.2f}s: {errors} errors, {warnings} warnings")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Shared process-pool runner for the docs fixer scripts
+Files are read and transformed in worker processes; results come back in
+input order and are written by the parent, so output is deterministic
+"""
+
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 16
+
+
+class FileResult:
+    """Outcome of transforming one file"""
+
+    __slots__ = ('path', 'content', 'changed', 'error')
+
+    def __init__(self, path, content=None, changed=False, error=None):
+        self.path = path
+        self.content = content
+        self.changed = changed
+        self.error = error
+
+
+def _transform_file(transform, pass_path, path):
+    """Worker: read a file and apply transform; only changed content is sent back"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            original = f.read()
+        content = transform(path, original) if pass_path else transform(original)
+        if content == original:
+            return FileResult(path)
+        return FileResult(path, content, changed=True)
+    except Exception as e:
+        return FileResult(path, error=f"{type(e).__name__}: {e}")
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def map_files(transform, paths, workers=None, chunksize=None, pass_path=False):
+    """Apply transform(content) (or transform(path, content)) to every file
+
+    transform must be a module-level function so it can be pickled.
+    Returns FileResults in the same order as paths; nothing is written.
+    """
+    paths = list(paths)
+    workers = workers or default_workers()
+    func = partial(_transform_file, transform, pass_path)
+
+    if workers <= 1 or len(paths) < MIN_PARALLEL_FILES:
+        return [func(path) for path in paths]
+
+    if chunksize is None:
+        # A few chunks per worker balances load without per-file IPC
+        chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, paths, chunksize=chunksize))
+
+
+def run_fixer(transform, paths, writer, index=None, version=None, workers=None,
+              pass_path=False, verbose=True):
+    """Transform files in parallel, then write changed ones through writer
+
+    If a PostprocessIndex is given, every successfully processed file is
+    marked with version. Transform and write errors are reported per file
+    and such files are not marked. Returns (changed_paths, errors).
+    """
+    changed_paths = []
+    errors = []
+    for result in map_files(transform, paths, workers, pass_path=pass_path):
+        if result.error:
+            errors.append((result.path, result.error))
+            print(f"❌ Error processing {result.path}: {result.error}")
+            continue
+        if result.changed:
+            try:
+                writer.write(result.path, result.content)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                errors.append((result.path, error))
+                print(f"❌ Error writing {result.path}: {error}")
+                continue
+            changed_paths.append(result.path)
+            if verbose:
+                print(f"✅ Fixed: {result.path}")
+        elif verbose:
+            print(f"⏭️ Unchanged: {result.path}")
+        if index is not None:
+            index.mark(result.path, version)
+    return changed_paths, errors
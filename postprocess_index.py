@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Persistent per-file index for incremental docs post-processing
+A file is only reprocessed when its content or its fixer chain changed
+"""
+
+import os
+from pathlib import Path
+
+from doc_writer import content_hash
+from docs_manifest import DocsManifest, normalize_doc_path
+
+
+class PostprocessIndex:
+    """Tracks (path, content hash, chain version) for one fixer chain
+
+    Unchanged files are detected from mtime/size without reading them;
+    if only the mtime moved, the content hash decides.
+    """
+
+    def __init__(self, chain, manifest=None):
+        self.chain = chain
+        self._own_manifest = manifest is None
+        self.manifest = manifest or DocsManifest()
+        self.entries = self.manifest.postprocess_entries(chain)
+        self._pending = []
+        self.skipped = 0
+
+    def needs_processing(self, path, version):
+        entry = self.entries.get(normalize_doc_path(path))
+        if entry is None or entry["chain_version"] != version:
+            return True
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return True
+
+        if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]:
+            self.skipped += 1
+            return False
+
+        with open(path, 'rb') as f:
+            current_hash = content_hash(f.read())
+        if current_hash != entry["content_hash"]:
+            return True
+
+        # Touched but identical: refresh the stat fields so the next run is stat-only
+        self._pending.append((path, version, current_hash, stat.st_mtime_ns, stat.st_size))
+        self.skipped += 1
+        return False
+
+    def mark(self, path, version, content=None):
+        """Record path as processed by this chain version"""
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        stat = os.stat(path)
+        self._pending.append((path, version, content_hash(content), stat.st_mtime_ns, stat.st_size))
+
+    def filter(self, paths, version):
+        """Return only the paths that need processing"""
+        return [path for path in paths if self.needs_processing(path, version)]
+
+    def save(self):
+        if self._pending:
+            self.manifest.record_postprocess_many(self.chain, self._pending)
+            for path, version, digest, mtime_ns, size in self._pending:
+                self.entries[normalize_doc_path(path)] = {
+                    "chain_version": version, "content_hash": digest,
+                    "mtime_ns": mtime_ns, "size": size,
+                }
+            self._pending = []
+
+    def close(self):
+        self.save()
+        if self._own_manifest:
+            self.manifest.close()
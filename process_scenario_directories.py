@@ -4,6 +4,9 @@ import requests
 import re
 import os
 
+from docs_manifest import DocsManifest, canonical_url
+from frontmatter import split_frontmatter
+
 def get_jina_content(url):
     """Get content using Jina.ai"""
     jina_url = f"https://r.jina.ai/{url}"
@@ -114,7 +117,7 @@ def get_make_url_from_filename(filename):
     
     return possible_urls
 
-def process_file(file_path, directory_name):
+def process_file(file_path, directory_name, manifest=None):
     """Process a single file"""
     filename = os.path.basename(file_path)
     
@@ -132,18 +135,30 @@ def process_file(file_path, directory_name):
     # Get possible URLs for this file
     possible_urls = get_make_url_from_filename(filename)
     
+    # Prefer the URL this file was actually crawled from
+    known_url = manifest.url_for_path(file_path) if manifest else None
+    if known_url:
+        possible_urls = [known_url] + [url for url in (possible_urls or []) if url != known_url]
+    
     if not possible_urls:
         print(f"⚠️ Skipping {filename} - no URL mapping")
         return
     
     # Try to extract content from the URLs
     content = None
+    crawled = None
     for url in possible_urls:
         print(f"🌐 Trying: {url}")
         raw_content = get_jina_content(url)
+        if raw_content and manifest and manifest.url_for_path(file_path) == canonical_url(url) \
+                and not manifest.raw_changed(url, raw_content):
+            # Same page as last time: the file already holds its cleaned content
+            print(f"⏭️ Unchanged since last crawl: {filename}")
+            return
         if raw_content:
             content = clean_extracted_content(raw_content)
             if content and len(content) > 100:  # Ensure we got substantial content
+                crawled = (url, raw_content)
                 break
     
     if content:
@@ -154,11 +169,7 @@ def process_file(file_path, directory_name):
             
             # Extract frontmatter
             if current_content.startswith('---'):
-                parts = current_content.split('---', 2)
-                if len(parts) >= 3:
-                    frontmatter = f"---{parts[1]}---"
-                else:
-                    frontmatter = parts[0]
+                frontmatter, _ = split_frontmatter(current_content)
             else:
                 # Create basic frontmatter
                 title = filename.replace('.md', '').replace('-', ' ').title()
@@ -180,6 +191,11 @@ title: "{title}"
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(full_content)
             
+            # Only record the crawl once the file holds the cleaned content
+            if manifest and crawled:
+                url, raw_content = crawled
+                manifest.record_crawl(url, file_path, raw_content, content)
+            
             print(f"✅ Updated: {filename}")
         
         except Exception as e:
@@ -275,18 +291,19 @@ def main():
         'docs/get-started/expand-your-scenario'
     ]
     
-    for directory in directories:
-        print(f"\n📁 Processing directory: {directory}")
-        print("-" * 40)
-        
-        if os.path.exists(directory):
-            for filename in os.listdir(directory):
-                if filename.endswith('.md'):
-                    file_path = os.path.join(directory, filename)
-                    process_file(file_path, directory)
-                    print()
-        else:
-            print(f"❌ Directory not found: {directory}")
+    with DocsManifest() as manifest:
+        for directory in directories:
+            print(f"\n📁 Processing directory: {directory}")
+            print("-" * 40)
+            
+            if os.path.exists(directory):
+                for filename in os.listdir(directory):
+                    if filename.endswith('.md'):
+                        file_path = os.path.join(directory, filename)
+                        process_file(file_path, directory, manifest)
+                        print()
+            else:
+                print(f"❌ Directory not found: {directory}")
     
     print(f"\n🎉 Processing completed!")
     print("✨ All scenario files have been updated with:")
@@ -4,9 +4,11 @@ Quick scraper using only Jina.ai to extract Make.com content
 """
 
 import requests
-import yaml
 from pathlib import Path
 
+from frontmatter import dump_frontmatter
+from mdx_escape import escape_mdx
+
 
 def scrape_with_jina(url):
     """Use Jina.ai Reader API to convert webpage to markdown"""
@@ -56,11 +58,11 @@ def create_docusaurus_file(content, filename="learn-the-basics.md"):
     
     # Create the complete file content
     file_content = "---\n"
-    file_content += yaml.dump(frontmatter, default_flow_style=False)
+    file_content += dump_frontmatter(frontmatter)
     file_content += "---\n\n"
     
     # Add the content (Jina.ai usually includes proper headings)
-    file_content += content
+    file_content += escape_mdx(content)
     
     # Ensure docs directory exists
     docs_path = Path("docs")
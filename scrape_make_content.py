@@ -10,7 +10,9 @@ import requests
 from pathlib import Path
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from bs4 import BeautifulSoup
-import yaml
+
+from frontmatter import dump_frontmatter
+from mdx_escape import escape_mdx
 
 
 async def scrape_with_crawl4ai(url):
@@ -157,7 +159,7 @@ def create_docusaurus_file(content, filename="learn-the-basics.md"):
     
     # Create the complete file content
     file_content = "---\n"
-    file_content += yaml.dump(frontmatter, default_flow_style=False)
+    file_content += dump_frontmatter(frontmatter)
     file_content += "---\n\n"
     
     # Add main heading if not present
@@ -165,7 +167,7 @@ def create_docusaurus_file(content, filename="learn-the-basics.md"):
         file_content += "# Learn the Basics\n\n"
     
     # Add the content
-    file_content += content
+    file_content += escape_mdx(content)
     
     # Ensure docs directory exists
     docs_path = Path("docs")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Deterministic sidebar_position assignment for crawled docs
+Positions come from the navigation order and are persisted between runs
+"""
+
+import json
+from pathlib import Path
+
+from doc_writer import DocWriter
+
+
+class SidebarOrder:
+    """Resolve stable sidebar positions per category
+
+    Lookup order for a page:
+      1. its index in the authoritative navigation order for the category
+      2. the position persisted by a previous run
+      3. a shared tail position after all navigation pages; Docusaurus breaks
+         ties between equal positions by doc id, so the result does not
+         depend on crawl arrival order
+    """
+
+    def __init__(self, store_path="docs/_sidebar_positions.json", nav_order=None):
+        self.store_path = Path(store_path)
+        self.nav_order = {}
+        self.positions = self._load()
+
+        for category_key, filenames in (nav_order or {}).items():
+            self.set_nav_order(category_key, filenames)
+
+    def _load(self):
+        if not self.store_path.exists():
+            return {}
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️ Could not read {self.store_path}: {e}")
+            return {}
+        return {category: dict(pages) for category, pages in data.items()}
+
+    def set_nav_order(self, category_key, filenames):
+        """Record the navigation order of pages in a category (duplicates ignored)"""
+        ordered = []
+        for filename in filenames:
+            if filename not in ordered:
+                ordered.append(filename)
+        self.nav_order[category_key] = ordered
+
+    def position(self, category_key, filename):
+        """Return the sidebar position for a page and remember it"""
+        nav = self.nav_order.get(category_key, [])
+        stored = self.positions.setdefault(category_key, {})
+
+        if filename in nav:
+            position = nav.index(filename) + 1
+        elif filename in stored:
+            position = stored[filename]
+        else:
+            position = len(nav) + 1
+
+        stored[filename] = position
+        return position
+
+    def save(self, writer=None):
+        """Persist positions with sorted keys so unchanged runs are byte-identical"""
+        writer = writer or DocWriter()
+        data = {
+            category: dict(sorted(pages.items()))
+            for category, pages in sorted(self.positions.items())
+            if pages
+        }
+        return writer.write_json(self.store_path, data)
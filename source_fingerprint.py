@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Fingerprints of code, used to invalidate cached results when the code
+that produced them changes
+Kept free of heavy imports so both the docs scripts and the translation
+workflow can use it
+"""
+
+import inspect
+import hashlib
+
+
+def chain_version(*funcs):
+    """Fingerprint a fixer chain from the source code of its functions
+
+    Editing any regex in a fixer changes the version, so every file it
+    applies to is reprocessed on the next run. Modules may be passed too,
+    for helpers that keep their regexes at module level.
+    """
+    digest = hashlib.sha256()
+    for func in funcs:
+        try:
+            source = inspect.getsource(func)
+        except (OSError, TypeError):
+            source = getattr(func, '__qualname__', repr(func))
+        digest.update(source.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
@@ -0,0 +1,40 @@
+"""Tests for the translation bookkeeping in docs_manifest"""
+
+from docs_manifest import DocsManifest
+
+SOURCE = "---\ntitle: Scenarios\n---\nA scenario is a series of modules.\n"
+TRANSLATION = "---\ntitle: 场景\n---\n场景是一系列模块。\n"
+
+
+def make_manifest(tmp_path):
+    manifest = DocsManifest(str(tmp_path / "manifest.db"))
+    manifest.record_translation("docs/scenarios.md", "Chinese", SOURCE, TRANSLATION)
+    return manifest
+
+
+def test_in_place_translation_is_up_to_date(tmp_path):
+    with make_manifest(tmp_path) as manifest:
+        assert not manifest.needs_translation("docs/scenarios.md", "Chinese", TRANSLATION, in_place=True)
+
+
+def test_in_place_restored_source_needs_translation(tmp_path):
+    # The page was re-crawled (or restored) to the English text it was translated from
+    with make_manifest(tmp_path) as manifest:
+        assert manifest.needs_translation("docs/scenarios.md", "Chinese", SOURCE, in_place=True)
+
+
+def test_in_place_edited_page_needs_translation(tmp_path):
+    with make_manifest(tmp_path) as manifest:
+        assert manifest.needs_translation("docs/scenarios.md", "Chinese", SOURCE + "New paragraph.\n",
+                                          in_place=True)
+
+
+def test_separate_tree_compares_source(tmp_path):
+    with make_manifest(tmp_path) as manifest:
+        assert not manifest.needs_translation("docs/scenarios.md", "Chinese", SOURCE)
+        assert manifest.needs_translation("docs/scenarios.md", "Chinese", SOURCE + "New paragraph.\n")
+
+
+def test_untranslated_page_needs_translation(tmp_path):
+    with make_manifest(tmp_path) as manifest:
+        assert manifest.needs_translation("docs/other.md", "Chinese", SOURCE, in_place=True)
@@ -0,0 +1,45 @@
+"""Tests for candidate term scoring in glossary_miner"""
+
+from glossary_miner import count_terms, score_terms, _merge_plurals
+
+GENERIC = ["data", "field", "information", "send", "error", "app", "january"]
+
+# Each document differs, so nothing is stripped as cross-page boilerplate
+BODIES = [
+    "## Data\n\nYour scenario can send data to the API before January ends. "
+    "Map each **field** carefully. The OAuth flow returns an error with extra information.\n",
+    "## Field mapping\n\nAn app stores data while the Make Gateway waits. "
+    "Every **error** shows information about the field that failed in January.\n",
+    "## Errors\n\nWhen you send records the API checks the app first. "
+    "Then the Make Gateway logs the error. OAuth scopes limit which data you read.\n",
+    "## Sending information\n\nIn January we changed how an app can send a field. "
+    "Our Make Gateway now validates OAuth tokens and the API rejects bad data.\n",
+]
+
+
+def score(bodies):
+    stats = count_terms(bodies)
+    _merge_plurals(stats)
+    return score_terms(stats, len(bodies))
+
+
+def test_generic_single_words_are_dropped():
+    scores = score(BODIES)
+    for word in GENERIC:
+        assert word not in scores
+
+
+def test_capitalized_and_identifier_terms_are_kept():
+    scores = score(BODIES)
+    assert "api" in scores
+    assert "oauth" in scores
+    assert "gateway" in scores
+
+
+def test_heading_and_bold_alone_do_not_qualify_a_word():
+    bodies = [
+        "## Widget\n\nOpen the **widget** panel and resize the widget slowly.\n",
+        "## Widget options\n\nA widget has colors. The **widget** border is thin.\n",
+        "## Widget layout\n\nPlace one widget per row so each widget stays readable.\n",
+    ]
+    assert "widget" not in score(bodies)
@@ -0,0 +1,71 @@
+"""
+token计数
+- 安装了tiktoken时使用真实的BPE分词器（o200k_base）
+- 否则按字符类别估算：中日韩字符逐字计数，英文单词按长度，Markdown符号逐个计数
+"""
+
+import re
+import math
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+ENCODING_NAME = "o200k_base"
+
+# 没有分词器时的估算参数
+CJK_TOKENS_PER_CHAR = 1.3
+CHARS_PER_WORD_TOKEN = 4.5
+DIGITS_PER_TOKEN = 3
+
+_PIECES = re.compile(
+    r'(?P<cjk>[぀-ヿ㐀-䶿一-鿿가-힯＀-￯　-〿])'
+    r'|(?P<word>[A-Za-z]+)'
+    r'|(?P<digits>\d+)'
+    r'|(?P<symbol>[^\sA-Za-z\d])'
+)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        # 分词表需要联网下载，失败时退回估算
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """不依赖分词器的token估算"""
+    cjk = words = digits = symbols = 0
+    for match in _PIECES.finditer(text):
+        kind = match.lastgroup
+        if kind == 'cjk':
+            cjk += 1
+        elif kind == 'word':
+            words += math.ceil(len(match.group()) / CHARS_PER_WORD_TOKEN)
+        elif kind == 'digits':
+            digits += math.ceil(len(match.group()) / DIGITS_PER_TOKEN)
+        else:
+            symbols += 1
+    # 连续的空白（缩进、空行）大致每段一个token
+    whitespace = len(re.findall(r'\n\s*', text))
+    return math.ceil(cjk * CJK_TOKENS_PER_CHAR) + words + digits + symbols + whitespace
+
+
+def count_tokens(text: str) -> int:
+    """文本的token数；有tiktoken时精确计数，否则估算"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def tokenizer_name() -> str:
+    return f"tiktoken/{ENCODING_NAME}" if _encoding() is not None else "heuristic"
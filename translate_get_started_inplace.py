@@ -12,7 +12,16 @@ import re
 from pathlib import Path
 
 # 导入修改后的翻译模块
-from Reflection_Workflow_XAI import translate_text
+from Reflection_Workflow_XAI import translate_text, close_shared_client
+from docs_manifest import DocsManifest
+from translation_memory import TranslationMemory
+from translation_scheduler import TranslationScheduler, MAX_CONCURRENT_FILES, FILE_TIMEOUT, summarize, size_priority
+from translation_planner import plan_files, print_plan
+from translation_budget import TranslationBudget
+from translation_pipeline import StagePipeline
+from glossary_miner import load_glossary
+from glossary_compliance import enforce_glossary
+from frontmatter import split_frontmatter
 
 def preserve_frontmatter(content: str) -> tuple[str, str, str]:
     """
@@ -21,14 +30,8 @@ def preserve_frontmatter(content: str) -> tuple[str, str, str]:
     Returns:
         (frontmatter, body, full_content)
     """
-    if content.startswith('---'):
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            frontmatter = f"---{parts[1]}---"
-            body = parts[2].strip()
-            return frontmatter, body, content
-    
-    return "", content.strip(), content
+    frontmatter, body = split_frontmatter(content)
+    return frontmatter, body.strip(), content
 
 def clean_translation_artifacts(text: str) -> str:
     """清理翻译过程中的说明文字"""
@@ -69,7 +72,10 @@ def clean_translation_artifacts(text: str) -> str:
     
     return cleaned
 
-async def translate_markdown_file(file_path: Path, source_lang="English", target_lang="Chinese"):
+async def translate_markdown_file(file_path: Path, source_lang="English", target_lang="Chinese",
+                                  manifest: DocsManifest = None, memory: TranslationMemory = None,
+                                  budget: TranslationBudget = None, pipeline: StagePipeline = None,
+                                  glossary: dict = None):
     """翻译单个markdown文件"""
     try:
         print(f"\n{'='*60}")
@@ -95,6 +101,11 @@ async def translate_markdown_file(file_path: Path, source_lang="English", target
             source_text=body,
             source_lang=source_lang,
             target_lang=target_lang,
+            memory=memory,
+            budget=budget,
+            glossary=glossary,
+            priority=size_priority(file_path),
+            pipeline=pipeline,
             model="grok-3-mini"  # 使用x.ai的grok-3-mini模型
         )
         translation_time = time.time() - start_time
@@ -103,6 +114,12 @@ async def translate_markdown_file(file_path: Path, source_lang="English", target
         translated_body = result["final_translation"]
         cleaned_translation = clean_translation_artifacts(translated_body)
         
+        # 检查术语表是否被遵守，只重译不合规的段落
+        if glossary:
+            cleaned_translation, _ = await enforce_glossary(body, cleaned_translation, glossary,
+                                                            source_lang, target_lang, budget=budget,
+                                                            priority=size_priority(file_path), memory=memory)
+        
         # 重新组合内容
         final_content = frontmatter + "\n\n" + cleaned_translation if frontmatter else cleaned_translation
         
@@ -110,6 +127,10 @@ async def translate_markdown_file(file_path: Path, source_lang="English", target
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(final_content)
         
+        # 记录译文来源，下次运行可跳过未变化的文件
+        if manifest:
+            manifest.record_translation(file_path, target_lang, original_content, final_content)
+        
         print(f"✅ 翻译完成: {file_path}")
         print(f"⏱️  用时: {translation_time:.2f}秒")
         print(f"📊 统计: {result['stats']}")
@@ -121,8 +142,14 @@ async def translate_markdown_file(file_path: Path, source_lang="English", target
         print(f"错误: {str(e)}")
         return False
 
-async def translate_directory(base_dir: Path, source_lang="English", target_lang="Chinese"):
-    """递归翻译目录下的所有markdown文件"""
+async def translate_directory(base_dir: Path, source_lang="English", target_lang="Chinese",
+                              max_concurrency=MAX_CONCURRENT_FILES, file_timeout=FILE_TIMEOUT,
+                              max_cost=None, tokens_per_minute=None):
+    """
+    递归翻译目录下的所有markdown文件
+    
+    max_cost和tokens_per_minute为整个运行的费用（美元）和每分钟token上限，默认不限制
+    """
     
     print(f"\n🚀 开始翻译 {base_dir} 目录")
     print(f"源语言: {source_lang} -> 目标语言: {target_lang}")
@@ -139,31 +166,66 @@ async def translate_directory(base_dir: Path, source_lang="English", target_lang
         print(f"❌ 在 {base_dir} 中未找到markdown文件")
         return
     
+    # 跳过清单中记录为已翻译且内容未变化的文件
+    manifest = DocsManifest()
+    pending_files = []
+    for file_path in md_files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            current_content = f.read()
+        if manifest.needs_translation(file_path, target_lang, current_content, in_place=True):
+            pending_files.append(file_path)
+    if len(pending_files) < len(md_files):
+        print(f"⏭️  跳过 {len(md_files) - len(pending_files)} 个已翻译的文件")
+    md_files = pending_files
+    
+    if not md_files:
+        print(f"✅ 所有文件均已翻译")
+        manifest.close()
+        return
+    
     print(f"📁 找到 {len(md_files)} 个markdown文件")
     for f in md_files:
         print(f"  - {f}")
     
-    # 翻译所有文件
+    # 从docs/挖掘并锁定的术语译文（见 glossary_miner.py），没有时为空
+    glossary = load_glossary(locked_only=True)
+    if glossary:
+        print(f"📖 术语表: {len(glossary)} 个术语")
+    
+    # 阶段请求由流水线的worker限流，同时进行的文件数可以更多，让各阶段队列保持有任务
+    pipeline = StagePipeline()
+    concurrency = max(max_concurrency, pipeline.capacity)
+    memory = TranslationMemory()
+    
+    # 运行前预估token、费用和用时（不调用API；按实际的并发数、各阶段worker数和翻译记忆命中）
+    print_plan(await plan_files(md_files, model="grok-3-mini", concurrency=concurrency,
+                                source_lang=source_lang, target_lang=target_lang, glossary=glossary,
+                                workers=pipeline.workers, memory=memory),
+               per_file=False)
+    
+    # 并发翻译所有文件（信号量限流、大文件优先、单文件超时）
     total_start = time.time()
-    success_count = 0
-    
-    for i, file_path in enumerate(md_files, 1):
-        print(f"\n[{i}/{len(md_files)}] 处理文件...")
-        
-        try:
-            success = await translate_markdown_file(file_path, source_lang, target_lang)
-            if success:
-                success_count += 1
-            
-            # 在文件之间添加小延迟
-            if i < len(md_files):
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            print(f"❌ 处理文件时出错: {e}")
-            continue
+    await pipeline.start()
+    scheduler = TranslationScheduler(concurrency, file_timeout)
+    budget = TranslationBudget(max_cost, tokens_per_minute)
+    
+    async def worker(file_path):
+        return await translate_markdown_file(file_path, source_lang, target_lang, manifest, memory, budget, pipeline,
+                                             glossary)
+    
+    try:
+        results = await scheduler.run(md_files, worker)
+    finally:
+        await pipeline.close()
+    summary = summarize(results)
+    success_count = summary["ok"]
+    for result in results:
+        if result.status == "timeout":
+            print(f"⏰ 超时: {result.item}")
     
     total_time = time.time() - total_start
+    manifest.close()
+    memory.close()
     
     # 输出最终统计
     print(f"\n{'='*60}")
@@ -174,7 +236,13 @@ async def translate_directory(base_dir: Path, source_lang="English", target_lang
     print(f"❌ 失败: {len(md_files) - success_count}")
     print(f"📈 成功率: {success_count/len(md_files)*100:.1f}%")
     print(f"⏱️  总用时: {total_time:.2f}秒")
-    print(f"⚡ 平均速度: {total_time/len(md_files):.1f}秒/文件")
+    print(f"⚡ 平均速度: {total_time/len(md_files):.1f}秒/文件 (并发 {scheduler.max_concurrency} 个文件)")
+    if summary["slowest"]:
+        slowest_file, slowest_time = summary["slowest"]
+        print(f"🐢 最慢文件: {slowest_file} ({slowest_time:.2f}秒)")
+    memory.report()
+    budget.report()
+    pipeline.report()
 
 async def main():
     """主函数"""
@@ -197,6 +265,9 @@ async def main():
         print(f"❌ 程序执行出错: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # 关闭共享的HTTP连接池
+        await close_shared_client()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
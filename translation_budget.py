@@ -0,0 +1,138 @@
+"""
+整个翻译运行的token和费用预算
+- 按API返回的usage累计所有并发任务的实际用量（不受单个Agent的_reset_stats影响）
+- 每分钟token上限（TPM）：超出时请求排队等待，按优先级放行（数值越小越优先）
+- 费用上限：接近上限时降级为单次翻译，达到上限时拒绝新的请求
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque
+from typing import Dict, List, Optional
+
+# 费用达到上限的该比例后降级为单次翻译
+DEGRADE_AT = 0.8
+# 计算TPM的时间窗口（秒）
+WINDOW_SECONDS = 60.0
+# 排队时重新检查的最长间隔（秒）
+POLL_INTERVAL = 0.5
+
+
+class BudgetExceeded(Exception):
+    """费用预算已用完"""
+
+
+class Reservation:
+    """一次请求在TPM窗口中占用的token（先按估算值占用，完成后改为实际值）"""
+
+    __slots__ = ("time", "tokens", "cost", "settled")
+
+    def __init__(self, tokens: int, cost: float):
+        self.time = time.monotonic()
+        self.tokens = tokens
+        self.cost = cost
+        self.settled = False
+
+
+class TranslationBudget:
+    """在所有并发翻译任务之间共享的预算"""
+
+    def __init__(self, max_cost: Optional[float] = None, tokens_per_minute: Optional[int] = None,
+                 degrade_at: float = DEGRADE_AT):
+        self.max_cost = max_cost
+        self.tokens_per_minute = tokens_per_minute
+        self.degrade_at = degrade_at
+        self.spent_cost = 0.0
+        self.tokens = {"input": 0, "output": 0}
+        self.requests = 0
+        self.waited = 0.0
+        self.rejected = 0
+        self._reserved_cost = 0.0
+        self._window: deque = deque()
+        self._waiting: List[list] = []
+        self._counter = itertools.count()
+
+    @property
+    def degraded(self) -> bool:
+        """费用接近上限，新的文本应只做单次翻译"""
+        return self.max_cost is not None and self.spent_cost + self._reserved_cost >= self.max_cost * self.degrade_at
+
+    def _window_tokens(self) -> int:
+        now = time.monotonic()
+        while self._window and now - self._window[0].time >= WINDOW_SECONDS:
+            self._window.popleft()
+        return sum(reservation.tokens for reservation in self._window)
+
+    def _fits(self, tokens: int) -> bool:
+        if self.tokens_per_minute is None:
+            return True
+        used = self._window_tokens()
+        # 单个请求超过TPM时，只要窗口为空就放行，避免永久等待
+        return used + tokens <= self.tokens_per_minute or used == 0
+
+    def _retry_after(self) -> float:
+        if not self._window:
+            return POLL_INTERVAL
+        return min(POLL_INTERVAL, max(0.01, WINDOW_SECONDS - (time.monotonic() - self._window[0].time)))
+
+    async def acquire(self, tokens: int, cost: float = 0.0, priority: float = 0) -> Reservation:
+        """
+        为一次请求占用预算；TPM不足时按优先级排队等待
+
+        Raises:
+            BudgetExceeded: 已花费加上进行中的请求会超过费用上限
+        """
+        entry = [priority, next(self._counter)]
+        heapq.heappush(self._waiting, entry)
+        start = time.monotonic()
+        try:
+            while True:
+                if self.max_cost is not None and self.spent_cost + self._reserved_cost + cost > self.max_cost:
+                    self.rejected += 1
+                    raise BudgetExceeded(
+                        f"费用预算已用完: 已花费 ${self.spent_cost:.4f} / 上限 ${self.max_cost:.4f}"
+                    )
+                if self._waiting[0] is entry and self._fits(tokens):
+                    reservation = Reservation(tokens, cost)
+                    self._window.append(reservation)
+                    self._reserved_cost += cost
+                    return reservation
+                await asyncio.sleep(self._retry_after())
+        finally:
+            self._waiting.remove(entry)
+            heapq.heapify(self._waiting)
+            self.waited += time.monotonic() - start
+
+    def record(self, reservation: Reservation, token_usage: Dict[str, int], cost: float):
+        """请求完成后按API返回的usage记录实际用量"""
+        if reservation.settled:
+            return
+        reservation.settled = True
+        self._reserved_cost -= reservation.cost
+        reservation.tokens = token_usage["input"] + token_usage["output"]
+        reservation.cost = cost
+        self.tokens["input"] += token_usage["input"]
+        self.tokens["output"] += token_usage["output"]
+        self.spent_cost += cost
+        self.requests += 1
+
+    def release(self, reservation: Reservation):
+        """请求失败：释放占用的费用（已发送的token仍计入TPM窗口）"""
+        if reservation.settled:
+            return
+        reservation.settled = True
+        self._reserved_cost -= reservation.cost
+
+    def report(self, usd_to_cny: float = 7.22):
+        """打印本次运行的实际用量"""
+        total = self.tokens["input"] + self.tokens["output"]
+        limit = f" / 上限 ${self.max_cost:.4f}" if self.max_cost is not None else ""
+        print(f"💳 预算: {self.requests} 个请求, {total} tokens (输入 {self.tokens['input']} / "
+              f"输出 {self.tokens['output']}), 花费 ${self.spent_cost:.4f}{limit} "
+              f"(约 ¥{self.spent_cost * usd_to_cny:.2f})")
+        if self.tokens_per_minute is not None:
+            print(f"⏳ TPM上限 {self.tokens_per_minute}, 累计排队等待 {self.waited:.1f}秒")
+        if self.rejected:
+            print(f"⛔ {self.rejected} 个请求因费用上限被拒绝")
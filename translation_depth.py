@@ -0,0 +1,72 @@
+"""
+自适应翻译深度
+- 短文本、低风险文本或翻译记忆中有高度相似译文时只做一次翻译（single）
+- 长文本或高风险文本（警告、表格、否定/限定条件等）执行完整三阶段工作流（full）
+- 阈值可配置；跳过的阶段按估算的token和费用计入节省统计
+"""
+
+import re
+from typing import Optional, Tuple
+
+SINGLE = "single"
+FULL = "full"
+
+# 不超过该长度（token）的文本只做一次翻译
+SINGLE_PASS_TOKENS = 80
+# 超过该长度的文本总是执行完整工作流
+FULL_DEPTH_TOKENS = 400
+# 中等长度文本出现该数量的风险特征时执行完整工作流
+RISK_THRESHOLD = 2
+# 翻译记忆相似度达到该值时只做一次翻译（以相似译文为参考）
+FUZZY_MATCH_THRESHOLD = 0.85
+
+# 估算跳过的阶段时使用：提示词本身的token数和反思建议的长度
+PROMPT_OVERHEAD_TOKENS = 200
+REFLECTION_TOKENS = 250
+
+# 需要仔细斟酌措辞的内容
+_RISK = re.compile(
+    r'^\s*:::'                                   # 提示框（warning/caution等）
+    r'|^\s*\|.*\|\s*$'                           # 表格行
+    r'|\b(?:warning|caution|important|danger|must|never|not|cannot|can\'t|don\'t|unless|only if)\b',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def risk_score(text: str) -> int:
+    """统计文本中的风险特征数量"""
+    return len(_RISK.findall(text))
+
+
+class DepthPolicy:
+    """根据长度、风险特征和翻译记忆相似度选择翻译深度"""
+
+    def __init__(self, single_pass_tokens: int = SINGLE_PASS_TOKENS, full_depth_tokens: int = FULL_DEPTH_TOKENS,
+                 risk_threshold: int = RISK_THRESHOLD, fuzzy_threshold: float = FUZZY_MATCH_THRESHOLD):
+        self.single_pass_tokens = single_pass_tokens
+        self.full_depth_tokens = full_depth_tokens
+        self.risk_threshold = risk_threshold
+        self.fuzzy_threshold = fuzzy_threshold
+
+    def choose(self, text: str, tokens: int, fuzzy_score: Optional[float] = None) -> Tuple[str, str]:
+        """返回(深度, 原因)"""
+        if fuzzy_score is not None and fuzzy_score >= self.fuzzy_threshold:
+            return SINGLE, f"翻译记忆相似度 {fuzzy_score:.2f}"
+        if tokens <= self.single_pass_tokens:
+            return SINGLE, f"短文本 ({tokens} tokens)"
+        if tokens > self.full_depth_tokens:
+            return FULL, f"长文本 ({tokens} tokens)"
+        risk = risk_score(text)
+        if risk >= self.risk_threshold:
+            return FULL, f"风险特征 {risk} 处"
+        return SINGLE, f"低复杂度 ({tokens} tokens, 风险特征 {risk} 处)"
+
+
+def skipped_tokens(source_tokens: int, translation_tokens: int) -> dict:
+    """估算跳过反思和优化两个阶段节省的token"""
+    reflection_input = PROMPT_OVERHEAD_TOKENS + source_tokens + translation_tokens
+    refine_input = PROMPT_OVERHEAD_TOKENS + source_tokens + translation_tokens + REFLECTION_TOKENS
+    return {
+        "input": reflection_input + refine_input,
+        "output": REFLECTION_TOKENS + translation_tokens,
+    }
@@ -0,0 +1,232 @@
+"""
+段落级翻译记忆（Translation Memory）
+- 以（规范化原文段落, 语言对, 国家/地区, 术语表哈希, 模型, 提示词版本）为键
+- 保存最终译文和各阶段输出，未变化的段落直接从本地返回
+- 统计每次运行的命中率和节省的token
+- 未命中时可按相似度查找同一范围（语言对、术语表、模型等）内最接近的译文
+"""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import difflib
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = "translation_memory.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    initial_translation TEXT,
+    reflection TEXT,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    model TEXT,
+    created REAL,
+    last_used REAL,
+    scope TEXT
+);
+"""
+
+# 相似度查找时比较的候选数量上限
+FUZZY_CANDIDATES = 200
+
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+
+
+def split_segments(text: str) -> List[Tuple[int, int]]:
+    """
+    按空行把Markdown切分为段落，返回每个段落的(start, end)位置
+
+    代码块内部的空行不会切分段落；段落之间的空白保留在原文中，
+    因此可以用 join_segments 无损地重新拼接。
+    """
+    spans = []
+    pos = 0
+    seg_start = None
+    seg_end = 0
+    fence = None
+
+    for line in text.splitlines(keepends=True):
+        content = line.rstrip('\r\n')
+        fence_match = _FENCE.match(content)
+
+        if fence is not None:
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence) \
+                    and not content.strip()[len(fence_match.group(1)):].strip():
+                fence = None
+            seg_end = pos + len(content)
+        elif not content.strip():
+            if seg_start is not None:
+                spans.append((seg_start, seg_end))
+                seg_start = None
+        else:
+            if seg_start is None:
+                seg_start = pos
+            if fence_match:
+                fence = fence_match.group(1)
+            seg_end = pos + len(content)
+        pos += len(line)
+
+    if seg_start is not None:
+        spans.append((seg_start, seg_end))
+    return spans
+
+
+def join_segments(text: str, spans: List[Tuple[int, int]], translations: List[str]) -> str:
+    """用译文替换原文中的各个段落，保留段落之间的原始空白"""
+    parts = []
+    last = 0
+    for (start, end), translation in zip(spans, translations):
+        parts.append(text[last:start])
+        parts.append(translation)
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def normalize_segment(segment: str) -> str:
+    """规范化段落：统一换行、去掉首尾和行尾空白"""
+    lines = segment.replace('\r\n', '\n').strip().split('\n')
+    return '\n'.join(line.rstrip() for line in lines)
+
+
+def glossary_hash(glossary: Optional[Dict[str, str]]) -> str:
+    if not glossary:
+        return ""
+    payload = json.dumps(glossary, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class TranslationMemory:
+    """SQLite支持的段落级翻译记忆"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(segments)")}
+        if "scope" not in columns:
+            # 旧版本数据库没有scope列
+            self.conn.execute("ALTER TABLE segments ADD COLUMN scope TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS segments_scope ON segments (scope)")
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = {"input": 0, "output": 0}
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def make_key(segment: str, source_lang: str, target_lang: str, country: Optional[str],
+                 glossary: Optional[Dict[str, str]], model: str, prompt_version: str) -> str:
+        payload = json.dumps([
+            normalize_segment(segment), source_lang, target_lang, country or "",
+            glossary_hash(glossary), model, prompt_version,
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def make_scope(source_lang: str, target_lang: str, country: Optional[str],
+                   glossary: Optional[Dict[str, str]], model: str, prompt_version: str) -> str:
+        """除原文外的键成分；相似度查找只在同一范围内进行"""
+        payload = json.dumps([
+            source_lang, target_lang, country or "", glossary_hash(glossary), model, prompt_version,
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def lookup(self, key: str, *fallback_keys: str) -> Optional[sqlite3.Row]:
+        """
+        查找段落译文，并更新命中统计
+        
+        依次尝试key和fallback_keys，返回第一条记录；无论尝试几个键，每次查找只计一次命中或未命中
+        """
+        for candidate in (key,) + fallback_keys:
+            row = self.get(candidate)
+            if row is not None:
+                break
+        else:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_tokens["input"] += row["input_tokens"] or 0
+        self.saved_tokens["output"] += row["output_tokens"] or 0
+        self.conn.execute("UPDATE segments SET last_used = ? WHERE key = ?", (time.time(), candidate))
+        return row
+
+    def get(self, key: str) -> Optional[sqlite3.Row]:
+        """读取记录，不计入命中统计"""
+        return self.conn.execute("SELECT * FROM segments WHERE key = ?", (key,)).fetchone()
+
+    def store(self, key: str, source: str, translation: str, initial_translation: Optional[str] = None,
+              reflection: Optional[List[str]] = None, tokens: Optional[Dict[str, int]] = None,
+              model: Optional[str] = None, scope: Optional[str] = None):
+        tokens = tokens or {}
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO segments
+                    (key, source, translation, initial_translation, reflection,
+                     input_tokens, output_tokens, model, created, last_used, scope)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key, source, translation, initial_translation,
+                    json.dumps(reflection or [], ensure_ascii=False),
+                    tokens.get("input", 0), tokens.get("output", 0), model, now, now, scope,
+                ),
+            )
+
+    def fuzzy_lookup(self, segment: str, scope: str,
+                     threshold: float = 0.0) -> Tuple[Optional[sqlite3.Row], float]:
+        """
+        在同一范围内查找与segment最相似的已翻译段落，返回(记录, 相似度)
+        
+        只比较长度相差不超过20%的候选；相似度低于threshold时返回(None, 最高相似度)。
+        """
+        source = normalize_segment(segment)
+        length = len(source)
+        rows = self.conn.execute(
+            "SELECT * FROM segments WHERE scope = ? AND length(source) BETWEEN ? AND ? "
+            "ORDER BY last_used DESC LIMIT ?",
+            (scope, int(length * 0.8), int(length * 1.2) + 1, FUZZY_CANDIDATES),
+        ).fetchall()
+        
+        best, best_score = None, 0.0
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(source)
+        for row in rows:
+            matcher.set_seq1(normalize_segment(row["source"]))
+            if matcher.real_quick_ratio() <= best_score or matcher.quick_ratio() <= best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best, best_score = row, score
+        if best_score < threshold:
+            return None, best_score
+        return best, best_score
+    
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        """打印本次运行的命中率和节省的token"""
+        total = self.hits + self.misses
+        saved = self.saved_tokens["input"] + self.saved_tokens["output"]
+        print(f"🧠 翻译记忆: 命中 {self.hits}/{total} 个段落 ({self.hit_rate * 100:.1f}%), "
+              f"节省 {saved} tokens (输入 {self.saved_tokens['input']} / 输出 {self.saved_tokens['output']})")
@@ -0,0 +1,116 @@
+"""
+跨文件的三阶段流水线
+- 初步翻译、反思评估、优化翻译各有一个有界队列和一组worker，
+  不同文件（和同一文件的不同分块）的各阶段请求同时进行
+- 下游阶段的队列满时，上游worker暂停取新任务（背压），优先把已开始的文件做完
+- 文件本身的读写和格式化不占用任何阶段的worker
+"""
+
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+STAGES = ("initial_translation", "reflection", "refined_translation")
+
+# 每个阶段的并发请求数和队列长度
+STAGE_WORKERS = {"initial_translation": 4, "reflection": 4, "refined_translation": 4}
+QUEUE_SIZE = 8
+
+
+class StagePipeline:
+    """
+    各阶段的请求通过 submit(stage, factory) 提交，由该阶段的worker执行
+
+    用法:
+        async with StagePipeline() as pipeline:
+            agent = TranslationAgent(..., pipeline=pipeline)
+    """
+
+    def __init__(self, workers: Optional[Dict[str, int]] = None, queue_size: int = QUEUE_SIZE):
+        self.workers = {**STAGE_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        self.stats = {stage: {"jobs": 0, "busy": 0.0, "max_backlog": 0} for stage in STAGES}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._changed: Optional[asyncio.Condition] = None
+        self._tasks = []
+        self._started = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """流水线中最多同时容纳的请求数（执行中和排队中）"""
+        return sum(self.workers.values()) + self.queue_size * len(STAGES)
+
+    async def start(self):
+        self._queues = {stage: asyncio.Queue(self.queue_size) for stage in STAGES}
+        self._changed = asyncio.Condition()
+        self._started = time.monotonic()
+        for stage in STAGES:
+            for _ in range(max(1, self.workers[stage])):
+                self._tasks.append(asyncio.ensure_future(self._worker(stage)))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def submit(self, stage: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """提交一个阶段请求并等待结果；该阶段队列已满时等待（背压）"""
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues[stage]
+        await queue.put((factory, future))
+        stats = self.stats[stage]
+        stats["max_backlog"] = max(stats["max_backlog"], queue.qsize())
+        return await future
+
+    def _downstream_full(self, stage: str) -> bool:
+        index = STAGES.index(stage)
+        return any(self._queues[later].full() for later in STAGES[index + 1:])
+
+    async def _worker(self, stage: str):
+        queue = self._queues[stage]
+        while True:
+            # 下游积压时暂停，让已经进入后续阶段的文件先完成
+            async with self._changed:
+                await self._changed.wait_for(lambda: not self._downstream_full(stage))
+            factory, future = await queue.get()
+            async with self._changed:
+                self._changed.notify_all()
+            if future.done():
+                # 调用方已取消（例如单文件超时）
+                queue.task_done()
+                continue
+
+            start = time.monotonic()
+            try:
+                result = await factory()
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.stats[stage]["jobs"] += 1
+                self.stats[stage]["busy"] += time.monotonic() - start
+                queue.task_done()
+
+    def report(self):
+        """打印各阶段的请求数、worker利用率和最大积压"""
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        print("🔀 流水线:")
+        for stage in STAGES:
+            stats = self.stats[stage]
+            utilization = stats["busy"] / (elapsed * max(1, self.workers[stage]))
+            print(f"  - {stage}: {stats['jobs']} 个请求, worker {self.workers[stage]} 个, "
+                  f"利用率 {utilization * 100:.0f}%, 最大积压 {stats['max_backlog']}")
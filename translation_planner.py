@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+翻译运行前的预估（不调用API）
+- 用真实分词器（tiktoken，可选）计算每个文件的token
+- 按实际的三阶段提示词模板、屏蔽、分块和自适应深度建模每个请求的输入/输出
+- 提供翻译记忆时，命中记忆的段落不计入（与翻译时一样只翻译连续的未命中段落）
+- 按 model_prices 估算费用；整体用时按流水线各阶段的worker数和文件并发数估算
+
+用法: python translation_planner.py docs/get-started --model grok-3-mini
+"""
+
+import io
+import os
+import math
+import heapq
+import asyncio
+import logging
+import argparse
+import contextlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from Reflection_Workflow_XAI import TranslationAgent
+from markdown_chunker import chunk_markdown, chunk_context
+from markdown_masking import mask_markdown
+from translation_depth import SINGLE, REFLECTION_TOKENS
+from translation_scheduler import MAX_CONCURRENT_FILES, size_priority
+from translation_pipeline import STAGES, STAGE_WORKERS, StagePipeline
+from translation_memory import DEFAULT_DB_PATH, TranslationMemory, split_segments
+from token_counter import count_tokens, tokenizer_name
+from frontmatter import split_frontmatter
+from glossary_matcher import GlossaryMatcher
+
+# 译文token数与原文token数之比（按目标语言）
+TARGET_TOKEN_RATIO = {"Chinese": 1.1}
+DEFAULT_TOKEN_RATIO = 1.0
+
+# 请求用时模型：固定延迟 + 输入处理 + 输出生成
+REQUEST_LATENCY = 1.0
+INPUT_TOKENS_PER_SECOND = 2000
+OUTPUT_TOKENS_PER_SECOND = 50
+
+# 阶段3的开始/结束标记
+MARKER_TOKENS = 12
+
+
+def request_seconds(input_tokens: int, output_tokens: int) -> float:
+    return REQUEST_LATENCY + input_tokens / INPUT_TOKENS_PER_SECOND + output_tokens / OUTPUT_TOKENS_PER_SECOND
+
+
+def makespan(durations: List[float], workers: int) -> float:
+    """按给定顺序把任务分配给最早空闲的worker，返回全部完成的时间"""
+    free = [0.0] * max(1, min(workers, len(durations) or 1))
+    for duration in durations:
+        heapq.heappush(free, heapq.heappop(free) + duration)
+    return max(free)
+
+
+class _PromptRecorder:
+    """替代 _make_xai_request：只记录提示词，不发送请求"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, messages, **kwargs):
+        self.messages = messages
+        return {"choices": [{"message": {"content": ""}}]}, {"input": 0, "output": 0}
+
+    @property
+    def tokens(self) -> int:
+        return sum(count_tokens(message["content"]) for message in self.messages)
+
+
+class FilePlan:
+    """单个文件的预估"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.source_tokens = 0
+        self.chunks = 0
+        self.requests = 0
+        self.segments = 0
+        self.memory_hits = 0
+        self.depth = {SINGLE: 0, "full": 0}
+        # 各阶段每个请求的用时（按文件内的顺序）
+        self.stage_seconds: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.tokens = {"input": 0, "output": 0}
+        self.cost = 0.0
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path), "source_tokens": self.source_tokens, "chunks": self.chunks,
+            "segments": self.segments, "memory_hits": self.memory_hits, "requests": self.requests, "depth": self.depth, "tokens": self.tokens,
+            "cost": self.cost, "seconds": self.seconds,
+        }
+
+
+class TranslationPlanner:
+    """按 TranslationAgent 的配置模拟一次翻译运行"""
+
+    def __init__(self, model: str = "grok-3-mini", source_lang: str = "English", target_lang: str = "Chinese",
+                 country: Optional[str] = None, glossary: Optional[Dict[str, str]] = None,
+                 agent: Optional[TranslationAgent] = None, memory: Optional[TranslationMemory] = None):
+        self.agent = agent or TranslationAgent(model=model)
+        self.memory = memory
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.country = country
+        self.glossary = glossary
+        self.matcher = GlossaryMatcher(glossary) if glossary else None
+        self.ratio = TARGET_TOKEN_RATIO.get(target_lang, DEFAULT_TOKEN_RATIO)
+        self.recorder = _PromptRecorder()
+        # 实例属性覆盖方法：各阶段照常构建提示词，但不会发出请求
+        self.agent._make_xai_request = self.recorder
+
+    async def _prompt_tokens(self, stage, *args) -> int:
+        # 各阶段的进度输出和空响应告警与预估无关
+        logging.disable(logging.WARNING)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await stage(*args)
+        finally:
+            logging.disable(logging.NOTSET)
+        return self.recorder.tokens
+
+    async def _plan_segment(self, text: str, context: Optional[str], plan: FilePlan) -> float:
+        """预估一段文本的三阶段请求，返回该段的用时"""
+        agent = self.agent
+        if agent.mask_regions:
+            text, _ = mask_markdown(text)
+        depth, _ = agent._choose_depth(text, None, None)
+        output = math.ceil(count_tokens(text) * self.ratio)
+        # 与翻译时一样，只注入文本中出现的术语
+        glossary = self.matcher.filter(text) if self.matcher else self.glossary
+        args = (self.source_lang, self.target_lang, self.country, glossary, context)
+
+        stages = [(await self._prompt_tokens(agent._initial_translation, text, *args), output)]
+        if depth != SINGLE:
+            # 提示词按空译文渲染，再加上预计的译文和反思长度
+            reflection = await self._prompt_tokens(agent._reflection, text, "", *args)
+            stages.append((reflection + output, REFLECTION_TOKENS))
+            refined = await self._prompt_tokens(agent._refined_translation, text, "", [], *args)
+            stages.append((refined + output + REFLECTION_TOKENS, output + MARKER_TOKENS))
+
+        plan.depth[depth] += 1
+        seconds = 0.0
+        for stage, (input_tokens, output_tokens) in zip(STAGES, stages):
+            plan.requests += 1
+            plan.tokens["input"] += input_tokens
+            plan.tokens["output"] += output_tokens
+            duration = request_seconds(input_tokens, output_tokens)
+            plan.stage_seconds[stage].append(duration)
+            seconds += duration
+        return seconds
+
+    def _pending_texts(self, body: str, plan: FilePlan) -> List[str]:
+        """
+        需要翻译的内容：没有翻译记忆时为整篇正文，
+        否则为连续的未命中段落（查找不计入翻译记忆的命中统计）
+        """
+        if self.memory is None:
+            return [body]
+        agent = self.agent
+        spans = split_segments(body)
+        segments = [body[start:end] for start, end in spans]
+        keys = agent._memory_keys(segments, self.source_lang, self.target_lang, self.country, self.glossary)
+        missing = [
+            not any(self.memory.get(key) is not None for key in agent._lookup_keys(keys, i, segment))
+            for i, segment in enumerate(segments)
+        ]
+        plan.segments = len(segments)
+        plan.memory_hits = missing.count(False)
+        return [body[spans[run[0]][0]:spans[run[-1]][1]] for run in agent._miss_runs(missing)]
+
+    async def plan_file(self, path: Path) -> FilePlan:
+        plan = FilePlan(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            _, body = split_frontmatter(f.read())
+        body = body.strip()
+        plan.source_tokens = count_tokens(body)
+        if not body:
+            return plan
+
+        agent = self.agent
+        durations = []
+        for text in self._pending_texts(body, plan):
+            if count_tokens(text) > agent.chunk_tokens:
+                chunks = chunk_markdown(text, agent.chunk_tokens, agent._estimate_tokens)
+            else:
+                chunks = [(0, len(text))]
+            plan.chunks += len(chunks)
+            for index, (start, end) in enumerate(chunks):
+                context = chunk_context(text, chunks, index) if len(chunks) > 1 else None
+                durations.append(await self._plan_segment(text[start:end], context, plan))
+        # 同一文件的各块按 max_parallel_chunks 并发
+        plan.seconds = makespan(durations, agent.max_parallel_chunks)
+        plan.cost = agent._calculate_cost(plan.tokens)
+        return plan
+
+    async def plan(self, files: List[Path], concurrency: int = MAX_CONCURRENT_FILES,
+                   workers: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        所有文件的预估
+
+        整体用时取两者中较大的：按调度器的顺序（大文件优先）和文件并发数排满的用时，
+        以及每个阶段的请求按该阶段worker数（StagePipeline.workers）排满的用时。
+        """
+        workers = {**STAGE_WORKERS, **(workers or {})}
+        plans = [await self.plan_file(Path(path)) for path in files]
+        ordered = sorted(plans, key=lambda plan: size_priority(plan.path))
+        tokens = {
+            "input": sum(plan.tokens["input"] for plan in plans),
+            "output": sum(plan.tokens["output"] for plan in plans),
+        }
+        stage_seconds = {
+            stage: makespan([seconds for plan in ordered for seconds in plan.stage_seconds[stage]], workers[stage])
+            if any(plan.stage_seconds[stage] for plan in plans) else 0.0
+            for stage in STAGES
+        }
+        file_seconds = makespan([plan.seconds for plan in ordered], concurrency) if plans else 0.0
+        return {
+            "files": plans,
+            "model": self.agent.model,
+            "tokenizer": tokenizer_name(),
+            "concurrency": concurrency,
+            "workers": workers,
+            "segments": sum(plan.segments for plan in plans),
+            "memory_hits": sum(plan.memory_hits for plan in plans),
+            "requests": sum(plan.requests for plan in plans),
+            "tokens": tokens,
+            "cost": sum(plan.cost for plan in plans),
+            "serial_seconds": sum(plan.seconds for plan in plans),
+            "stage_seconds": stage_seconds,
+            "wall_seconds": max(file_seconds, *stage_seconds.values()),
+        }
+
+
+def collect_markdown_files(base_dir: Path) -> List[Path]:
+    """与翻译脚本相同的文件筛选规则"""
+    md_files = []
+    for root, dirs, files in os.walk(base_dir):
+        for file in files:
+            if file.endswith('.md') and not file.startswith('_'):
+                md_files.append(Path(root) / file)
+    return sorted(md_files)
+
+
+async def plan_files(files: List[Path], model: str = "grok-3-mini", concurrency: int = MAX_CONCURRENT_FILES,
+                     source_lang: str = "English", target_lang: str = "Chinese",
+                     glossary: Optional[Dict[str, str]] = None, workers: Optional[Dict[str, int]] = None,
+                     memory: Optional[TranslationMemory] = None) -> Dict[str, Any]:
+    """concurrency和workers应与实际运行的调度器并发数和StagePipeline.workers一致"""
+    planner = TranslationPlanner(model, source_lang, target_lang, glossary=glossary, memory=memory)
+    return await planner.plan(files, concurrency, workers)
+
+
+def print_plan(plan: Dict[str, Any], usd_to_cny: float = 7.22, per_file: bool = True):
+    """打印预估结果"""
+    workers = "/".join(str(plan["workers"][stage]) for stage in STAGES)
+    print(f"\n🧮 翻译预估 (模型 {plan['model']}, 分词 {plan['tokenizer']}, 文件并发 {plan['concurrency']}, "
+          f"各阶段worker {workers})")
+    if per_file:
+        for file_plan in plan["files"]:
+            tokens = file_plan.tokens
+            print(f"  - {file_plan.path}: 原文 {file_plan.source_tokens} tokens, {file_plan.chunks} 块, "
+                  f"{file_plan.requests} 个请求, 输入 {tokens['input']} / 输出 {tokens['output']}, "
+                  f"${file_plan.cost:.4f}, 约 {file_plan.seconds:.0f}秒")
+    tokens = plan["tokens"]
+    if plan["segments"]:
+        print(f"🧠 翻译记忆预计命中 {plan['memory_hits']}/{plan['segments']} 个段落（不计入预估）")
+    print(f"📊 合计: {len(plan['files'])} 个文件, {plan['requests']} 个请求, "
+          f"输入 {tokens['input']} / 输出 {tokens['output']} tokens")
+    print(f"💰 预计费用: ${plan['cost']:.4f} (约 ¥{plan['cost'] * usd_to_cny:.2f})")
+    print(f"⏱️  预计用时: {plan['wall_seconds']:.0f}秒 (串行 {plan['serial_seconds']:.0f}秒)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预估翻译运行的token、费用和用时（不调用API）")
+    parser.add_argument('paths', nargs='*', default=["docs/get-started"], help="目录或markdown文件")
+    parser.add_argument('--model', default="grok-3-mini")
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help="同时翻译的文件数（默认与翻译脚本相同）")
+    parser.add_argument('--no-memory', action='store_true', help="不扣除翻译记忆中已有的段落")
+    parser.add_argument('--target-lang', default="Chinese")
+    parser.add_argument('--summary', action='store_true', help="只显示合计")
+    args = parser.parse_args()
+
+    files = []
+    for path in map(Path, args.paths):
+        files.extend(collect_markdown_files(path) if path.is_dir() else [path])
+    if not files:
+        print("❌ 未找到markdown文件")
+        return 1
+
+    pipeline = StagePipeline()
+    concurrency = args.concurrency or max(MAX_CONCURRENT_FILES, pipeline.capacity)
+    memory = None if args.no_memory or not os.path.exists(DEFAULT_DB_PATH) else TranslationMemory()
+    try:
+        plan = asyncio.run(plan_files(files, args.model, concurrency, target_lang=args.target_lang,
+                                      workers=pipeline.workers, memory=memory))
+    finally:
+        if memory is not None:
+            memory.close()
+    print_plan(plan, per_file=not args.summary)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""
+多文件并发翻译调度器
+- 用信号量限制同时进行的翻译文件数
+- 按优先级出队（默认先翻译大文件，缩短整体完成时间）
+- 每个文件单独设置超时，超时或失败不影响其他文件
+"""
+
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认并发文件数和单文件超时（秒）
+MAX_CONCURRENT_FILES = 8
+FILE_TIMEOUT = 600
+
+
+def size_priority(file_path: Path) -> float:
+    """默认优先级：文件越大越先开始（数值越小越优先）"""
+    try:
+        return -Path(file_path).stat().st_size
+    except OSError:
+        return 0
+
+
+class TranslationResult:
+    """单个文件的调度结果"""
+
+    __slots__ = ("item", "status", "elapsed", "error", "value")
+
+    def __init__(self, item, status: str, elapsed: float, error: Optional[str] = None, value: Any = None):
+        self.item = item
+        self.status = status      # "ok" | "failed" | "timeout"
+        self.elapsed = elapsed
+        self.error = error
+        self.value = value
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class TranslationScheduler:
+    """
+    并发执行 worker(item) 协程的调度器
+
+    worker 返回 False 视为失败，抛出异常或超时同样记为失败；
+    返回结果的顺序与输入顺序一致。
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_FILES, file_timeout: Optional[float] = FILE_TIMEOUT,
+                 priority: Callable[[Any], float] = size_priority):
+        self.max_concurrency = max(1, max_concurrency)
+        self.file_timeout = file_timeout
+        self.priority = priority
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _run_one(self, item, worker: Callable[[Any], Awaitable[Any]]) -> TranslationResult:
+        async with self.semaphore:
+            start = time.monotonic()
+            try:
+                value = await asyncio.wait_for(worker(item), timeout=self.file_timeout)
+                status = "failed" if value is False else "ok"
+                return TranslationResult(item, status, time.monotonic() - start, value=value)
+            except asyncio.TimeoutError:
+                logger.warning(f"翻译超时({self.file_timeout}秒): {item}")
+                return TranslationResult(item, "timeout", time.monotonic() - start, error="timeout")
+            except Exception as e:
+                logger.error(f"翻译出错: {item} - {e}")
+                return TranslationResult(item, "failed", time.monotonic() - start, error=str(e))
+
+    async def run(self, items: Iterable[Any], worker: Callable[[Any], Awaitable[Any]]) -> List[TranslationResult]:
+        """按优先级启动所有任务，并发数不超过 max_concurrency"""
+        items = list(items)
+        # 信号量按等待顺序放行，所以按优先级顺序创建任务即可
+        order = sorted(range(len(items)), key=lambda i: self.priority(items[i]))
+        tasks: Dict[int, asyncio.Task] = {}
+        for i in order:
+            tasks[i] = asyncio.ensure_future(self._run_one(items[i], worker))
+        await asyncio.gather(*tasks.values())
+        return [tasks[i].result() for i in range(len(items))]
+
+
+def summarize(results: List[TranslationResult]) -> Dict[str, Any]:
+    """统计成功/失败/超时数量和最慢文件"""
+    slowest = max(results, key=lambda r: r.elapsed, default=None)
+    return {
+        "total": len(results),
+        "ok": sum(1 for r in results if r.status == "ok"),
+        "failed": sum(1 for r in results if r.status == "failed"),
+        "timeout": sum(1 for r in results if r.status == "timeout"),
+        "slowest": (slowest.item, slowest.elapsed) if slowest else None,
+    }